@@ -0,0 +1,119 @@
+"""
+Active-travel lookup latency as completed trip history grows.
+
+Compares the old join on TravelInfo.status with the denormalized
+Travel.status column (through the generated Travel.is_active flag) and
+its partial index.
+
+    python -m benchmarks.active_travels --sizes 10000 100000 1000000
+"""
+
+import argparse
+import random
+
+from benchmarks.common import bootstrap, measure, save_results
+
+ACTIVE_COUNT = 200
+PAGE_SIZE = 50
+BATCH_SIZE = 5000
+
+
+def grow_history(target, state):
+    """Insert completed/cancelled travels until the table holds `target` rows."""
+    from django.db import transaction
+    from journey.models import Travel, TravelInfo, TravelStatus
+
+    finished = [TravelStatus.COMPLETED] * 8 + [TravelStatus.CANCELLED, TravelStatus.FAILED]
+    while state["rows"] < target:
+        size = min(BATCH_SIZE, target - state["rows"])
+        statuses = [random.choice(finished) for _ in range(size)]
+        with transaction.atomic():
+            travels = Travel.objects.bulk_create(
+                Travel(creator=random.randint(1, 50000), status=status) for status in statuses
+            )
+            TravelInfo.objects.bulk_create(
+                TravelInfo(travel=travel, status=status) for travel, status in zip(travels, statuses)
+            )
+        state["rows"] += size
+
+
+def add_active():
+    from journey.models import ACTIVE_TRAVEL_STATUSES, Travel, TravelInfo
+
+    statuses = [random.choice(ACTIVE_TRAVEL_STATUSES) for _ in range(ACTIVE_COUNT)]
+    travels = Travel.objects.bulk_create(
+        Travel(creator=random.randint(1, 50000), status=status) for status in statuses
+    )
+    TravelInfo.objects.bulk_create(
+        TravelInfo(travel=travel, status=status) for travel, status in zip(travels, statuses)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from django.db import connection
+    from journey.models import ACTIVE_TRAVEL_STATUSES, Travel
+
+    random.seed(7)
+    add_active()
+    state = {"rows": 0}
+
+    def join_query():
+        return list(
+            Travel.objects.filter(info__status__in=ACTIVE_TRAVEL_STATUSES)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)[:PAGE_SIZE]
+        )
+
+    def indexed_query():
+        return list(
+            Travel.objects.filter(is_active=True)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)[:PAGE_SIZE]
+        )
+
+    assert join_query() == indexed_query()
+
+    results = []
+    for size in sorted(args.sizes):
+        grow_history(size, state)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        row = {
+            "finished_travels": size,
+            "active_travels": ACTIVE_COUNT,
+            "join_on_travelinfo": measure(join_query, repeat=args.repeat),
+            "denormalized_status": measure(indexed_query, repeat=args.repeat),
+            "plan": indexed_query_plan(),
+        }
+        results.append(row)
+        print(
+            f"{size:>10} finished | join p50 {row['join_on_travelinfo']['p50_ms']:>9} ms"
+            f" | indexed p50 {row['denormalized_status']['p50_ms']:>7} ms"
+        )
+
+    path = save_results("active_travels", results, args.output)
+    print(f"Results written to {path}")
+
+
+def indexed_query_plan():
+    from journey.models import Travel
+
+    queryset = (
+        Travel.objects.filter(is_active=True)
+        .order_by("-created_at", "-id")
+        .values_list("id", flat=True)[:PAGE_SIZE]
+    )
+    return queryset.explain()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Location ingest / latest-location throughput: WSGI sync path vs ASGI async path.
+
+Starts gunicorn (rideMain.wsgi, sync workers) and uvicorn (rideMain.asgi)
+against the benchmark database and drives both with the same mix of
+create-user-location POSTs and user-latest GETs from many concurrent
+keep-alive connections:
+
+    sync:  POST /api/v1/journey/locations/create-user-location/
+    async: POST /api/v1/journey/async/locations/create-user-location/
+
+    python -m benchmarks.async_ingest --concurrency 200 --requests 5000
+
+Pass --sync-url / --async-url to benchmark already running servers (e.g.
+the `web` and `web_async` compose services) instead of spawning them.
+Reports requests per second, latency percentiles and error counts.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks.common import bootstrap, save_results, summarize
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PATHS = {
+    "sync": {
+        "create": "/api/v1/journey/locations/create-user-location/",
+        "latest": "/api/v1/journey/locations/user-latest/{telegram_id}/",
+    },
+    "async": {
+        "create": "/api/v1/journey/async/locations/create-user-location/",
+        "latest": "/api/v1/journey/async/locations/user-latest/{telegram_id}/",
+    },
+}
+
+SERVER_COMMANDS = {
+    "sync": [
+        sys.executable, "-m", "gunicorn", "rideMain.wsgi:application",
+        "--bind", "127.0.0.1:{port}", "--workers", "{workers}", "--log-level", "warning",
+    ],
+    "async": [
+        sys.executable, "-m", "uvicorn", "rideMain.asgi:application",
+        "--host", "127.0.0.1", "--port", "{port}", "--workers", "{workers}",
+        "--log-level", "warning", "--no-access-log",
+    ],
+}
+
+USERS = 1000
+BASE_TELEGRAM_ID = 700000000
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, workers):
+    port = free_port()
+    command = [part.format(port=port, workers=workers) for part in SERVER_COMMANDS[kind]]
+    env = {**os.environ}
+    env.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    process = subprocess.Popen(command, cwd=ROOT, env=env, start_new_session=True)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{kind} server exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{kind} server did not start on port {port}")
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client (stdlib only)."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            await self.open()
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Connection: keep-alive\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+        )
+        self.writer.write(head.encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        length = 0
+        chunked = close = False
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding" and "chunked" in value:
+                chunked = True
+            elif name == "connection" and value == "close":
+                close = True
+
+        if chunked:
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length:
+            await self.reader.readexactly(length)
+
+        if close:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def make_request(kind, rng, write_ratio):
+    telegram_id = BASE_TELEGRAM_ID + rng.randrange(USERS)
+    if rng.random() < write_ratio:
+        body = {
+            "telegram_id": telegram_id,
+            # UserLocation.location is unique, so every ping gets its own point
+            "coordinate": {
+                "lat": round(41.2 + rng.random() * 0.2, 7),
+                "lng": round(69.1 + rng.random() * 0.2, 7),
+            },
+            "name": f"bench-{telegram_id}",
+            "accuracy": 10.0,
+            "heading": rng.randrange(360),
+        }
+        return "create", "POST", PATHS[kind]["create"], body
+    return "latest", "GET", PATHS[kind]["latest"].format(telegram_id=telegram_id), None
+
+
+async def drive(kind, base_url, concurrency, total, write_ratio):
+    parts = urlsplit(base_url)
+    # Unseeded: coordinates must not repeat across runs against the same database
+    rng = random.Random()
+    plan = [make_request(kind, rng, write_ratio) for _ in range(total)]
+    queue = iter(plan)
+
+    samples = {"create": [], "latest": []}
+    errors = {}
+
+    async def client():
+        connection = Connection(parts.hostname, parts.port)
+        for name, method, path, body in queue:
+            start = time.perf_counter()
+            try:
+                status = await connection.request(method, path, body)
+            except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+                connection.close()
+                key = type(exc).__name__
+            else:
+                key = None if status < 400 else str(status)
+            elapsed = (time.perf_counter() - start) * 1000
+            if key is None:
+                samples[name].append(elapsed)
+            else:
+                errors[key] = errors.get(key, 0) + 1
+        connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    completed = samples["create"] + samples["latest"]
+    return {
+        "requests": total,
+        "duration_s": round(duration, 3),
+        "rps": round(len(completed) / duration, 1),
+        "errors": errors,
+        "all": summarize(completed),
+        "create": summarize(samples["create"]),
+        "latest": summarize(samples["latest"]),
+    }
+
+
+def run(kind, url, args):
+    process = None
+    if url is None:
+        process, url = start_server(kind, args.workers)
+    try:
+        # Warm-up: connections, imports and caches are not measured
+        asyncio.run(drive(kind, url, min(args.concurrency, 20), 200, args.write_ratio))
+        return asyncio.run(drive(kind, url, args.concurrency, args.requests, args.write_ratio))
+    finally:
+        if process is not None:
+            stop_server(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--write-ratio", type=float, default=0.5,
+                        help="share of create-user-location POSTs in the mix")
+    parser.add_argument("--sync-url", help="base URL of a running WSGI server")
+    parser.add_argument("--async-url", help="base URL of a running ASGI server")
+    parser.add_argument("--only", choices=["sync", "async"])
+    parser.add_argument("--fresh", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    bootstrap(fresh=args.fresh)
+
+    results = {"concurrency": args.concurrency, "workers": args.workers,
+               "write_ratio": args.write_ratio}
+    for kind, url in (("sync", args.sync_url), ("async", args.async_url)):
+        if args.only and kind != args.only:
+            continue
+        results[kind] = data = run(kind, url, args)
+        print(
+            f"{kind:>5}: {data['rps']:>8} req/s  "
+            f"p50 {data['all']['p50_ms']} ms  p99 {data['all']['p99_ms']} ms  "
+            f"errors {sum(data['errors'].values())}"
+        )
+
+    path = save_results("async_ingest", results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Request latency with side effects inline vs in the background task subsystem.
+
+Replays complete / rate (both sides) requests for a set of started travels,
+interleaved with live-location batches, once per TASKS backend:
+
+    immediate  side effects run inside the request (previous behaviour)
+    memory     in-process thread pool, after commit
+    database   BackgroundTask rows written in the request's transaction,
+               drained afterwards by run_worker (thread and process pool)
+
+After each run the queue is drained and the results are checked: every
+passenger and driver has the expected trip count and rating count, the
+latest position of every batch user is in the position store, and
+rebuilding the statistics counters from the source tables finds the same
+drift as after the inline run (SQLite stores the unrounded running-average
+ratings, so passengers.rating_sum can differ by rounding cents even inline).
+
+    python -m benchmarks.background_tasks --travels 300 --batches 40
+
+Exits with status 1 if any backend leaves inconsistent counters.
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from benchmarks.common import bootstrap, save_results, summarize
+
+API = "/api/v1/journey"
+BASE_TELEGRAM_ID = 820000000
+DRIVER_TELEGRAM_ID = 830000000
+USER_TELEGRAM_ID = 840000000
+
+
+def seed(args, rng):
+    from django.db import transaction
+
+    from journey.models import Driver, Location, Passenger, Travel, TravelInfo
+    from journey.services.stats import rebuild_stats
+
+    with transaction.atomic():
+        start = Location.objects.create(name="A", lat=41.30, lng=69.24)
+        end = Location.objects.create(name="B", lat=41.33, lng=69.30)
+        passengers = Passenger.objects.bulk_create([
+            Passenger(telegram_id=BASE_TELEGRAM_ID + i, name=f"Passenger {i}", contact=f"+99890{i:07d}")
+            for i in range(args.passengers)
+        ])
+        drivers = Driver.objects.bulk_create([
+            Driver(telegram_id=DRIVER_TELEGRAM_ID + i, name=f"Driver {i}", contact=f"+99891{i:07d}")
+            for i in range(args.drivers)
+        ])
+        travels = Travel.objects.bulk_create([
+            Travel(
+                from_location=start,
+                to_location=end,
+                creator=BASE_TELEGRAM_ID,
+                driver=rng.choice(drivers),
+                expected_price=Decimal(rng.randrange(10, 200) * 1000),
+                status="started",
+            )
+            for _ in range(args.travels)
+        ])
+        infos = TravelInfo.objects.bulk_create([TravelInfo(travel=travel, status="started") for travel in travels])
+        through = TravelInfo.passengers.through
+        through.objects.bulk_create([
+            through(travelinfo_id=info.pk, passenger_id=passenger.pk)
+            for info in infos
+            for passenger in rng.sample(passengers, args.passengers_per_travel)
+        ])
+    rebuild_stats()
+    return [travel.pk for travel in travels]
+
+
+def reset():
+    from journey.models import BackgroundTask, Driver, Passenger, Travel, TravelInfo, UserLocation
+    from journey.services.stats import rebuild_stats
+
+    Travel.objects.update(status="started", completed_at=None, final_price=None)
+    TravelInfo.objects.update(status="started", driver_rating=None, passenger_rating=None)
+    for model in (Passenger, Driver):
+        model.objects.update(total_trips=0, rating_sum=0, rating_count=0, rating=5)
+    UserLocation.objects.all().delete()
+    BackgroundTask.objects.all().delete()
+    rebuild_stats()
+
+
+def location_batch(rng, size, batch_number):
+    return {"items": [
+        {
+            "telegram_id": USER_TELEGRAM_ID + rng.randrange(200),
+            "name": f"Ping {batch_number}-{i}",
+            "coordinate": {
+                "lat": round(rng.uniform(41.20, 41.40), 7),
+                "lng": round(rng.uniform(69.10, 69.35), 7),
+            },
+        }
+        for i in range(size)
+    ]}
+
+
+def replay(client, travel_ids, args, rng):
+    latencies = defaultdict(list)
+
+    def post(endpoint, path, payload):
+        started = time.perf_counter()
+        response = client.post(f"{API}{path}", payload, content_type="application/json")
+        latencies[endpoint].append((time.perf_counter() - started) * 1000)
+        assert response.status_code in (200, 201), (path, response.status_code, response.content[:200])
+
+    batch_every = max(1, len(travel_ids) // args.batches) if args.batches else None
+    for number, travel_id in enumerate(travel_ids):
+        post("complete", f"/travels/{travel_id}/complete/", {"final_price": str(rng.randrange(10, 200) * 1000)})
+        post("rate_driver", f"/travels/{travel_id}/rate/", {"rating": rng.randint(1, 5), "rated_by": "passenger"})
+        post("rate_passengers", f"/travels/{travel_id}/rate/", {"rating": rng.randint(1, 5), "rated_by": "driver"})
+        if batch_every and number % batch_every == 0:
+            post("location_batch", "/locations/create-user-locations-batch/",
+                 location_batch(rng, args.batch_size, number))
+    return latencies
+
+
+def drain(backend, pool):
+    from journey.services import tasks
+
+    started = time.perf_counter()
+    counts = None
+    if backend == "memory":
+        tasks.get_backend().join()
+    elif backend == "database":
+        counts = tasks.run_worker(pool=pool, burst=True, poll_interval=0.05)
+    return round(time.perf_counter() - started, 3), counts
+
+
+def check(travel_ids, check_positions):
+    from django.db.models import Count
+
+    from journey.models import BackgroundTask, Driver, Passenger, Travel, UserLocation
+    from journey.services.position_store import position_store
+    from journey.services.stats import PASSENGER_KEYS, TRAVEL_KEYS, read_counters, rebuild_stats
+
+    expected_trips = dict(
+        Passenger.objects.annotate(n=Count("travels")).values_list("pk", "n")
+    )
+    wrong_passengers = sum(
+        1 for pk, trips, rated in Passenger.objects.values_list("pk", "total_trips", "rating_count")
+        if trips != expected_trips[pk] or rated != expected_trips[pk]
+    )
+    expected_driver = dict(
+        Travel.objects.filter(pk__in=travel_ids).values("driver_id").annotate(n=Count("id")).values_list("driver_id", "n")
+    )
+    wrong_drivers = sum(
+        1 for pk, trips, rated in Driver.objects.values_list("pk", "total_trips", "rating_count")
+        if trips != expected_driver.get(pk, 0) or rated != expected_driver.get(pk, 0)
+    )
+
+    missing_positions = 0
+    if check_positions:
+        latest = {}
+        for pk, user in UserLocation.objects.order_by("created_at", "pk").values_list("pk", "user"):
+            latest[user] = pk
+        for user, pk in latest.items():
+            payload = position_store.get(user)
+            missing_positions += payload is None or payload["id"] != pk
+
+    keys = TRAVEL_KEYS + PASSENGER_KEYS
+    before = read_counters(keys)
+    rebuild_stats()
+    after = read_counters(keys)
+    drift = {key: str(after[key] - before[key]) for key in keys if after[key] != before[key]}
+
+    return {
+        "wrong_passengers": wrong_passengers,
+        "wrong_drivers": wrong_drivers,
+        "missing_positions": missing_positions,
+        "stats_drift": drift,
+        "left_in_queue": BackgroundTask.objects.count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--travels", type=int, default=300)
+    parser.add_argument("--passengers", type=int, default=2000)
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument("--passengers-per-travel", type=int, default=3)
+    parser.add_argument("--batches", type=int, default=40, help="Location batches spread over the run")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=23)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    # LocMemCache culls beyond 300 entries by default, which would drop
+    # positions before they are checked
+    if settings.CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+        settings.CACHES["default"].setdefault("OPTIONS", {})["MAX_ENTRIES"] = 1_000_000
+
+    rng = random.Random(args.seed)
+    travel_ids = seed(args, rng)
+    user = get_user_model().objects.create_user("bench", password="bench")
+    client = Client()
+    client.force_login(user)
+
+    runs = [("immediate", None), ("memory", None), ("database", "thread"), ("database", "process")]
+    results = {}
+    for backend, pool in runs:
+        name = backend if pool is None else f"{backend}/{pool}"
+        reset()
+        settings.TASKS = {**settings.TASKS, "BACKEND": backend}
+
+        started = time.perf_counter()
+        latencies = replay(client, travel_ids, args, random.Random(args.seed))
+        request_s = time.perf_counter() - started
+        drain_s, counts = drain(backend, pool)
+        # Process-pool workers write to their own local cache, not this process's
+        consistency = check(travel_ids, check_positions=pool != "process")
+
+        results[name] = {
+            "requests_s": round(request_s, 3),
+            "drain_s": drain_s,
+            "worker": counts,
+            "endpoints": {endpoint: summarize(samples) for endpoint, samples in latencies.items()},
+            "all": summarize([sample for samples in latencies.values() for sample in samples]),
+            **consistency,
+        }
+        row = results[name]
+        endpoints = " | ".join(
+            f"{endpoint} {summary['p50_ms']}/{summary['p99_ms']}" for endpoint, summary in row["endpoints"].items()
+        )
+        print(
+            f"{name:<17} p50/p99 ms: {endpoints} | all p99 {row['all']['p99_ms']} | requests {row['requests_s']} s"
+            f" + drain {row['drain_s']} s | wrong trips/ratings {row['wrong_passengers']}+{row['wrong_drivers']}"
+            f" | missing positions {row['missing_positions']} | stats drift {row['stats_drift'] or 'none'}"
+        )
+
+    path = save_results("background_tasks", {"args": vars(args), "runs": results}, args.output)
+    print(f"Results written to {path}")
+
+    inline_drift = results["immediate"]["stats_drift"]
+    if any(
+        row["wrong_passengers"] or row["wrong_drivers"] or row["missing_positions"]
+        or row["stats_drift"] != inline_drift or row["left_in_queue"]
+        for row in results.values()
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
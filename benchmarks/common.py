@@ -0,0 +1,92 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def bootstrap(fresh=False):
+    """Configure Django against the benchmark database and migrate it."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+    import django
+    from django.conf import settings
+
+    sqlite = settings.DATABASES["default"]["ENGINE"].endswith("sqlite3")
+    if fresh and sqlite:
+        name = settings.DATABASES["default"]["NAME"]
+        if os.path.exists(name):
+            os.remove(name)
+
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+    if fresh and not sqlite:
+        call_command("flush", interactive=False, verbosity=0)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples_ms):
+    """Latency summary (milliseconds) for a list of samples."""
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(statistics.fmean(samples_ms), 3) if samples_ms else None,
+        "p50_ms": round(percentile(samples_ms, 50), 3) if samples_ms else None,
+        "p95_ms": round(percentile(samples_ms, 95), 3) if samples_ms else None,
+        "p99_ms": round(percentile(samples_ms, 99), 3) if samples_ms else None,
+    }
+
+
+def measure(fn, repeat=50, warmup=5):
+    """Call fn repeatedly and return its latency summary."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent.parent,
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(name, data, path=None):
+    """Write results as JSON so runs can be compared across commits."""
+    from django.db import connection
+
+    payload = {
+        "benchmark": name,
+        "revision": git_revision(),
+        "database": connection.vendor,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": data,
+    }
+    if path is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = RESULTS_DIR / f"{name}-{payload['revision']}-{stamp}.json"
+    Path(path).write_text(json.dumps(payload, indent=2, default=str))
+    return path
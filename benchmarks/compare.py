@@ -0,0 +1,75 @@
+"""
+Compare two http_suite result files endpoint by endpoint.
+
+    python -m benchmarks.compare base.json head.json --threshold 10
+
+Prints p50/p95/p99 latency and queries per request for both runs with the
+relative change. Exits with status 1 if any endpoint's p95 grew by more
+than --threshold percent or its mean query count grew at all.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+COLUMNS = ("p50_ms", "p95_ms", "p99_ms", "queries_mean")
+
+
+def load(path):
+    payload = json.loads(Path(path).read_text())
+    return payload, payload["results"]["endpoints"]
+
+
+def change(old, new):
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    base_payload, base = load(args.base)
+    head_payload, head = load(args.head)
+    print(f"base {base_payload['revision']} ({base_payload['database']})"
+          f"  ->  head {head_payload['revision']} ({head_payload['database']})")
+    if base_payload["results"]["config"] != head_payload["results"]["config"]:
+        print("warning: runs used different configurations")
+
+    header = f"{'endpoint':<24}" + "".join(f"{column:>30}" for column in COLUMNS)
+    print(header)
+    regressions = []
+    for name in sorted(set(base) | set(head)):
+        old, new = base.get(name), head.get(name)
+        if old is None or new is None:
+            print(f"{name:<24}{'only in ' + ('head' if old is None else 'base'):>30}")
+            continue
+
+        cells = []
+        for column in COLUMNS:
+            delta = change(old[column], new[column])
+            delta_text = f"{delta:+.1f}%" if delta is not None else "n/a"
+            cells.append(f"{old[column]} -> {new[column]} ({delta_text})")
+        print(f"{name:<24}" + "".join(f"{cell:>30}" for cell in cells))
+
+        p95_change = change(old["p95_ms"], new["p95_ms"])
+        if p95_change is not None and p95_change > args.threshold:
+            regressions.append(f"{name}: p95 {p95_change:+.1f}%")
+        if new["queries_mean"] > old["queries_mean"]:
+            regressions.append(f"{name}: queries {old['queries_mean']} -> {new['queries_mean']}")
+
+    if regressions:
+        print("\nregressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Lost-update check for passenger trip counters under parallel writers.
+
+Several worker processes (like gunicorn workers) increment the same
+passenger's total_trips. The old read-modify-write path (load, += 1,
+save()) is run next to the single-statement F() update from
+journey.services.atomic_updates; only the latter must end up with exactly
+workers * increments.
+
+    python -m benchmarks.concurrent_counters --workers 4 --increments 200
+
+Exits with status 1 if the atomic path loses any increment.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+from benchmarks.common import bootstrap, save_results
+
+TELEGRAM_ID = 900000001
+
+
+def read_modify_write(count):
+    from django.db import transaction
+    from journey.models import Passenger
+
+    for _ in range(count):
+        passenger = Passenger.objects.get(telegram_id=TELEGRAM_ID)
+        with transaction.atomic():
+            passenger.total_trips += 1
+            passenger.save()
+
+
+def atomic_increment(count):
+    from journey.services.atomic_updates import increment_passenger_trips
+
+    for _ in range(count):
+        increment_passenger_trips(TELEGRAM_ID)
+
+
+STRATEGIES = {
+    "read_modify_write": read_modify_write,
+    "atomic_f_update": atomic_increment,
+}
+
+
+def worker(name, count, barrier):
+    from django.db import connection
+
+    connection.close()
+    barrier.wait()
+    STRATEGIES[name](count)
+    connection.close()
+
+
+def run(name, workers, increments):
+    from django.db import connection
+    from journey.models import Passenger
+
+    Passenger.objects.filter(telegram_id=TELEGRAM_ID).update(total_trips=0)
+    connection.close()
+
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(workers)
+    processes = [
+        context.Process(target=worker, args=(name, increments, barrier))
+        for _ in range(workers)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    expected = workers * increments
+    actual = Passenger.objects.get(telegram_id=TELEGRAM_ID).total_trips
+    return {
+        "expected": expected,
+        "actual": actual,
+        "lost_updates": expected - actual,
+        "failed_workers": sum(1 for process in processes if process.exitcode != 0),
+        "elapsed_s": round(elapsed, 3),
+        "updates_per_s": round(actual / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--increments", type=int, default=200)
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from journey.models import Passenger
+
+    Passenger.objects.create(telegram_id=TELEGRAM_ID, name="Bench", contact="+998900000001")
+
+    results = {}
+    for name in STRATEGIES:
+        results[name] = run(name, args.workers, args.increments)
+        row = results[name]
+        print(
+            f"{name:>18} | expected {row['expected']} | actual {row['actual']}"
+            f" | lost {row['lost_updates']} | {row['updates_per_s']} updates/s"
+        )
+
+    path = save_results("concurrent_counters", results, args.output)
+    print(f"Results written to {path}")
+
+    atomic = results["atomic_f_update"]
+    if atomic["lost_updates"] or atomic["failed_workers"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Racing status changes: read-modify-write save() vs compare-and-set UPDATE.
+
+Several worker processes (like gunicorn workers handling a driver's
+"complete" tap and a passenger's "failed" report at the same time) race
+on the same started travels, each picking a random terminal status per
+travel. The old path (load, set status, save() travel and info, increment
+trip counters unless it was already completed) is run next to
+journey.services.travel_status.transition_travel.
+
+Per travel exactly one change may win. A run is consistent when every
+travel ends with Travel.status == TravelInfo.status, one reported winner,
+and a passenger trip count of 1 exactly when the final status is
+completed.
+
+    python -m benchmarks.concurrent_transitions --workers 4 --travels 300
+
+Exits with status 1 if the compare-and-set path breaks any of these.
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+from benchmarks.common import bootstrap, save_results
+
+TARGETS = ["completed", "failed"]
+
+
+def read_modify_write(travel_id, new_status):
+    from django.db import transaction
+    from django.db.models import F
+    from django.utils import timezone
+
+    from journey.models import Passenger, Travel
+
+    travel = Travel.objects.select_related("info").get(pk=travel_id)
+    with transaction.atomic():
+        was_completed = travel.info.status == "completed"
+        travel.info.status = new_status
+        if new_status == "completed":
+            travel.completed_at = timezone.now()
+        travel.info.save()
+        travel.save()
+        if new_status == "completed" and not was_completed:
+            Passenger.objects.filter(travels__travel_id=travel_id).update(total_trips=F("total_trips") + 1)
+    return True
+
+
+def compare_and_set(travel_id, new_status):
+    from journey.models import Travel
+    from journey.services.travel_status import transition_travel
+
+    travel = Travel.objects.select_related("info").get(pk=travel_id)
+    changed, _ = transition_travel(travel, new_status)
+    return changed
+
+
+STRATEGIES = {
+    "read_modify_write": read_modify_write,
+    "compare_and_set": compare_and_set,
+}
+
+
+def worker(name, travel_ids, seed, barrier, wins):
+    from django.db import connection
+
+    connection.close()
+    rng = random.Random(seed)
+    order = list(travel_ids)
+    rng.shuffle(order)
+    barrier.wait()
+    for travel_id in order:
+        if STRATEGIES[name](travel_id, rng.choice(TARGETS)):
+            with wins.get_lock():
+                wins[travel_ids.index(travel_id)] += 1
+    connection.close()
+
+
+def reset(travel_ids):
+    from journey.models import Passenger, Travel, TravelInfo
+
+    Travel.objects.filter(pk__in=travel_ids).update(status="started", completed_at=None)
+    TravelInfo.objects.filter(travel_id__in=travel_ids).update(status="started")
+    Passenger.objects.update(total_trips=0)
+
+
+def run(name, workers, travel_ids):
+    from django.db import connection
+
+    from journey.models import Passenger, Travel
+
+    reset(travel_ids)
+    connection.close()
+
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(workers)
+    wins = context.Array("i", len(travel_ids))
+    processes = [
+        context.Process(target=worker, args=(name, travel_ids, seed, barrier, wins))
+        for seed in range(workers)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    rows = Travel.objects.filter(pk__in=travel_ids).values_list("pk", "status", "info__status")
+    trips = dict(Passenger.objects.values_list("travels__travel_id", "total_trips"))
+    split_status = wrong_trips = 0
+    for pk, travel_status, info_status in rows:
+        split_status += travel_status != info_status
+        wrong_trips += trips.get(pk, 0) != int(info_status == "completed")
+    return {
+        "travels": len(travel_ids),
+        "attempts": workers * len(travel_ids),
+        "multiple_winners": sum(1 for count in wins if count > 1),
+        "split_status": split_status,
+        "wrong_trip_counts": wrong_trips,
+        "failed_workers": sum(1 for process in processes if process.exitcode != 0),
+        "elapsed_s": round(elapsed, 3),
+        "attempts_per_s": round(workers * len(travel_ids) / elapsed, 1) if elapsed else None,
+    }
+
+
+def seed_travels(count):
+    from journey.models import Location, Passenger, Travel, TravelInfo
+
+    start, end = Location.objects.create(name="A", lat=41.30, lng=69.24), Location.objects.create(
+        name="B", lat=41.33, lng=69.30
+    )
+    travel_ids = []
+    for i in range(count):
+        passenger = Passenger.objects.create(telegram_id=800000000 + i, name="Bench", contact=f"+99890{i:07d}")
+        travel = Travel.objects.create(from_location=start, to_location=end, creator=passenger.telegram_id)
+        info = TravelInfo.objects.create(travel=travel)
+        info.passengers.add(passenger)
+        travel_ids.append(travel.pk)
+    return travel_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--travels", type=int, default=300)
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+    travel_ids = seed_travels(args.travels)
+
+    results = {}
+    for name in STRATEGIES:
+        results[name] = run(name, args.workers, travel_ids)
+        row = results[name]
+        print(
+            f"{name:>18} | {row['attempts']} attempts | multiple winners {row['multiple_winners']}"
+            f" | split status {row['split_status']} | wrong trip counts {row['wrong_trip_counts']}"
+            f" | {row['attempts_per_s']} attempts/s"
+        )
+
+    path = save_results("concurrent_transitions", results, args.output)
+    print(f"Results written to {path}")
+
+    cas = results["compare_and_set"]
+    if cas["multiple_winners"] or cas["split_status"] or cas["wrong_trip_counts"] or cas["failed_workers"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Demand heatmap: DemandCell aggregate vs aggregating Travel rows directly.
+
+A city-wide box over Tashkent is queried for several windows ending at the
+newest travel, once through journey.services.demand.heatmap and once as a
+Travel JOIN Location aggregate grouped by geohash prefix (range scan on the
+created_at index, the best the source table can do). Both must give the
+same counts for the cells that lie inside the box.
+
+History is then grown: existing travels are moved --days back, another
+--travels are generated over the most recent --days, the cells are rebuilt
+with backfill_demand_heatmap and the same queries are repeated. The
+aggregate should cost the same for the same window however long the
+history is.
+
+    python -m benchmarks.demand_heatmap --travels 200000 --rounds 2
+"""
+
+import argparse
+import io
+import time
+from datetime import timedelta
+
+from benchmarks.common import bootstrap, measure, save_results
+
+TASHKENT = {"min_lat": 41.15, "min_lng": 69.05, "max_lat": 41.47, "max_lng": 69.50}
+WINDOWS = {"1h": timedelta(hours=1), "24h": timedelta(hours=24), "7d": timedelta(days=7), "31d": timedelta(days=31)}
+
+
+def inside_box(bounds):
+    min_lat, min_lng, max_lat, max_lng = bounds[:4]
+    return (
+        min_lat >= TASHKENT["min_lat"] and max_lat <= TASHKENT["max_lat"]
+        and min_lng >= TASHKENT["min_lng"] and max_lng <= TASHKENT["max_lng"]
+    )
+
+
+def direct(since, until, precision):
+    """The same counts straight from Travel / Location."""
+    from django.db.models import Count
+    from django.db.models.functions import Substr
+
+    from journey.models import Travel
+
+    rows = (
+        Travel.objects.filter(
+            created_at__gte=since,
+            created_at__lt=until,
+            from_location__lat__range=(TASHKENT["min_lat"], TASHKENT["max_lat"]),
+            from_location__lng__range=(TASHKENT["min_lng"], TASHKENT["max_lng"]),
+        )
+        .values(cell=Substr("from_location__geohash", 1, precision))
+        .annotate(n=Count("id"))
+        .order_by()
+        .values_list("cell", "n")
+    )
+    return dict(rows)
+
+
+def queries(repeat):
+    from journey.models import Travel
+    from journey.services.demand import bucket_start, cell_bounds, demand_options, heatmap
+
+    options = demand_options()
+    newest = Travel.objects.order_by("-created_at").values_list("created_at", flat=True).first()
+    until = bucket_start(newest) + timedelta(minutes=options["BUCKET_MINUTES"])
+
+    results = {}
+    for name, window in WINDOWS.items():
+        since = until - window
+        result = heatmap(since=since, until=until, **TASHKENT)
+        # heatmap counts whole cells that touch the box, the direct query cuts
+        # at the box edge: compare the cells that lie inside the box
+        inside = {item["cell"] for item in result["cells"] if inside_box(cell_bounds(item["cell"]))}
+        expected = {cell: n for cell, n in direct(result["since"], until, result["precision"]).items() if cell in inside}
+        got = {item["cell"]: item["count"] for item in result["cells"] if item["cell"] in inside}
+        results[name] = {
+            "cells": len(result["cells"]),
+            "points": result["total"],
+            "matches_direct": got == expected,
+            "aggregate": measure(lambda: heatmap(since=since, until=until, **TASHKENT), repeat=repeat),
+            "direct": measure(lambda: direct(result["since"], until, result["precision"]), repeat=repeat),
+        }
+    return results
+
+
+def rebuild():
+    from django.core.management import call_command
+
+    started = time.perf_counter()
+    call_command("backfill_demand_heatmap", source="travel", stdout=io.StringIO())
+    return round(time.perf_counter() - started, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--travels", type=int, default=200_000, help="Travels added per round")
+    parser.add_argument("--days", type=int, default=365, help="History span added per round")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=31)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from django.core.management import call_command
+    from django.db.models import F
+
+    from journey.models import DemandCell, Travel
+
+    rounds = []
+    for number in range(args.rounds):
+        if number:
+            Travel.objects.update(created_at=F("created_at") - timedelta(days=args.days))
+        call_command(
+            "generate_synthetic_data",
+            travels=args.travels,
+            passengers=10_000,
+            drivers=1000,
+            locations=args.travels // 10,
+            user_locations=0,
+            roads_per_driver=0,
+            days=args.days,
+            seed=args.seed + number,
+            skip_derived=True,
+            verbosity=0,
+        )
+        row = {"travels": Travel.objects.count(), "rebuild_s": rebuild()}
+        row["cell_rows"] = DemandCell.objects.count()
+        row["windows"] = queries(args.repeat)
+        rounds.append(row)
+
+        print(f"history {row['travels']} travels -> {row['cell_rows']} cell rows (rebuild {row['rebuild_s']} s)")
+        for name, window in row["windows"].items():
+            print(
+                f"  {name:>3}: {window['points']} points in {window['cells']} cells"
+                f" | aggregate p50 {window['aggregate']['p50_ms']} ms"
+                f" | direct p50 {window['direct']['p50_ms']} ms"
+                f" | same counts {window['matches_direct']}"
+            )
+
+    path = save_results("demand_heatmap", {"args": vars(args), "rounds": rounds}, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
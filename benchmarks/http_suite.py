@@ -0,0 +1,376 @@
+"""
+HTTP benchmark suite for the journey API.
+
+Seeds a deterministic dataset, then replays a weighted mix of bot traffic
+(location posts, passenger lookups, travel create / update-status /
+assign-driver / list / stats) through Django's test client, so the full
+URL routing, middleware, DRF and ORM stack is exercised without network
+noise. Reports throughput, p50/p95/p99 latency and SQL queries per request
+for every endpoint and writes JSON that benchmarks.compare can diff.
+
+    python -m benchmarks.http_suite --travels 20000 --requests 5000
+    BENCH_DB_ENGINE=postgres python -m benchmarks.http_suite
+    python -m benchmarks.compare results/http_suite-<old>.json results/http_suite-<new>.json
+
+The same --seed always produces the same dataset and request sequence.
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from benchmarks.common import bootstrap, save_results, summarize
+
+API = "/api/v1/journey"
+BATCH_SIZE = 2000
+BASE_TELEGRAM_ID = 800000000
+DRIVER_TELEGRAM_ID = 810000000
+
+# Seeded points fall inside Tashkent
+LAT_RANGE = (41.20, 41.40)
+LNG_RANGE = (69.10, 69.35)
+
+# Lifecycle order used by update-status requests
+STATUS_FLOW = ["searching_driver", "driver_found", "arrived", "started", "completed"]
+
+
+def random_point(rng):
+    return (
+        round(rng.uniform(*LAT_RANGE), 7),
+        round(rng.uniform(*LNG_RANGE), 7),
+    )
+
+
+def seed(args, rng):
+    """Bulk-insert the dataset and rebuild the derived counters."""
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from django.utils import timezone
+
+    from journey.models import Driver, Location, Passenger, Travel, TravelInfo, TravelStatus, UserLocation
+    from journey.models.driver import DriverStatus
+    from journey.services.geo import encode_geohash
+    from journey.services.stats import rebuild_stats
+
+    started = time.perf_counter()
+    points = set()
+    while len(points) < args.locations + args.user_locations:
+        points.add(random_point(rng))
+    points = sorted(points)
+
+    with transaction.atomic():
+        locations = Location.objects.bulk_create(
+            [
+                Location(name=f"Place {i}", lat=lat, lng=lng, geohash=encode_geohash(lat, lng))
+                for i, (lat, lng) in enumerate(points)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        places, pings = locations[:args.locations], locations[args.locations:]
+
+        passengers = Passenger.objects.bulk_create(
+            [
+                Passenger(
+                    telegram_id=BASE_TELEGRAM_ID + i,
+                    name=f"Passenger {i}",
+                    contact=f"+99890{i:07d}",
+                    is_active=rng.random() < 0.9,
+                )
+                for i in range(args.passengers)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        drivers = Driver.objects.bulk_create(
+            [
+                Driver(
+                    telegram_id=DRIVER_TELEGRAM_ID + i,
+                    name=f"Driver {i}",
+                    contact=f"+99891{i:07d}",
+                    status=DriverStatus.ACTIVE if rng.random() < 0.6 else DriverStatus.INACTIVE,
+                    current_location=rng.choice(places),
+                )
+                for i in range(args.drivers)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        UserLocation.objects.bulk_create(
+            [
+                UserLocation(user=rng.choice(passengers).telegram_id, location=location)
+                for location in pings
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        finished = [TravelStatus.COMPLETED] * 8 + [TravelStatus.CANCELLED, TravelStatus.FAILED]
+        now = timezone.now()
+        travels, infos = [], []
+        for _ in range(args.travels):
+            status = (
+                rng.choice(STATUS_FLOW[:-1]) if rng.random() < args.active_share
+                else rng.choice(finished)
+            )
+            from_location, to_location = rng.sample(places, 2)
+            travels.append(Travel(
+                from_location=from_location,
+                to_location=to_location,
+                creator=rng.choice(passengers).telegram_id,
+                driver=rng.choice(drivers) if status != TravelStatus.SEARCHING_DRIVER else None,
+                expected_price=Decimal(rng.randrange(10, 200) * 1000),
+                final_price=(
+                    Decimal(rng.randrange(10, 200) * 1000)
+                    if status == TravelStatus.COMPLETED else None
+                ),
+                status=status,
+                completed_at=now if status == TravelStatus.COMPLETED else None,
+            ))
+            infos.append(TravelInfo(
+                status=status,
+                driver_rating=rng.randint(3, 5) if status == TravelStatus.COMPLETED else None,
+            ))
+        travels = Travel.objects.bulk_create(travels, batch_size=BATCH_SIZE)
+        for travel, info in zip(travels, infos):
+            info.travel = travel
+        infos = TravelInfo.objects.bulk_create(infos, batch_size=BATCH_SIZE)
+
+        through = TravelInfo.passengers.through
+        through.objects.bulk_create(
+            [
+                through(travelinfo_id=info.pk, passenger_id=passenger.pk)
+                for info in infos
+                for passenger in rng.sample(passengers, rng.randint(1, 3))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        rebuild_stats()
+
+    user = get_user_model().objects.create_user("bench", password="bench")
+    return {
+        "user": user,
+        "location_ids": [location.pk for location in places],
+        "passenger_ids": [passenger.telegram_id for passenger in passengers],
+        "driver_ids": [driver.pk for driver in drivers],
+        "travel_ids": [travel.pk for travel in travels],
+        # Travels created during the run: {id: index of their next STATUS_FLOW step}
+        "open_travels": {},
+        "seed_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+# Scenarios take (client, dataset, rng) and return the response; the function
+# name is the endpoint name in the results.
+
+def location_post(client, data, rng):
+    lat, lng = random_point(rng)
+    return client.post(f"{API}/locations/create-user-location/", {
+        "telegram_id": rng.choice(data["passenger_ids"]),
+        "name": "Live location",
+        "coordinate": {"lat": lat, "lng": lng},
+        "accuracy": 12.5,
+        "heading": rng.randrange(360),
+    }, content_type="application/json")
+
+
+def location_latest(client, data, rng):
+    return client.get(f"{API}/locations/user-latest/{rng.choice(data['passenger_ids'])}/")
+
+
+def passenger_by_telegram(client, data, rng):
+    return client.get(f"{API}/passengers/by-telegram/", {"telegram_id": rng.choice(data["passenger_ids"])})
+
+
+def passenger_stats(client, data, rng):
+    return client.get(f"{API}/passengers/stats/")
+
+
+def travel_create(client, data, rng):
+    from_id, to_id = rng.sample(data["location_ids"], 2)
+    response = client.post(f"{API}/travels/", {
+        "from_location_id": from_id,
+        "to_location_id": to_id,
+        "creator": rng.choice(data["passenger_ids"]),
+        "expected_price": "25000.00",
+    }, content_type="application/json")
+    if response.status_code == 201:
+        data["open_travels"][response.json()["id"]] = 0
+    return response
+
+
+def travel_update_status(client, data, rng):
+    if not data["open_travels"]:
+        return travel_create(client, data, rng)
+    travel_id = rng.choice(list(data["open_travels"]))
+    step = data["open_travels"][travel_id]
+    response = client.post(
+        f"{API}/travels/{travel_id}/update-status/",
+        {"status": STATUS_FLOW[step]},
+        content_type="application/json",
+    )
+    if step + 1 == len(STATUS_FLOW):
+        del data["open_travels"][travel_id]
+    else:
+        data["open_travels"][travel_id] = step + 1
+    return response
+
+
+def travel_assign_driver(client, data, rng):
+    travel_id = rng.choice(list(data["open_travels"]) or data["travel_ids"])
+    return client.post(
+        f"{API}/travels/{travel_id}/assign-driver/",
+        {"driver_id": rng.choice(data["driver_ids"])},
+        content_type="application/json",
+    )
+
+
+def travel_list(client, data, rng):
+    return client.get(f"{API}/travels/", {"page_size": 50})
+
+
+def travel_active(client, data, rng):
+    return client.get(f"{API}/travels/active/")
+
+
+def travel_detail(client, data, rng):
+    return client.get(f"{API}/travels/{rng.choice(data['travel_ids'])}/")
+
+
+def travel_by_creator(client, data, rng):
+    return client.get(f"{API}/travels/by-creator/", {"creator_id": rng.choice(data["passenger_ids"])})
+
+
+def travel_stats(client, data, rng):
+    return client.get(f"{API}/travels/stats/")
+
+
+MIXES = {
+    # Telegram bot traffic: mostly live locations and passenger lookups
+    "bot": {
+        location_post: 25,
+        location_latest: 10,
+        passenger_by_telegram: 15,
+        passenger_stats: 2,
+        travel_create: 8,
+        travel_update_status: 10,
+        travel_assign_driver: 5,
+        travel_list: 8,
+        travel_active: 4,
+        travel_detail: 6,
+        travel_by_creator: 5,
+        travel_stats: 2,
+    },
+    "read_heavy": {
+        location_latest: 20,
+        passenger_by_telegram: 25,
+        travel_list: 15,
+        travel_active: 10,
+        travel_detail: 15,
+        travel_by_creator: 10,
+        travel_stats: 3,
+        passenger_stats: 2,
+    },
+    "write_heavy": {
+        location_post: 50,
+        travel_create: 15,
+        travel_update_status: 25,
+        travel_assign_driver: 10,
+    },
+}
+
+
+def run_mix(client, data, rng, mix, count, record):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    scenarios = list(mix)
+    weights = [mix[scenario] for scenario in scenarios]
+    for scenario in rng.choices(scenarios, weights, k=count):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = scenario(client, data, rng)
+            elapsed = (time.perf_counter() - start) * 1000
+        if record is not None:
+            record(scenario.__name__, elapsed, len(queries), response.status_code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="bot")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--locations", type=int, default=2000)
+    parser.add_argument("--user-locations", type=int, default=20000)
+    parser.add_argument("--passengers", type=int, default=10000)
+    parser.add_argument("--drivers", type=int, default=500)
+    parser.add_argument("--travels", type=int, default=20000)
+    parser.add_argument("--active-share", type=float, default=0.05,
+                        help="share of seeded travels that are still in progress")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from django.core.cache import caches
+    from django.test import Client
+
+    rng = random.Random(args.seed)
+    data = seed(args, rng)
+    print(f"seeded in {data['seed_seconds']} s")
+
+    for cache in caches.all():
+        cache.clear()
+
+    client = Client()
+    client.force_login(data["user"])
+    run_mix(client, data, rng, MIXES[args.mix], args.warmup, record=None)
+
+    samples = {}
+
+    def record(name, elapsed, queries, status_code):
+        row = samples.setdefault(name, {"latency": [], "queries": [], "errors": {}})
+        row["latency"].append(elapsed)
+        row["queries"].append(queries)
+        if status_code >= 400:
+            row["errors"][status_code] = row["errors"].get(status_code, 0) + 1
+
+    started = time.perf_counter()
+    run_mix(client, data, rng, MIXES[args.mix], args.requests, record)
+    duration = time.perf_counter() - started
+
+    endpoints = {}
+    for name, row in sorted(samples.items()):
+        busy = sum(row["latency"]) / 1000
+        endpoints[name] = {
+            **summarize(row["latency"]),
+            "rps": round(len(row["latency"]) / busy, 1) if busy else None,
+            "queries_mean": round(sum(row["queries"]) / len(row["queries"]), 2),
+            "queries_max": max(row["queries"]),
+            "errors": row["errors"],
+        }
+
+    all_latency = [value for row in samples.values() for value in row["latency"]]
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "seed_seconds": data["seed_seconds"],
+        "duration_s": round(duration, 3),
+        "rps": round(args.requests / duration, 1),
+        "overall": summarize(all_latency),
+        "endpoints": endpoints,
+    }
+
+    print(f"{'endpoint':<24}{'count':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'errors':>8}")
+    for name, row in endpoints.items():
+        print(
+            f"{name:<24}{row['count']:>7}{row['rps']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+            f"{row['p99_ms']:>9}{row['queries_mean']:>9}{sum(row['errors'].values()):>8}"
+        )
+    print(f"overall: {results['rps']} req/s, p99 {results['overall']['p99_ms']} ms")
+
+    path = save_results(f"http_suite-{args.mix}", results, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Travel list serialization: TravelDetailSerializer vs the values() fast path.
+
+Generates a synthetic dataset, then
+
+1. parity: walks every page of the list, by-creator, by-driver and active
+   endpoints with TRAVEL_FAST_LIST off and on and asserts the response
+   bodies are byte-identical;
+2. speed: fetches and renders --rows travels both ways and reports the
+   cost per 1,000 rows, split into query + serialization and
+   serialization alone, plus the end-to-end latency of a full page.
+
+    python -m benchmarks.list_serialization --travels 20000 --rows 1000
+"""
+
+import argparse
+import random
+
+from benchmarks.common import bootstrap, measure, save_results
+
+API = "/api/v1/journey"
+
+
+def walk(client, path, params, limit):
+    """Yield the body of every page (following `next` links) up to `limit` pages."""
+    url, query = path, params
+    for _ in range(limit):
+        response = client.get(url, query)
+        assert response.status_code == 200, (url, response.status_code)
+        yield response.content
+        next_url = response.json()["next"]
+        if not next_url:
+            return
+        url, query = next_url, None
+
+
+def check_parity(args, rng):
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from journey.models import Travel
+
+    creators = list(Travel.objects.values_list("creator", flat=True).distinct()[:2000])
+    drivers = list(Travel.objects.filter(driver__isnull=False).values_list("driver_id", flat=True).distinct()[:2000])
+    cases = [
+        ("list", f"{API}/travels/", {"page_size": 500}),
+        ("list_ascending", f"{API}/travels/", {"page_size": 200, "ordering": "created_at"}),
+        ("list_filtered", f"{API}/travels/", {"status": "completed", "page_size": 100}),
+        ("list_search", f"{API}/travels/", {"search": "a", "page_size": 100}),
+        ("active", f"{API}/travels/active/", {"page_size": 500}),
+    ]
+    cases += [("by_creator", f"{API}/travels/by-creator/", {"creator_id": c}) for c in rng.sample(creators, 20)]
+    cases += [("by_driver", f"{API}/travels/by-driver/", {"driver_id": d}) for d in rng.sample(drivers, 20)]
+
+    client = Client()
+    pages = rows = 0
+    for name, path, params in cases:
+        with override_settings(TRAVEL_FAST_LIST=False):
+            expected = list(walk(client, path, params, args.max_pages))
+        with override_settings(TRAVEL_FAST_LIST=True):
+            actual = list(walk(client, path, params, args.max_pages))
+        assert len(expected) == len(actual), name
+        for old, new in zip(expected, actual):
+            assert old == new, f"{name}: responses differ\n{old[:300]}\n{new[:300]}"
+        pages += len(expected)
+        rows += sum(body.count(b'"duration_minutes"') for body in expected)
+    print(f"parity: {len(cases)} cases, {pages} pages, {rows} rows byte-identical")
+    return {"cases": len(cases), "pages": pages, "rows": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--travels", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per speed measurement")
+    parser.add_argument("--max-pages", type=int, default=10, help="pages walked per parity case")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import override_settings
+    from rest_framework.renderers import JSONRenderer
+
+    from journey.models import Travel
+    from journey.serializers.travel_serializers import TravelDetailSerializer, travel_detail_rows
+
+    call_command("generate_synthetic_data", travels=args.travels, seed=args.seed, skip_derived=True, verbosity=0)
+    rng = random.Random(args.seed)
+
+    parity = check_parity(args, rng)
+
+    renderer = JSONRenderer()
+    # Same queryset as TravelViewSet.get_queryset()
+    queryset = Travel.objects.select_related(
+        "from_location", "to_location", "driver"
+    ).prefetch_related("info__passengers").order_by("-created_at", "-id")
+    instances = list(queryset[:args.rows])
+    rows = list(travel_detail_rows.values(queryset)[:args.rows])
+    assert renderer.render(TravelDetailSerializer(instances, many=True).data) == renderer.render(
+        travel_detail_rows.to_representation(rows)
+    )
+
+    timings = {
+        "serializer_fetch_and_render": measure(
+            lambda: renderer.render(TravelDetailSerializer(list(queryset[:args.rows]), many=True).data),
+            repeat=args.repeat,
+        ),
+        "fast_fetch_and_render": measure(
+            lambda: renderer.render(
+                travel_detail_rows.to_representation(list(travel_detail_rows.values(queryset)[:args.rows]))
+            ),
+            repeat=args.repeat,
+        ),
+        "serializer_only": measure(
+            lambda: TravelDetailSerializer(instances, many=True).data, repeat=args.repeat
+        ),
+        "fast_only": measure(lambda: travel_detail_rows.to_representation(rows), repeat=args.repeat),
+    }
+
+    client = Client()
+    page_size = min(args.rows, 500)
+    for flag in (False, True):
+        with override_settings(TRAVEL_FAST_LIST=flag):
+            key = f"http_page_{page_size}_{'fast' if flag else 'serializer'}"
+            timings[key] = measure(
+                lambda: client.get(f"{API}/travels/", {"page_size": page_size}), repeat=args.repeat
+            )
+
+    per_thousand = {
+        name: round(summary["p50_ms"] * 1000 / (args.rows if not name.startswith("http") else page_size), 3)
+        for name, summary in timings.items()
+    }
+    for name, value in per_thousand.items():
+        print(f"{name:<32} p50 {timings[name]['p50_ms']:>9} ms   {value:>9} ms / 1000 rows")
+    for kind in ("fetch_and_render", "only"):
+        speedup = timings[f"serializer_{kind}"]["p50_ms"] / timings[f"fast_{kind}"]["p50_ms"]
+        print(f"speedup ({kind.replace('_', ' ')}): {speedup:.1f}x")
+
+    path = save_results("list_serialization", {
+        "travels": args.travels,
+        "rows": args.rows,
+        "parity": parity,
+        "timings": timings,
+        "ms_per_1000_rows": per_thousand,
+    }, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Operator phone lookups: contact__icontains vs the normalised phone columns.
+
+Generates passengers and drivers whose contacts are typed in mixed formats
+("+998901234567", "+998 90 123 45 67", "90 123-45-67", "8 (90) 123-45-67"),
+then looks numbers up the way operators type them: a full number in
+different spellings, the last 4 / 7 digits, an operator prefix.
+
+For every case the expected ids are computed in Python from the raw
+contacts. The indexed lookup must return exactly that set; the legacy
+substring filter is reported with its recall (numbers stored in another
+format are missed) and its false positives (a "tail" found in the middle
+of another number).
+
+    python -m benchmarks.phone_lookup --passengers 1000000
+    BENCH_DB_ENGINE=postgres python -m benchmarks.phone_lookup
+"""
+
+import argparse
+import time
+
+from benchmarks.common import bootstrap, measure, save_results
+
+
+def pick_cases(model):
+    """Terms for one passenger / driver stored in a non-E.164 spelling."""
+    row = model.objects.exclude(contact__startswith="+998").order_by("-pk").values("contact", "contact_e164").first()
+    e164 = row["contact_e164"]
+    national = e164[4:]
+    return {
+        "full_e164": e164,
+        "full_spaced": f"+998 {national[:2]} {national[2:5]} {national[5:7]} {national[7:]}",
+        "full_local": f"{national[:2]} {national[2:5]} {national[5:7]} {national[7:]}",
+        "as_stored": row["contact"],
+        "full_digits": e164[1:],
+        "tail_7": national[-7:],
+        "tail_4": national[-4:],
+        "operator_prefix": "+99890",
+    }
+
+
+def expected_ids(contacts, term):
+    from journey.services.phones import digits_of, normalize_phone
+
+    digits = digits_of(term)
+    if term.startswith("+"):
+        return {pk for pk, contact in contacts if normalize_phone(contact).startswith("+" + digits)}
+    if len(digits) > 9:
+        return {pk for pk, contact in contacts if normalize_phone(contact) == normalize_phone(term)}
+    return {pk for pk, contact in contacts if normalize_phone(contact)[1:].endswith(digits)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passengers", type=int, default=1_000_000)
+    parser.add_argument("--drivers", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    from journey.models import Driver, Passenger
+    from journey.services.phones import phone_q
+
+    started = time.perf_counter()
+    call_command(
+        "generate_synthetic_data",
+        travels=0,
+        passengers=args.passengers,
+        drivers=args.drivers,
+        locations=1000,
+        user_locations=0,
+        roads_per_driver=0,
+        seed=args.seed,
+        skip_derived=True,
+        verbosity=0,
+    )
+    generation_s = round(time.perf_counter() - started, 1)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    results = []
+    for model in (Passenger, Driver):
+        contacts = list(model.objects.values_list("pk", "contact"))
+        for label, term in pick_cases(model).items():
+            expected = expected_ids(contacts, term)
+            indexed = model.objects.filter(phone_q(term))
+            legacy = model.objects.filter(contact__icontains=term)
+            assert set(indexed.values_list("pk", flat=True)) == expected, (model.__name__, term)
+            found = set(legacy.values_list("pk", flat=True))
+
+            row = {
+                "table": model._meta.db_table,
+                "case": label,
+                "term": term,
+                "matches": len(expected),
+                "legacy_recall": round(len(found & expected) / len(expected), 3) if expected else None,
+                "legacy_false_positives": len(found - expected),
+                "legacy": measure(lambda: list(legacy.values_list("pk", flat=True)), repeat=args.repeat, warmup=1),
+                "indexed": measure(lambda: list(indexed.values_list("pk", flat=True)), repeat=args.repeat, warmup=1),
+            }
+            results.append(row)
+            print(
+                f"{model.__name__:<10} {label:<16} {term!r:<22} {len(expected):>8} rows "
+                f"(legacy recall {row['legacy_recall']}, +{row['legacy_false_positives']} wrong) | "
+                f"{row['legacy']['p50_ms']:>9} -> {row['indexed']['p50_ms']:>8} ms"
+            )
+
+    path = save_results("phone_lookup", {
+        "passengers": args.passengers,
+        "drivers": args.drivers,
+        "generation_s": generation_s,
+        "cases": results,
+    }, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Server-side distance / ETA: per-pair geopy vs vectorised geodesic + pair cache.
+
+1. Kernel: geopy.distance.geodesic in a Python loop vs
+   journey.services.geo_vector.geodesic_km on the same arrays, with the
+   largest difference between them.
+2. Single lookups through journey.services.routes.distance_matrix for a
+   pair in the in-process LRU, in the LocationDistance table, and a miss.
+3. Backfill: synthetic travels have distance_km / estimated_duration_min
+   cleared and refilled by `manage.py backfill_route_estimates`, cold
+   (empty pair table) and warm (table filled, LRU cleared). A per-travel
+   geopy loop without any cache over the first --baseline travels is the
+   reference.
+
+    python -m benchmarks.route_estimates --travels 200000
+"""
+
+import argparse
+import io
+import time
+
+from benchmarks.common import bootstrap, measure, save_results
+
+
+def kernel(pairs, seed):
+    import numpy as np
+    from geopy.distance import geodesic
+
+    from journey.services.geo_vector import geodesic_km
+
+    rng = np.random.default_rng(seed)
+    # Uzbekistan-sized box, city and intercity pairs mixed
+    lat1 = rng.uniform(37.2, 45.6, pairs)
+    lng1 = rng.uniform(56.0, 73.2, pairs)
+    spread = np.where(rng.random(pairs) < 0.9, 0.1, 2.0)
+    lat2 = lat1 + rng.normal(0, 1, pairs) * spread
+    lng2 = lng1 + rng.normal(0, 1, pairs) * spread
+
+    started = time.perf_counter()
+    reference = np.array([geodesic((a, b), (c, d)).km for a, b, c, d in zip(lat1, lng1, lat2, lng2)])
+    geopy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorised = geodesic_km(lat1, lng1, lat2, lng2)
+    numpy_s = time.perf_counter() - started
+
+    return {
+        "pairs": pairs,
+        "geopy_s": round(geopy_s, 3),
+        "vectorised_s": round(numpy_s, 4),
+        "speedup": round(geopy_s / numpy_s, 1),
+        "max_abs_error_m": float(np.abs(reference - vectorised).max() * 1000),
+    }
+
+
+def lookups(repeat):
+    from journey.models import Location, LocationDistance
+    from journey.services.routes import distance_matrix
+
+    first, second, third = Location.objects.order_by("pk")[:3]
+    pair = [(first, second)]
+    distance_matrix.distances_km(pair)
+
+    def from_table():
+        distance_matrix.local.clear()
+        distance_matrix.distances_km(pair)
+
+    def miss():
+        distance_matrix.local.clear()
+        LocationDistance.objects.filter(from_location=first, to_location=third).delete()
+        distance_matrix.distances_km([(first, third)])
+
+    return {
+        "lru": measure(lambda: distance_matrix.distances_km(pair), repeat=repeat),
+        "table": measure(from_table, repeat=repeat),
+        "miss": measure(miss, repeat=repeat),
+    }
+
+
+def clear_estimates():
+    from journey.models import LocationDistance, Travel
+    from journey.services.routes import distance_matrix
+
+    Travel.objects.update(distance_km=None, estimated_duration_min=None)
+    LocationDistance.objects.all().delete()
+    distance_matrix.local.clear()
+    distance_matrix.counter.reset()
+
+
+def backfill():
+    from django.core.management import call_command
+
+    from journey.services.routes import distance_matrix
+
+    distance_matrix.local.clear()
+    distance_matrix.counter.reset()
+    started = time.perf_counter()
+    call_command("backfill_route_estimates", stdout=io.StringIO())
+    return {"seconds": round(time.perf_counter() - started, 2), **distance_matrix.stats()}
+
+
+def per_travel_geopy(limit):
+    """No cache, no batching: one geopy call and one UPDATE per travel."""
+    from geopy.distance import geodesic
+
+    from journey.models import Travel
+    from journey.services.routes import duration_min, road_distance_km
+
+    travels = list(Travel.objects.select_related("from_location", "to_location").order_by("pk")[:limit])
+    started = time.perf_counter()
+    for travel in travels:
+        distance = geodesic(
+            (travel.from_location.lat, travel.from_location.lng), (travel.to_location.lat, travel.to_location.lng)
+        ).km
+        road_km = round(road_distance_km(distance), 2)
+        Travel.objects.filter(pk=travel.pk).update(distance_km=road_km, estimated_duration_min=duration_min(road_km))
+    elapsed = time.perf_counter() - started
+    return {"travels": len(travels), "seconds": round(elapsed, 2), "per_travel_ms": round(elapsed / len(travels) * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--travels", type=int, default=200_000)
+    parser.add_argument("--locations", type=int, default=20_000)
+    parser.add_argument("--kernel-pairs", type=int, default=50_000)
+    parser.add_argument("--baseline", type=int, default=20_000, help="Travels in the per-travel geopy reference")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=29)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from django.core.management import call_command
+    from django.db.models import Count
+
+    from journey.models import LocationDistance, Travel
+
+    results = {"kernel": kernel(args.kernel_pairs, args.seed)}
+    row = results["kernel"]
+    print(
+        f"kernel: {row['pairs']} pairs | geopy {row['geopy_s']} s -> vectorised {row['vectorised_s']} s"
+        f" ({row['speedup']}x) | max error {row['max_abs_error_m']:.2e} m"
+    )
+
+    call_command(
+        "generate_synthetic_data",
+        travels=args.travels,
+        passengers=10_000,
+        drivers=1000,
+        locations=args.locations,
+        user_locations=0,
+        roads_per_driver=0,
+        seed=args.seed,
+        skip_derived=True,
+        verbosity=0,
+    )
+    pair_counts = list(
+        Travel.objects.values("from_location_id", "to_location_id").annotate(n=Count("id")).values_list("n", flat=True)
+    )
+    results["dataset"] = {
+        "travels": args.travels,
+        "distinct_pairs": len(pair_counts),
+        "top_100_pairs_share": round(sum(sorted(pair_counts, reverse=True)[:100]) / args.travels, 3),
+    }
+    print(f"dataset: {results['dataset']}")
+
+    results["lookup"] = lookups(args.repeat)
+    print("lookup p50 ms: " + " | ".join(f"{name} {row['p50_ms']}" for name, row in results["lookup"].items()))
+
+    clear_estimates()
+    results["per_travel_geopy"] = per_travel_geopy(args.baseline)
+    clear_estimates()
+    results["backfill_cold"] = backfill()
+    Travel.objects.update(distance_km=None, estimated_duration_min=None)
+    results["backfill_warm"] = backfill()
+    results["pair_rows"] = LocationDistance.objects.count()
+
+    baseline = results["per_travel_geopy"]
+    print(
+        f"per-travel geopy: {baseline['per_travel_ms']} ms/travel"
+        f" (~{round(baseline['per_travel_ms'] * args.travels / 1000, 1)} s for {args.travels})"
+    )
+    for name in ("backfill_cold", "backfill_warm"):
+        row = results[name]
+        print(
+            f"{name}: {row['seconds']} s | pairs cached {row['local_hits']}, table {row['table_hits']},"
+            f" computed {row['misses']}"
+        )
+
+    path = save_results("route_estimates", results, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Name / phone search: leading-wildcard icontains scans vs the search index.
+
+Generates a synthetic dataset with millions of locations and passengers,
+then times the old filter expressions (icontains through joins) against
+journey.services.search (SQLite FTS5 trigram tables, PostgreSQL pg_trgm
+GIN indexes) for selective and common terms. Every case first asserts
+both sides return the same rows. Phone-number terms go through the
+normalised phone columns instead and are measured in benchmarks.phone_lookup.
+
+    python -m benchmarks.search --passengers 1000000 --locations 1000000 --travels 200000
+    BENCH_DB_ENGINE=postgres python -m benchmarks.search
+
+"all" fetches every matching id (unpaginated passenger list); "page"
+fetches the first 50 travels by created_at (keyset-paginated travel list).
+"""
+
+import argparse
+import time
+
+from benchmarks.common import bootstrap, measure, save_results
+
+TRAVEL_FIELDS = ["from_location__name", "to_location__name", "driver__name"]
+PASSENGER_FIELDS = ["name", "contact", "telegram_id"]
+PAGE_SIZE = 50
+
+
+def legacy_travels(value):
+    from django.db.models import Q
+    from journey.models import Travel
+
+    return Travel.objects.filter(
+        Q(from_location__name__icontains=value)
+        | Q(to_location__name__icontains=value)
+        | Q(driver__name__icontains=value)
+    )
+
+
+def legacy_passengers(value, telegram_substring=True):
+    from django.db.models import Q
+    from journey.models import Passenger
+
+    condition = Q(name__icontains=value) | Q(contact__icontains=value)
+    if telegram_substring:
+        condition |= Q(telegram_id__icontains=value)
+    elif value.isdigit():
+        # The index path matches telegram_id exactly instead of as a substring
+        condition |= Q(telegram_id=int(value))
+    return Passenger.objects.filter(condition)
+
+
+def indexed_travels(value):
+    from journey.models import Travel
+    from journey.services.search import filter_search
+
+    return filter_search(Travel.objects.all(), TRAVEL_FIELDS, value)
+
+
+def indexed_passengers(value):
+    from journey.models import Passenger
+    from journey.services.search import filter_search
+
+    return filter_search(Passenger.objects.all(), PASSENGER_FIELDS, value)
+
+
+def pick_terms():
+    """Selective and common terms taken from the generated data."""
+    from journey.models import Location, Passenger, Travel
+
+    location = Location.objects.filter(pk=Travel.objects.order_by("-pk").values("from_location_id")[:1]).get()
+    passenger = Passenger.objects.order_by("-pk").first()
+    return {
+        "travels": {
+            "place_exact": location.name,
+            "place_number": location.name.split("#")[1][:5],
+            "city": "Nukus",
+            "driver_surname": "Xolmatov",
+        },
+        "passengers": {
+            "full_name": passenger.name,
+            "surname": "Karimov",
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passengers", type=int, default=1_000_000)
+    parser.add_argument("--locations", type=int, default=1_000_000)
+    parser.add_argument("--travels", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    bootstrap(fresh=True)
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    started = time.perf_counter()
+    call_command(
+        "generate_synthetic_data",
+        travels=args.travels,
+        passengers=args.passengers,
+        locations=args.locations,
+        user_locations=1000,
+        seed=args.seed,
+        skip_derived=True,
+        verbosity=0,
+    )
+    generation_s = round(time.perf_counter() - started, 1)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    queries = {
+        "travels": (legacy_travels, indexed_travels),
+        "passengers": (legacy_passengers, indexed_passengers),
+    }
+    results = []
+    for table, terms in pick_terms().items():
+        legacy, indexed = queries[table]
+        for label, term in terms.items():
+            reference = legacy(term) if table == "travels" else legacy(term, telegram_substring=False)
+            expected = set(reference.values_list("pk", flat=True))
+            assert expected == set(indexed(term).values_list("pk", flat=True)), (table, term)
+
+            row = {"table": table, "case": label, "term": term, "matches": len(expected)}
+            for name, build in (("legacy", legacy), ("indexed", indexed)):
+                row[f"{name}_all"] = measure(
+                    lambda: list(build(term).values_list("pk", flat=True)), repeat=args.repeat, warmup=1
+                )
+                if table == "travels":
+                    row[f"{name}_page"] = measure(
+                        lambda: list(build(term).order_by("-created_at", "-pk").values_list("pk", flat=True)[:PAGE_SIZE]),
+                        repeat=args.repeat, warmup=1,
+                    )
+            results.append(row)
+
+            line = (
+                f"{table:<10} {label:<15} {len(expected):>8} rows | all: "
+                f"{row['legacy_all']['p50_ms']:>9} -> {row['indexed_all']['p50_ms']:>8} ms"
+            )
+            if table == "travels":
+                line += f" | page: {row['legacy_page']['p50_ms']:>9} -> {row['indexed_page']['p50_ms']:>8} ms"
+            print(line)
+
+    path = save_results("search", {
+        "passengers": args.passengers,
+        "locations": args.locations,
+        "travels": args.travels,
+        "generation_s": generation_s,
+        "cases": results,
+    }, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
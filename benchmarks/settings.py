@@ -0,0 +1,50 @@
+"""
+Settings for benchmark runs.
+
+Uses a throwaway SQLite file by default so the project's db.sqlite3 is never
+touched. Set BENCH_DB_ENGINE=postgres (plus the usual PGHOST, PGPORT,
+PGDATABASE, PGUSER, PGPASSWORD variables) to run against a local Postgres.
+"""
+
+import os
+import tempfile
+
+from rideMain.settings import *  # noqa: F401,F403
+
+ALLOWED_HOSTS = ["*"]
+DEBUG = False
+
+if os.getenv("BENCH_DB_ENGINE") == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "HOST": os.getenv("PGHOST", "localhost"),
+            "PORT": os.getenv("PGPORT", "5432"),
+            "NAME": os.getenv("PGDATABASE", "ridemain_bench"),
+            "USER": os.getenv("PGUSER", "postgres"),
+            "PASSWORD": os.getenv("PGPASSWORD", ""),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv(
+                "BENCH_SQLITE_PATH",
+                os.path.join(tempfile.gettempdir(), "ridemain_bench.sqlite3"),
+            ),
+            # Wait for the write lock instead of failing when workers write concurrently.
+            # IMMEDIATE takes it at BEGIN: a deferred transaction that reads before
+            # writing gets "database is locked" without honouring the timeout.
+            "OPTIONS": {"timeout": 60, "transaction_mode": "IMMEDIATE"},
+        }
+    }
+
+# Side effects run inline by default so benchmarks that check counters right
+# after worker processes exit stay deterministic; benchmarks.background_tasks
+# switches backends itself.
+TASKS = {**TASKS, "BACKEND": os.getenv("BENCH_TASKS_BACKEND", "immediate")}  # noqa: F405
+
+# background_tasks and concurrent_transitions check trip counters that are only
+# bumped when completions are counted automatically.
+COUNT_TRIPS_ON_COMPLETE = True
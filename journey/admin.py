@@ -1,6 +1,22 @@
 # admin.py
 from django.contrib import admin
+from django.utils import timezone
 from .models import *
+from .services.phones import is_phone_like
+from .services.search import search_q
+
+
+class PhoneSearchMixin:
+    """
+    Telefon raqamga o'xshash qidiruv ('+998 90 123 45 67', '4567') bo'shliqlarga
+    bo'linmaydi va normallashtirilgan raqam indeksi orqali bajariladi.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if is_phone_like(search_term):
+            condition = search_q(self.model, self.get_search_fields(request), search_term.strip(), queryset.db)
+            return queryset.filter(condition), False
+        return super().get_search_results(request, queryset, search_term)
 
 
 @admin.register(Location)
@@ -78,7 +94,7 @@ class CarAdmin(admin.ModelAdmin):
 
 
 @admin.register(Driver)
-class DriverAdmin(admin.ModelAdmin):
+class DriverAdmin(PhoneSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'telegram_id', 'contact', 'car', 'status', 'rating', 'is_verified']
     list_filter = ['status', 'is_verified', 'created_at']
     search_fields = ['name', 'contact', 'telegram_id']
@@ -93,7 +109,7 @@ class DriverRoadAdmin(admin.ModelAdmin):
 
 
 @admin.register(Passenger)
-class PassengerAdmin(admin.ModelAdmin):
+class PassengerAdmin(PhoneSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'telegram_id', 'contact', 'rating', 'total_trips', 'is_active']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'contact', 'telegram_id']
@@ -103,17 +119,29 @@ class PassengerAdmin(admin.ModelAdmin):
 @admin.register(Travel)
 class TravelAdmin(admin.ModelAdmin):
     list_display = ['from_location', 'to_location', 'creator', 'driver', 'created_at', 'status']
-    list_filter = ['created_at', 'started_at', 'completed_at']
+    list_filter = ['status', 'created_at', 'started_at', 'completed_at']
+    list_select_related = ['from_location', 'to_location', 'driver']
     search_fields = ['creator', 'driver__name', 'from_location__name', 'to_location__name']
 
-    def status(self, obj):
-        return obj.info.status if hasattr(obj, 'info') else 'Noma\'lum'
-
-    status.short_description = 'Holati'
-
 @admin.register(TravelInfo)
 class TravelInfoAdmin(admin.ModelAdmin):
     list_display = ['travel', 'status', 'has_female', 'created_at']
     list_filter = ['status', 'has_female', 'created_at']
     search_fields = ['travel__from_location__name', 'travel__to_location__name']
     filter_horizontal = ['passengers']
+
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_after', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name']
+    readonly_fields = ['locked_at', 'last_error', 'created_at']
+    actions = ['requeue']
+
+    @admin.action(description="Tanlangan vazifalarni qayta navbatga qo'yish")
+    def requeue(self, request, queryset):
+        updated = queryset.update(
+            status=BackgroundTaskStatus.QUEUED, attempts=0, locked_at=None, run_after=timezone.now()
+        )
+        self.message_user(request, f"{updated} ta vazifa navbatga qo'yildi")
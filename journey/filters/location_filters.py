@@ -0,0 +1,13 @@
+import django_filters
+from journey.models import UserLocation
+
+
+class UserLocationFilter(django_filters.FilterSet):
+    telegram_id = django_filters.NumberFilter(field_name='user')
+    telegram_id__in = django_filters.BaseInFilter(field_name='user')
+    created_after = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='lte')
+
+    class Meta:
+        model = UserLocation
+        fields = ['telegram_id']
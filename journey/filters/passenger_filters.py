@@ -1,13 +1,14 @@
 import django_filters
-from django.db.models import Q
 from journey.models import Passenger
+from journey.services.phones import phone_q
+from journey.services.search import filter_search
 
 
 class PassengerFilter(django_filters.FilterSet):
     telegram_id = django_filters.NumberFilter(field_name='telegram_id')
     telegram_id__in = django_filters.BaseInFilter(field_name='telegram_id')
     name = django_filters.CharFilter(field_name='name', lookup_expr='icontains')
-    contact = django_filters.CharFilter(field_name='contact', lookup_expr='icontains')
+    contact = django_filters.CharFilter(method='filter_contact')
     is_active = django_filters.BooleanFilter(field_name='is_active')
     min_rating = django_filters.NumberFilter(field_name='rating', lookup_expr='gte')
     max_rating = django_filters.NumberFilter(field_name='rating', lookup_expr='lte')
@@ -18,13 +19,19 @@ class PassengerFilter(django_filters.FilterSet):
 
     search = django_filters.CharFilter(method='filter_search')
 
+    def filter_contact(self, queryset, name, value):
+        """
+        Telefon raqam bo'yicha (yozilish shaklidan qat'i nazar): '+998 90...' - raqam boshi,
+        to'liq raqam yoki uning oxirgi raqamlari. Hammasi normallashtirilgan ustun indeksi orqali.
+        """
+        condition = phone_q(value)
+        if condition is None:
+            return queryset.filter(contact__icontains=value)
+        return queryset.filter(condition)
+
     def filter_search(self, queryset, name, value):
-        """Umumiy qidiruv"""
-        return queryset.filter(
-            Q(name__icontains=value) |
-            Q(contact__icontains=value) |
-            Q(telegram_id__icontains=value)
-        )
+        """Umumiy qidiruv (ism va telefon - qidiruv indeksi, telegram_id - to'liq moslik)"""
+        return filter_search(queryset, ['name', 'contact', 'telegram_id'], value)
 
     class Meta:
         model = Passenger
@@ -0,0 +1,52 @@
+from django.db.models import Q
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from journey.services import phones
+from journey.services import search as search_service
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    DRF SearchFilter, `search_fields` qidiruv indeksi orqali (journey.services.search).
+
+    Har bir so'z istalgan maydonda bo'lishi kerak (SearchFilter kabi), lekin
+    indekslangan ustunlar uchun join va `LIKE '%...%'` o'rniga FTS5 / trigram
+    subquery ishlatiladi. `^`, `=`, `@`, `$` prefiksli maydonlar odatdagidek qoladi.
+
+    View da `rank_search_results = True` bo'lsa va `ordering` so'ralmagan bo'lsa,
+    natijalar moslik darajasi bo'yicha tartiblanadi (OrderingFilter dan keyin qo'yiladi).
+    """
+
+    def get_search_terms(self, request):
+        # "+998 90 123 45 67" bo'shliqlari bilan ham bitta telefon raqam
+        value = request.query_params.get(self.search_param, '')
+        if phones.is_phone_like(value):
+            return [value.strip()]
+        return super().get_search_terms(request)
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        indexed = [field for field in search_fields if field[0] not in self.lookup_prefixes]
+        prefixed = [field for field in search_fields if field[0] in self.lookup_prefixes]
+        lookups = [self.construct_search(str(field), queryset) for field in prefixed]
+
+        for term in search_terms:
+            condition = search_service.search_q(queryset.model, indexed, term, queryset.db)
+            for lookup in lookups:
+                condition |= Q(**{lookup: term})
+            queryset = queryset.filter(condition)
+        if prefixed and self.must_call_distinct(queryset, prefixed):
+            queryset = queryset.distinct()
+
+        if getattr(view, 'rank_search_results', False) and not self.ordering_requested(request, view):
+            rank = search_service.rank_expression(queryset.model, indexed, ' '.join(search_terms))
+            queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', *queryset.query.order_by)
+        return queryset
+
+    def ordering_requested(self, request, view):
+        return bool(request.query_params.get(api_settings.ORDERING_PARAM))
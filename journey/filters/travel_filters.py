@@ -1,12 +1,12 @@
 import django_filters
-from django.db.models import Q
 from journey.models import Travel, TravelInfo, TravelStatus
+from journey.services.search import filter_search
 
 
 class TravelFilter(django_filters.FilterSet):
     creator = django_filters.NumberFilter(field_name='creator')
     driver = django_filters.NumberFilter(field_name='driver_id')
-    status = django_filters.ChoiceFilter(field_name='info__status', choices=TravelStatus.choices)
+    status = django_filters.ChoiceFilter(field_name='status', choices=TravelStatus.choices)
 
     from_location = django_filters.NumberFilter(field_name='from_location_id')
     to_location = django_filters.NumberFilter(field_name='to_location_id')
@@ -28,11 +28,8 @@ class TravelFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(method='filter_search')
 
     def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            Q(from_location__name__icontains=value) |
-            Q(to_location__name__icontains=value) |
-            Q(driver__name__icontains=value)
-        )
+        # Qidiruv indeksi orqali: joylar va haydovchi jadvallari bilan join qilinmaydi
+        return filter_search(queryset, ['from_location__name', 'to_location__name', 'driver__name'], value)
 
     class Meta:
         model = Travel
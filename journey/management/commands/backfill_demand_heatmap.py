@@ -0,0 +1,51 @@
+import argparse
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from journey.models import DemandSource
+from journey.services.demand import demand_options, rebuild_demand
+
+
+def aware_datetime(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise argparse.ArgumentTypeError(f"not an ISO datetime: {value}")
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the demand heatmap cells from travel origins and user locations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            choices=[*DemandSource.values, "all"],
+            default="all",
+            help="Which points to rebuild (user_location is skipped when DEMAND_HEATMAP['USER_LOCATIONS'] is off)",
+        )
+        parser.add_argument(
+            "--since",
+            type=aware_datetime,
+            help="Only rebuild buckets from this ISO datetime on (default: the whole history)",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["source"] == "all":
+            sources = [DemandSource.TRAVEL]
+            if demand_options()["USER_LOCATIONS"]:
+                sources.append(DemandSource.USER_LOCATION)
+        else:
+            sources = [options["source"]]
+
+        for source in sources:
+            started = time.perf_counter()
+            points, cells = rebuild_demand(source, since=options["since"], batch_size=options["batch_size"])
+            self.stdout.write(
+                f"{source}: {points} points -> {cells} cells in {time.perf_counter() - started:.1f} s"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Demand heatmap rebuilt ✅"))
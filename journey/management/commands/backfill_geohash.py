@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from journey.models import Location
+from journey.services.geo import encode_geohash
+
+
+class Command(BaseCommand):
+    help = "Fills the geohash grid key for locations that do not have one yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute geohash for every location, not only empty ones",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Location.objects.order_by("pk")
+        if not options["all"]:
+            queryset = queryset.filter(geohash="")
+
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).only("pk", "lat", "lng")[:batch_size])
+            if not batch:
+                break
+
+            for location in batch:
+                location.geohash = encode_geohash(location.lat, location.lng)
+
+            with transaction.atomic():
+                Location.objects.bulk_update(batch, ["geohash"])
+
+            last_pk = batch[-1].pk
+            updated += len(batch)
+            self.stdout.write(f"{updated} locations updated...")
+
+        self.stdout.write(self.style.SUCCESS(f"Geohash backfill finished: {updated} locations ✅"))
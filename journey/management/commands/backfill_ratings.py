@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.core.management.base import BaseCommand
+
+from journey.models import Driver, Passenger, TravelInfo
+
+
+class Command(BaseCommand):
+    help = "Computes rating_sum / rating_count (and the average rating) for drivers and passengers from TravelInfo ratings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        drivers = self.backfill(
+            Driver,
+            batch_size,
+            lambda ids: TravelInfo.objects.filter(
+                travel__driver_id__in=ids, driver_rating__isnull=False
+            ).values_list("travel__driver_id").annotate(
+                total=Sum("driver_rating"), count=Count("driver_rating")
+            ),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Driver ratings backfilled: {drivers} drivers ✅"))
+
+        Membership = TravelInfo.passengers.through
+        passengers = self.backfill(
+            Passenger,
+            batch_size,
+            lambda ids: Membership.objects.filter(
+                passenger_id__in=ids, travelinfo__passenger_rating__isnull=False
+            ).values_list("passenger_id").annotate(
+                total=Sum("travelinfo__passenger_rating"), count=Count("travelinfo__passenger_rating")
+            ),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Passenger ratings backfilled: {passengers} passengers ✅"))
+
+    def backfill(self, model, batch_size, aggregate):
+        """Walks the table in pk chunks and rewrites the rating columns of each chunk."""
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "rating", "rating_sum", "rating_count")[:batch_size]
+            )
+            if not batch:
+                break
+
+            totals = {pk: (total, count) for pk, total, count in aggregate([obj.pk for obj in batch])}
+            for obj in batch:
+                obj.rating_sum, obj.rating_count = totals.get(obj.pk, (0, 0))
+                if obj.rating_count:
+                    # Without any ratings the current (default or manual) value is kept
+                    obj.rating = round(Decimal(obj.rating_sum) / obj.rating_count, 2)
+
+            with transaction.atomic():
+                model.objects.bulk_update(batch, ["rating", "rating_sum", "rating_count"])
+
+            last_pk = batch[-1].pk
+            updated += len(batch)
+            self.stdout.write(f"{updated} {model.__name__} rows processed...")
+
+        return updated
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from journey.models import Travel
+from journey.services.routes import distance_matrix, fill_route_estimates
+
+
+class Command(BaseCommand):
+    help = "Fills distance_km / estimated_duration_min for travels created without them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = (
+            Travel.objects.filter(Q(distance_km__isnull=True) | Q(estimated_duration_min__isnull=True))
+            .filter(from_location__isnull=False, to_location__isnull=False)
+            .select_related("from_location", "to_location")
+            .only(
+                "pk", "distance_km", "estimated_duration_min",
+                "from_location__lat", "from_location__lng", "from_location__geohash",
+                "to_location__lat", "to_location__lng", "to_location__geohash",
+            )
+            .order_by("pk")
+        )
+
+        started = time.perf_counter()
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+
+            with transaction.atomic():
+                filled = fill_route_estimates(batch)
+                Travel.objects.bulk_update(filled, ["distance_km", "estimated_duration_min"])
+
+            last_pk = batch[-1].pk
+            updated += len(filled)
+            self.stdout.write(f"{updated} travels updated...")
+
+        cache = distance_matrix.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Route estimates filled for {updated} travels in {time.perf_counter() - started:.1f} s "
+            f"(pairs: {cache['local_hits']} cached, {cache['table_hits']} from table, {cache['misses']} computed) ✅"
+        ))
@@ -0,0 +1,686 @@
+import multiprocessing
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from functools import lru_cache
+
+import numpy as np
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from journey.models import (
+    Car, CarType, Driver, DriverRoad, Location, Passenger, Travel, TravelInfo, TravelStatus, UserLocation,
+)
+from journey.models.driver import DriverStatus
+from journey.services.geo import encode_geohash, initial_bearing
+from journey.services.geo_vector import haversine_km
+from journey.services.phones import phone_index
+from journey.services.stats import rebuild_stats
+
+# (name, lat, lng, spread in degrees, share of the data)
+CITIES = [
+    ("Tashkent", 41.3111, 69.2797, 0.060, 0.42),
+    ("Samarkand", 39.6542, 66.9597, 0.035, 0.13),
+    ("Namangan", 40.9983, 71.6726, 0.030, 0.08),
+    ("Andijan", 40.7821, 72.3442, 0.030, 0.08),
+    ("Fergana", 40.3894, 71.7864, 0.030, 0.07),
+    ("Bukhara", 39.7747, 64.4286, 0.030, 0.07),
+    ("Qarshi", 38.8606, 65.7891, 0.025, 0.05),
+    ("Nukus", 42.4531, 59.6103, 0.025, 0.04),
+    ("Termez", 37.2242, 67.2783, 0.020, 0.03),
+    ("Urgench", 41.5500, 60.6333, 0.020, 0.03),
+]
+CITY_WEIGHTS = np.array([city[4] for city in CITIES])
+CITY_CUMULATIVE = np.cumsum(CITY_WEIGHTS) / CITY_WEIGHTS.sum()
+
+# Requests per local hour (Tashkent, UTC+5): morning and evening peaks
+HOUR_WEIGHTS = np.array([
+    1, 0.6, 0.4, 0.3, 0.4, 0.8, 2.0, 4.5, 6.5, 5.0, 4.0, 4.0,
+    4.2, 4.0, 3.8, 4.0, 4.8, 6.2, 6.8, 5.5, 4.2, 3.4, 2.4, 1.6,
+])
+HOUR_WEIGHTS = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+LOCAL_UTC_OFFSET = 5 * 3600
+
+FINISHED_STATUSES = [
+    (TravelStatus.COMPLETED, 0.84),
+    (TravelStatus.CANCELLED, 0.13),
+    (TravelStatus.FAILED, 0.03),
+]
+ACTIVE_STATUSES = [
+    (TravelStatus.CREATED, 0.15),
+    (TravelStatus.SEARCHING_DRIVER, 0.30),
+    (TravelStatus.DRIVER_FOUND, 0.20),
+    (TravelStatus.ARRIVED, 0.10),
+    (TravelStatus.STARTED, 0.25),
+]
+DRIVER_STATUSES = [
+    (DriverStatus.ACTIVE, 0.30),
+    (DriverStatus.BUSY, 0.10),
+    (DriverStatus.INACTIVE, 0.40),
+    (DriverStatus.OFFLINE, 0.20),
+]
+RATING_WEIGHTS = np.array([0.02, 0.03, 0.10, 0.25, 0.60])
+PASSENGERS_PER_TRAVEL = np.array([0.70, 0.20, 0.08, 0.02])
+
+CARS = [
+    ("Chevrolet", "Cobalt", CarType.ECONOMY, 4),
+    ("Chevrolet", "Nexia 3", CarType.ECONOMY, 4),
+    ("Chevrolet", "Spark", CarType.ECONOMY, 4),
+    ("Chevrolet", "Lacetti", CarType.STANDARD, 4),
+    ("Chevrolet", "Tracker", CarType.STANDARD, 4),
+    ("Chevrolet", "Malibu", CarType.BUSINESS, 4),
+    ("Kia", "K5", CarType.BUSINESS, 4),
+    ("Hyundai", "Elantra", CarType.STANDARD, 4),
+    ("BYD", "Chazor", CarType.STANDARD, 4),
+    ("Chevrolet", "Damas", CarType.ECONOMY, 7),
+]
+COLORS = ["oq", "qora", "kulrang", "kumush", "ko'k", "qizil"]
+FIRST_NAMES = [
+    "Aziz", "Bekzod", "Dilshod", "Jasur", "Sardor", "Otabek", "Rustam", "Sherzod", "Javohir", "Islom",
+    "Dilnoza", "Madina", "Gulnora", "Nilufar", "Malika", "Shahnoza", "Zarina", "Kamola", "Sevara", "Mohira",
+]
+LAST_NAMES = [
+    "Karimov", "Rahimov", "Tursunov", "Yusupov", "Aliyev", "Nazarov", "Qodirov", "Ergashev", "Saidov", "Xolmatov",
+]
+PHONE_CODES = ["90", "91", "93", "94", "95", "97", "98", "99", "33", "88", "77", "50"]
+# Contacts are typed by hand: most are E.164, the rest use common local spellings
+PHONE_FORMATS = [
+    "+998{code}{number}",
+    "+998{code}{number}",
+    "+998{code}{number}",
+    "+998{code}{number}",
+    "+998{code}{number}",
+    "+998{code}{number}",
+    "+998{code}{number}",
+    "+998 {code} {a} {b} {c}",
+    "{code} {a}-{b}-{c}",
+    "8 ({code}) {a}-{b}-{c}",
+]
+PLATE_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+CITY_SPEED_KMH = 22
+INTERCITY_SPEED_KMH = 65
+ROAD_FACTOR = 1.3
+MAX_ACTIVE_TRAVELS = 5000
+
+MODELS = [Location, Car, Passenger, Driver, DriverRoad, UserLocation, Travel, TravelInfo]
+
+
+def _choice(rng, options, size):
+    values = [value for value, _ in options]
+    weights = np.array([weight for _, weight in options])
+    return np.array(values, dtype=object)[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+
+def _city_of(indexes, total):
+    """Contiguous index blocks per city, sized by CITY_WEIGHTS."""
+    return np.searchsorted(CITY_CUMULATIVE * total, indexes, side="right").clip(0, len(CITIES) - 1)
+
+
+def _city_bounds(total):
+    edges = np.concatenate([[0], np.floor(CITY_CUMULATIVE * total).astype(np.int64)])
+    edges[-1] = total
+    return edges
+
+
+def _scatter(rng, cities):
+    """Points clustered around city centres (denser in the middle)."""
+    centre_lat = np.array([city[1] for city in CITIES])[cities]
+    centre_lng = np.array([city[2] for city in CITIES])[cities]
+    spread = np.array([city[3] for city in CITIES])[cities]
+    lat = centre_lat + rng.standard_normal(len(cities)) * spread
+    lng = centre_lng + rng.standard_normal(len(cities)) * spread / np.cos(np.radians(centre_lat))
+    return lat, lng
+
+
+def _phone(number):
+    code = PHONE_CODES[(number // 10_000_000) % len(PHONE_CODES)]
+    digits = f"{number % 10_000_000:07d}"
+    return PHONE_FORMATS[(number // 3) % len(PHONE_FORMATS)].format(
+        code=code, number=digits, a=digits[:3], b=digits[3:5], c=digits[5:]
+    )
+
+
+def _plate(number):
+    digits = number % 1000
+    rest = number // 1000
+    region = rest % 90 + 10
+    rest //= 90
+    letters = ""
+    for _ in range(3):
+        letters += PLATE_LETTERS[rest % 26]
+        rest //= 26
+    return f"{region}{letters[0]}{digits:03d}{letters[1:]}"
+
+
+def _to_datetimes(timestamps):
+    return [datetime.fromtimestamp(float(value), tz=dt_timezone.utc) for value in timestamps]
+
+
+class Plan:
+    """Row counts, primary-key ranges and the random seed shared by all workers."""
+
+    def __init__(self, options, now):
+        self.seed = options["seed"]
+        self.now = now.timestamp()
+        self.days = options["days"]
+        self.chunk_size = options["chunk_size"]
+        self.batch_size = options["batch_size"]
+        self.roads_per_driver = options["roads_per_driver"]
+
+        travels = options["travels"]
+        self.counts = {
+            "places": options["locations"] or max(1000, travels // 20),
+            "pings": options["user_locations"] if options["user_locations"] is not None else travels // 2,
+            "passengers": options["passengers"] or max(100, travels // 4),
+            "drivers": options["drivers"] or max(10, travels // 40),
+            "travels": travels,
+        }
+        self.counts["cars"] = self.counts["drivers"]
+        self.counts["roads"] = self.counts["drivers"] * self.roads_per_driver
+
+        def next_pk(model):
+            return (model.objects.order_by("-pk").values_list("pk", flat=True).first() or 0) + 1
+
+        self.start = {model.__name__: next_pk(model) for model in MODELS}
+        self.passenger_telegram_base = max(
+            next_pk(Passenger) + 100_000_000,
+            (Passenger.objects.order_by("-telegram_id").values_list("telegram_id", flat=True).first() or 0) + 1,
+        )
+        self.driver_telegram_base = max(
+            self.passenger_telegram_base + self.counts["passengers"] + 1_000_000,
+            (Driver.objects.order_by("-telegram_id").values_list("telegram_id", flat=True).first() or 0) + 1,
+        )
+        # The existing row counts are part of the entropy: a second run with the
+        # same --seed appends a different dataset instead of replaying the first
+        # one (identical coordinates would break the unique (lat, lng) index).
+        self.entropy = (self.seed, *self.start.values())
+
+    def rng(self, phase, chunk):
+        return np.random.default_rng([*self.entropy, PHASES.index(phase), chunk])
+
+    def skewed_times(self, rng, size):
+        """
+        created_at values: more rows in recent days (a growing service) and a
+        daily rhythm with morning and evening peaks.
+        """
+        age_days = np.floor(self.days * (1 - rng.random(size) ** 0.6))
+        local_midnight = (self.now + LOCAL_UTC_OFFSET) // 86400 * 86400 - LOCAL_UTC_OFFSET
+        seconds = rng.choice(24, size=size, p=HOUR_WEIGHTS) * 3600 + rng.random(size) * 3600
+        times = local_midnight - age_days * 86400 + seconds
+        # Hours of today that have not happened yet move to the previous day
+        return np.where(times > self.now, times - 86400, times)
+
+
+@lru_cache(maxsize=1)
+def _places(entropy, total):
+    """Coordinates of all travel/road places; every worker derives the same array."""
+    rng = np.random.default_rng([*entropy, 999])
+    cities = _city_of(np.arange(total), total)
+    lat, lng = _scatter(rng, cities)
+    return lat, lng, cities
+
+
+def places(plan):
+    return _places(plan.entropy, plan.counts["places"])
+
+
+def _pick_place(rng, plan, cities):
+    """A random place inside each of the given cities."""
+    edges = _city_bounds(plan.counts["places"])
+    low, high = edges[cities], edges[cities + 1]
+    return low + (rng.random(len(cities)) * np.maximum(high - low, 1)).astype(np.int64)
+
+
+def build_locations(plan, rng, start, size):
+    places_total = plan.counts["places"]
+    indexes = np.arange(start, start + size)
+    place_lat, place_lng, place_cities = places(plan)
+
+    is_place = indexes < places_total
+    cities = np.where(is_place, place_cities[np.minimum(indexes, places_total - 1)], 0)
+    ping_cities = _city_of(rng.random(size) * places_total, places_total)
+    cities = np.where(is_place, cities, ping_cities)
+    ping_lat, ping_lng = _scatter(rng, ping_cities)
+    lat = np.where(is_place, place_lat[np.minimum(indexes, places_total - 1)], ping_lat)
+    lng = np.where(is_place, place_lng[np.minimum(indexes, places_total - 1)], ping_lng)
+    created = _to_datetimes(plan.skewed_times(rng, size))
+
+    base = plan.start["Location"]
+    return [
+        Location(
+            id=base + int(index),
+            name=f"{CITIES[city][0]} #{index}",
+            lat=float(lat[i]),
+            lng=float(lng[i]),
+            geohash=encode_geohash(float(lat[i]), float(lng[i])),
+            created_at=created[i],
+            updated_at=created[i],
+        )
+        for i, (index, city) in enumerate(zip(indexes, cities))
+    ]
+
+
+def build_cars(plan, rng, start, size):
+    kinds = rng.choice(len(CARS), size=size)
+    years = rng.integers(2008, 2026, size=size)
+    colors = rng.choice(len(COLORS), size=size)
+    created = _to_datetimes(plan.skewed_times(rng, size))
+    base = plan.start["Car"]
+    cars = []
+    for i in range(size):
+        brand, model, car_type, capacity = CARS[kinds[i]]
+        cars.append(Car(
+            id=base + start + i,
+            name=brand,
+            model=model,
+            car_type=car_type,
+            color=COLORS[colors[i]],
+            year=int(years[i]),
+            license_plate=_plate(base + start + i),
+            capacity=capacity,
+            created_at=created[i],
+            updated_at=created[i],
+        ))
+    return cars
+
+
+def _names(rng, size):
+    first = rng.choice(len(FIRST_NAMES), size=size)
+    last = rng.choice(len(LAST_NAMES), size=size)
+    return [f"{FIRST_NAMES[a]} {LAST_NAMES[b]}" for a, b in zip(first, last)]
+
+
+def build_passengers(plan, rng, start, size):
+    names = _names(rng, size)
+    active = rng.random(size) < 0.92
+    created = _to_datetimes(plan.skewed_times(rng, size))
+    base = plan.start["Passenger"]
+    contacts = [_phone(base + start + i) for i in range(size)]
+    indexes = [phone_index(contact) for contact in contacts]
+    return [
+        Passenger(
+            id=base + start + i,
+            telegram_id=plan.passenger_telegram_base + start + i,
+            name=names[i],
+            contact=contacts[i],
+            contact_e164=indexes[i][0],
+            contact_reversed=indexes[i][1],
+            is_active=bool(active[i]),
+            created_at=created[i],
+            updated_at=created[i],
+        )
+        for i in range(size)
+    ]
+
+
+def build_drivers(plan, rng, start, size):
+    names = _names(rng, size)
+    statuses = _choice(rng, DRIVER_STATUSES, size)
+    verified = rng.random(size) < 0.7
+    cities = _city_of(np.arange(start, start + size), plan.counts["drivers"])
+    current = _pick_place(rng, plan, cities) + plan.start["Location"]
+    # Drivers who are not on shift mostly have no known position
+    has_location = (statuses == DriverStatus.ACTIVE) | (statuses == DriverStatus.BUSY) | (rng.random(size) < 0.3)
+    created = _to_datetimes(plan.skewed_times(rng, size))
+    base = plan.start["Driver"]
+    contacts = [_phone(base + start + i + 60_000_000) for i in range(size)]
+    indexes = [phone_index(contact) for contact in contacts]
+    return [
+        Driver(
+            id=base + start + i,
+            telegram_id=plan.driver_telegram_base + start + i,
+            name=names[i],
+            contact=contacts[i],
+            contact_e164=indexes[i][0],
+            contact_reversed=indexes[i][1],
+            car_id=plan.start["Car"] + start + i,
+            status=statuses[i],
+            is_verified=bool(verified[i]),
+            current_location_id=int(current[i]) if has_location[i] else None,
+            created_at=created[i],
+            updated_at=created[i],
+        )
+        for i in range(size)
+    ]
+
+
+def build_roads(plan, rng, start, size):
+    place_lat, place_lng, _ = places(plan)
+    indexes = np.arange(start, start + size)
+    drivers = indexes // plan.roads_per_driver
+    home = _city_of(drivers, plan.counts["drivers"])
+    # Every tenth road goes to another city
+    destination = np.where(
+        rng.random(size) < 0.1, _city_of(rng.random(size) * 1000, 1000), home
+    )
+    origin = _pick_place(rng, plan, home)
+    target = _pick_place(rng, plan, destination)
+    active = rng.random(size) < 0.6
+    created = _to_datetimes(plan.skewed_times(rng, size))
+    length = haversine_km(place_lat[origin], place_lng[origin], place_lat[target], place_lng[target])
+
+    location_base = plan.start["Location"]
+    roads = []
+    for i in range(size):
+        start_lat, start_lng = float(place_lat[origin[i]]), float(place_lng[origin[i]])
+        end_lat, end_lng = float(place_lat[target[i]]), float(place_lng[target[i]])
+        roads.append(DriverRoad(
+            id=plan.start["DriverRoad"] + int(indexes[i]),
+            driver_id=plan.start["Driver"] + int(drivers[i]),
+            from_location_id=location_base + int(origin[i]),
+            to_location_id=location_base + int(target[i]),
+            is_active=bool(active[i]),
+            start_lat=start_lat,
+            start_lng=start_lng,
+            end_lat=end_lat,
+            end_lng=end_lng,
+            min_lat=min(start_lat, end_lat),
+            max_lat=max(start_lat, end_lat),
+            min_lng=min(start_lng, end_lng),
+            max_lng=max(start_lng, end_lng),
+            bearing=initial_bearing(start_lat, start_lng, end_lat, end_lng),
+            length_km=float(length[i]),
+            created_at=created[i],
+            updated_at=created[i],
+        ))
+    return roads
+
+
+def _heavy_users(rng, plan, size):
+    """Passenger indexes with a long tail: a few regulars make most of the trips."""
+    return (rng.random(size) ** 1.5 * plan.counts["passengers"]).astype(np.int64)
+
+
+def build_user_locations(plan, rng, start, size):
+    users = _heavy_users(rng, plan, size) + plan.passenger_telegram_base
+    accuracy = rng.gamma(2.0, 8.0, size=size)
+    heading = rng.integers(0, 360, size=size)
+    live = rng.random(size) < 0.4
+    created = _to_datetimes(plan.skewed_times(rng, size))
+    location_base = plan.start["Location"] + plan.counts["places"]
+    base = plan.start["UserLocation"]
+    return [
+        UserLocation(
+            id=base + start + i,
+            user=int(users[i]),
+            location_id=location_base + start + i,
+            accuracy=round(float(accuracy[i]), 1),
+            live_period=900 if live[i] else None,
+            heading=int(heading[i]),
+            created_at=created[i],
+        )
+        for i in range(size)
+    ]
+
+
+def build_travels(plan, rng, start, size):
+    """Travel, TravelInfo and passenger links for one chunk."""
+    place_lat, place_lng, _ = places(plan)
+    cities = _city_of(rng.random(size) * 1000, 1000)
+    intercity = rng.random(size) < 0.08
+    destination = np.where(intercity, _city_of(rng.random(size) * 1000, 1000), cities)
+    origin = _pick_place(rng, plan, cities)
+    target = _pick_place(rng, plan, destination)
+
+    distance = haversine_km(place_lat[origin], place_lng[origin], place_lat[target], place_lng[target]) * ROAD_FACTOR
+    distance = np.clip(distance, 0.5, 9999)
+    speed = np.where(intercity, INTERCITY_SPEED_KMH, CITY_SPEED_KMH)
+    duration = np.maximum(np.round(distance / speed * 60), 3)
+    expected = np.round((4000 + 1800 * distance) / 500) * 500
+
+    # Only a few thousand travels are in progress (all from the last hours), the rest is history
+    active_share = min(0.02, MAX_ACTIVE_TRAVELS / max(plan.counts["travels"], 1))
+    is_active = rng.random(size) < active_share
+    statuses = np.where(
+        is_active, _choice(rng, ACTIVE_STATUSES, size), _choice(rng, FINISHED_STATUSES, size)
+    )
+    created = np.where(
+        is_active, plan.now - rng.random(size) * 3 * 3600, plan.skewed_times(rng, size)
+    )
+    pickup = created + rng.uniform(120, 900, size=size)
+    finished_at = pickup + duration * 60 * rng.uniform(0.85, 1.4, size=size)
+    final_price = expected * rng.uniform(0.9, 1.15, size=size)
+
+    drivers = rng.integers(0, plan.counts["drivers"], size=size) + plan.start["Driver"]
+    has_driver = ~np.isin(statuses, [TravelStatus.CREATED, TravelStatus.SEARCHING_DRIVER]) & (
+        (statuses != TravelStatus.CANCELLED) | (rng.random(size) < 0.5)
+    )
+    started = np.isin(statuses, [TravelStatus.STARTED, TravelStatus.COMPLETED])
+    completed = statuses == TravelStatus.COMPLETED
+    driver_rating = np.where(
+        completed & (rng.random(size) < 0.7), rng.choice(5, size=size, p=RATING_WEIGHTS) + 1, 0
+    )
+    passenger_rating = np.where(
+        completed & (rng.random(size) < 0.5), rng.choice(5, size=size, p=RATING_WEIGHTS) + 1, 0
+    )
+    has_female = rng.random(size) < 0.3
+    riders = rng.choice(len(PASSENGERS_PER_TRAVEL), size=size, p=PASSENGERS_PER_TRAVEL) + 1
+
+    created_at = _to_datetimes(created)
+    pickup_at = _to_datetimes(pickup)
+    finished = _to_datetimes(finished_at)
+
+    travel_base = plan.start["Travel"]
+    info_base = plan.start["TravelInfo"]
+    location_base = plan.start["Location"]
+    passenger_base = plan.start["Passenger"]
+
+    travels, infos, links = [], [], []
+    Link = TravelInfo.passengers.through
+    for i in range(size):
+        members = np.unique(_heavy_users(rng, plan, int(riders[i])))
+        travel_id = travel_base + start + i
+        info_id = info_base + start + i
+        travels.append(Travel(
+            id=travel_id,
+            from_location_id=location_base + int(origin[i]),
+            to_location_id=location_base + int(target[i]),
+            creator=plan.passenger_telegram_base + int(members[0]),
+            driver_id=int(drivers[i]) if has_driver[i] else None,
+            expected_price=Decimal(int(expected[i])),
+            final_price=Decimal(int(final_price[i] // 500 * 500)) if completed[i] else None,
+            distance_km=Decimal(f"{distance[i]:.2f}"),
+            estimated_duration_min=int(duration[i]),
+            started_at=pickup_at[i] if started[i] else None,
+            completed_at=finished[i] if completed[i] else None,
+            status=statuses[i],
+            created_at=created_at[i],
+            updated_at=finished[i] if completed[i] else created_at[i],
+        ))
+        infos.append(TravelInfo(
+            id=info_id,
+            travel_id=travel_id,
+            has_female=bool(has_female[i]),
+            status=statuses[i],
+            driver_rating=int(driver_rating[i]) or None,
+            passenger_rating=int(passenger_rating[i]) or None,
+            created_at=created_at[i],
+            updated_at=finished[i] if completed[i] else created_at[i],
+        ))
+        links.extend(Link(travelinfo_id=info_id, passenger_id=passenger_base + int(member)) for member in members)
+    return [(Travel, travels), (TravelInfo, infos), (Link, links)]
+
+
+PHASES = ["locations", "cars", "passengers", "drivers", "roads", "user_locations", "travels"]
+BUILDERS = {
+    "locations": (Location, build_locations),
+    "cars": (Car, build_cars),
+    "passengers": (Passenger, build_passengers),
+    "drivers": (Driver, build_drivers),
+    "roads": (DriverRoad, build_roads),
+    "user_locations": (UserLocation, build_user_locations),
+    "travels": (Travel, build_travels),
+}
+
+
+def phase_size(plan, phase):
+    if phase == "locations":
+        return plan.counts["places"] + plan.counts["pings"]
+    if phase == "user_locations":
+        return plan.counts["pings"]
+    return plan.counts[phase]
+
+
+@contextmanager
+def keep_timestamps():
+    """bulk_create would overwrite generated created_at/updated_at with now()."""
+    fields = [
+        field for model in MODELS for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def run_chunk(plan, phase, chunk):
+    """Builds and inserts one chunk; returns the number of primary rows written."""
+    start = chunk * plan.chunk_size
+    size = min(plan.chunk_size, phase_size(plan, phase) - start)
+    model, builder = BUILDERS[phase]
+    rows = builder(plan, plan.rng(phase, chunk), start, size)
+    if not isinstance(rows[0], tuple):
+        rows = [(model, rows)]
+
+    with keep_timestamps(), transaction.atomic():
+        for target, objects in rows:
+            target.objects.bulk_create(objects, batch_size=plan.batch_size)
+    return size
+
+
+def _worker_init():
+    # Forked children must not share the parent's database connection
+    connections.close_all()
+
+
+def _worker_run(args):
+    return run_chunk(*args)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a large synthetic dataset (locations, passengers, cars, drivers, roads, "
+        "user locations, travels with info and passengers) clustered around Uzbek cities"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--travels", type=int, default=100_000)
+        parser.add_argument("--passengers", type=int, help="default: travels / 4")
+        parser.add_argument("--drivers", type=int, help="default: travels / 40 (one car each)")
+        parser.add_argument("--locations", type=int, help="travel and road endpoints, default: travels / 20")
+        parser.add_argument("--user-locations", type=int, help="live-location pings, default: travels / 2")
+        parser.add_argument("--roads-per-driver", type=int, default=2)
+        parser.add_argument("--days", type=int, default=365, help="history span for created_at")
+        parser.add_argument("--workers", type=int, default=1, help="parallel processes (PostgreSQL)")
+        parser.add_argument("--chunk-size", type=int, default=20_000, help="rows per worker task")
+        parser.add_argument("--batch-size", type=int, default=5000, help="rows per INSERT")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--skip-derived",
+            action="store_true",
+            help="do not rebuild stat counters, ratings, trip counts and the demand heatmap afterwards",
+        )
+
+    def handle(self, *args, **options):
+        if options["travels"] < 0 or options["chunk_size"] <= 0:
+            raise CommandError("--travels must be >= 0 and --chunk-size > 0")
+
+        workers = max(1, options["workers"])
+        if workers > 1 and connection.vendor == "sqlite":
+            self.stdout.write(self.style.WARNING("SQLite allows one writer at a time, using --workers 1 ⚠️"))
+            workers = 1
+
+        plan = Plan(options, timezone.now())
+        self.stdout.write(
+            "Generating: " + ", ".join(f"{name}={count}" for name, count in plan.counts.items())
+        )
+
+        started = time.perf_counter()
+        pool = None
+        if workers > 1:
+            connections.close_all()
+            pool = multiprocessing.get_context("fork").Pool(workers, initializer=_worker_init)
+        try:
+            for phase in PHASES:
+                self.run_phase(plan, phase, pool)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self.reset_sequences()
+        if not options["skip_derived"]:
+            self.rebuild_derived(plan)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Synthetic data generated in {elapsed:.1f} s ✅"))
+
+    def run_phase(self, plan, phase, pool):
+        total = phase_size(plan, phase)
+        if not total:
+            return
+        chunks = range((total + plan.chunk_size - 1) // plan.chunk_size)
+        started = time.perf_counter()
+        if pool is None:
+            results = (run_chunk(plan, phase, chunk) for chunk in chunks)
+        else:
+            results = pool.imap_unordered(_worker_run, [(plan, phase, chunk) for chunk in chunks])
+
+        written = 0
+        for count in results:
+            written += count
+            self.stdout.write(f"{phase}: {written}/{total} rows...")
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{phase}: {written} rows in {elapsed:.1f} s ({written / max(elapsed, 1e-9):.0f} rows/s)")
+
+    def reset_sequences(self):
+        """Explicit primary keys were inserted; move the sequences past them (PostgreSQL)."""
+        statements = connection.ops.sequence_reset_sql(no_style(), MODELS)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def rebuild_derived(self, plan):
+        self.stdout.write("Recounting trips...")
+        completed = Travel.objects.filter(status=TravelStatus.COMPLETED)
+        Driver.objects.filter(pk__gte=plan.start["Driver"]).update(
+            total_trips=Coalesce(
+                Subquery(
+                    completed.filter(driver=OuterRef("pk")).order_by().values("driver")
+                    .annotate(count=Count("pk")).values("count"),
+                    output_field=IntegerField(),
+                ),
+                Value(0),
+            )
+        )
+        Link = TravelInfo.passengers.through
+        Passenger.objects.filter(pk__gte=plan.start["Passenger"]).update(
+            total_trips=Coalesce(
+                Subquery(
+                    Link.objects.filter(passenger=OuterRef("pk"), travelinfo__status=TravelStatus.COMPLETED)
+                    .order_by().values("passenger").annotate(count=Count("pk")).values("count"),
+                    output_field=IntegerField(),
+                ),
+                Value(0),
+            )
+        )
+
+        call_command("backfill_ratings", stdout=self.stdout)
+        # Rows were bulk-inserted without the demand tasks, so the heatmap starts empty
+        call_command("backfill_demand_heatmap", stdout=self.stdout)
+
+        # Last: passenger counters include the trip counts and ratings computed above
+        self.stdout.write("Rebuilding stat counters...")
+        rebuild_stats()
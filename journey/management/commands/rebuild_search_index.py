@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from journey.services.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the name/contact search index (SQLite FTS5 tables or PostgreSQL trigram indexes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.stdout.write(f"{connection.vendor}: no search index, searches use icontains")
+            return
+
+        started = time.perf_counter()
+        rebuild_search_index(connection)
+        self.stdout.write(self.style.SUCCESS(
+            f"Search index rebuilt on {connection.vendor} in {time.perf_counter() - started:.1f} s ✅"
+        ))
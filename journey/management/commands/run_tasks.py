@@ -0,0 +1,43 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from journey.services.tasks import run_worker, task_options
+
+
+class Command(BaseCommand):
+    help = "Runs background tasks queued in the BackgroundTask table (TASKS['BACKEND'] = 'database')"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pool", choices=["thread", "process"], default="thread",
+                            help="thread for I/O-bound tasks, process for CPU-bound ones")
+        parser.add_argument("--workers", type=int, help="Concurrent tasks (default: TASKS['WORKERS'])")
+        parser.add_argument("--poll-interval", type=float, help="Seconds between polls of an empty queue")
+        parser.add_argument("--burst", action="store_true", help="Exit once no task is ready to run")
+
+    def handle(self, *args, **options):
+        backend = task_options()["BACKEND"]
+        if backend != "database" and not options["burst"]:
+            raise CommandError(
+                f"TASKS['BACKEND'] is {backend!r}: tasks are not queued in the database, nothing to run"
+            )
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        self.stdout.write(f"Running tasks with a {options['pool']} pool (Ctrl+C to stop)")
+        started = time.perf_counter()
+        counts = run_worker(
+            pool=options["pool"],
+            workers=options["workers"],
+            burst=options["burst"],
+            poll_interval=options["poll_interval"],
+            stop_event=stop,
+        )
+        summary = ", ".join(f"{key} {value}" for key, value in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker stopped after {time.perf_counter() - started:.1f} s: {summary} ✅"
+        ))
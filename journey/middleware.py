@@ -0,0 +1,95 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+
+from .services.request_metrics import (
+    RequestSample, current_sample, install_query_timer, request_metrics
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Har bir so'rov uchun SQL so'rovlar soni, SQL vaqti, javobni render qilish
+    vaqti va umumiy vaqtni o'lchab, endpoint (URL nomi) bo'yicha histogramlarga yozadi.
+
+    SERVER_TIMING yoqilganda o'lchovlar `Server-Timing` sarlavhasida ham qaytariladi
+    (brauzer DevTools ularni Timing bo'limida ko'rsatadi).
+    Sync (gunicorn) va async (uvicorn) rejimlarda ishlaydi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = request_metrics.options
+        self.exclude_paths = tuple(self.options['EXCLUDE_PATHS'])
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+        # Middleware yuklanishidan oldin ochilgan ulanishlar (signal ularni o'tkazib yuborgan)
+        if self.options['ENABLED']:
+            for connection in connections.all(initialized_only=True):
+                install_query_timer(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._is_tracked(request):
+            return self.get_response(request)
+
+        sample = RequestSample()
+        token = current_sample.set(sample)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        return self._finish(request, response, sample)
+
+    async def __acall__(self, request):
+        if not self._is_tracked(request):
+            return await self.get_response(request)
+
+        sample = RequestSample()
+        token = current_sample.set(sample)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        return self._finish(request, response, sample)
+
+    def _is_tracked(self, request):
+        return self.options['ENABLED'] and not request.path.startswith(self.exclude_paths)
+
+    def process_template_response(self, request, response):
+        """DRF Response render qilinishidan oldin chaqiriladi: render vaqtini o'lchash"""
+        sample = current_sample.get()
+        if sample is not None:
+            sample.start_render()
+            response.add_post_render_callback(lambda rendered: sample.finish_render())
+        return response
+
+    def _finish(self, request, response, sample):
+        wall_time = sample.elapsed()
+        request_metrics.observe(
+            self._endpoint(request), request.method, response.status_code, sample, wall_time
+        )
+
+        if self.options['SERVER_TIMING']:
+            # Streaming javobda vaqt birinchi baytgacha bo'lgan qismni o'z ichiga oladi
+            app_time = max(wall_time - sample.db_time - sample.render_time, 0.0)
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={sample.db_time * 1000:.2f};desc="{sample.queries} queries"',
+                f'render;dur={sample.render_time * 1000:.2f}',
+                f'app;dur={app_time * 1000:.2f}',
+                f'total;dur={wall_time * 1000:.2f}',
+            ])
+        return response
+
+    @staticmethod
+    def _endpoint(request):
+        """URL nomi (masalan `travel-list`, `travel-complete-travel`); topilmasa `unmatched`"""
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match.route or 'unnamed'
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0003_car_driver_driverroad_passenger_travel_travelinfo_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=9),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['geohash'], name='journey_loc_geohash_bb18f5_idx'),
+        ),
+    ]
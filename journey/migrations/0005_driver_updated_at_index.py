@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0004_location_geohash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='driver',
+            index=models.Index(fields=['updated_at'], name='journey_dri_updated_1683dc_idx'),
+        ),
+    ]
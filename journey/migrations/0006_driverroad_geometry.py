@@ -0,0 +1,125 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:35
+
+import math
+
+from django.db import migrations, models
+
+# journey.services.geo dan nusxa: migratsiya natijasi keyingi o'zgarishlarga bog'liq bo'lmasin
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def initial_bearing(lat1, lng1, lat2, lng2):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_lambda = math.radians(lng2 - lng1)
+
+    x = math.sin(d_lambda) * math.cos(phi2)
+    y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(d_lambda)
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+
+def fill_road_geometry(apps, schema_editor):
+    DriverRoad = apps.get_model('journey', 'DriverRoad')
+    roads = DriverRoad.objects.filter(
+        from_location__isnull=False, to_location__isnull=False
+    ).select_related('from_location', 'to_location')
+
+    batch = []
+    for road in roads.iterator(chunk_size=2000):
+        start, end = road.from_location, road.to_location
+        road.start_lat, road.start_lng = start.lat, start.lng
+        road.end_lat, road.end_lng = end.lat, end.lng
+        road.min_lat, road.max_lat = sorted((start.lat, end.lat))
+        road.min_lng, road.max_lng = sorted((start.lng, end.lng))
+        road.bearing = initial_bearing(start.lat, start.lng, end.lat, end.lng)
+        road.length_km = haversine_m(start.lat, start.lng, end.lat, end.lng) / 1000
+        batch.append(road)
+
+        if len(batch) >= 2000:
+            DriverRoad.objects.bulk_update(batch, GEOMETRY_FIELDS)
+            batch = []
+
+    if batch:
+        DriverRoad.objects.bulk_update(batch, GEOMETRY_FIELDS)
+
+
+GEOMETRY_FIELDS = [
+    'start_lat', 'start_lng', 'end_lat', 'end_lng',
+    'min_lat', 'max_lat', 'min_lng', 'max_lng',
+    'bearing', 'length_km',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0005_driver_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driverroad',
+            name='bearing',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Yoʻnalish (°)'),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='end_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='end_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='length_km',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Uzunligi (km)'),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='max_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='max_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='min_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='min_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='start_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='driverroad',
+            name='start_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='driverroad',
+            index=models.Index(fields=['is_active', 'min_lat', 'max_lat'], name='journey_dri_is_acti_67229e_idx'),
+        ),
+        migrations.RunPython(fill_road_geometry, migrations.RunPython.noop),
+    ]
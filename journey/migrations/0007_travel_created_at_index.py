@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0006_driverroad_geometry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='travel',
+            index=models.Index(fields=['created_at', 'id'], name='journey_tra_created_973aa7_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_status_from_info(apps, schema_editor):
+    Travel = apps.get_model('journey', 'Travel')
+    TravelInfo = apps.get_model('journey', 'TravelInfo')
+
+    # Default 'created', shuning uchun faqat boshqa holatdagilar yangilanadi
+    changed = TravelInfo.objects.exclude(status='created')
+    Travel.objects.filter(pk__in=changed.values('travel_id')).update(
+        status=Subquery(
+            TravelInfo.objects.filter(travel_id=OuterRef('pk')).values('status')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0007_travel_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='travel',
+            name='status',
+            field=models.CharField(choices=[('created', 'Yaratildi'), ('searching_driver', 'Haydovchi qidirilmoqda'), ('driver_found', 'Haydovchi topildi'), ('arrived', 'Yetib keldi'), ('started', 'Sayohat boshlandi'), ('completed', 'Yakunlandi'), ('cancelled', 'Bekor qilindi'), ('failed', 'Xatolik')], default='created', editable=False, max_length=20, verbose_name='Holati'),
+        ),
+        migrations.RunPython(copy_status_from_info, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='travel',
+            name='is_active',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('status__in', ['created', 'searching_driver', 'driver_found', 'arrived', 'started'])), output_field=models.BooleanField(), verbose_name='Faol'),
+        ),
+        migrations.AddIndex(
+            model_name='travel',
+            index=models.Index(fields=['status', 'created_at'], name='journey_tra_status_fba64c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='travel',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'id'], name='travel_active_created_idx'),
+        ),
+    ]
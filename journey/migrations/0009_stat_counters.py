@@ -0,0 +1,99 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:44
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def fill_counters(apps, schema_editor):
+    # Hisoblagichlarni mavjud qatorlardan to'ldirish. Mantiq shu yerda muzlatilgan:
+    # keyinchalik journey.services.stats o'zgarsa ham migratsiya natijasi o'zgarmaydi
+    Travel = apps.get_model('journey', 'Travel')
+    Passenger = apps.get_model('journey', 'Passenger')
+    StatCounter = apps.get_model('journey', 'StatCounter')
+    DailyStat = apps.get_model('journey', 'DailyStat')
+
+    daily = defaultdict(Decimal)
+    travel_rows = Travel.objects.annotate(day=TruncDate('created_at')).values('day').annotate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(info__status='completed')),
+        cancelled=Count('id', filter=Q(info__status='cancelled')),
+        revenue=Sum('final_price'),
+        rating_sum=Sum('info__driver_rating'),
+        rating_count=Count('info__driver_rating'),
+    ).order_by()
+    for row in travel_rows:
+        day = row['day']
+        daily[('travels.total', day)] += row['total']
+        daily[('travels.completed', day)] += row['completed']
+        daily[('travels.cancelled', day)] += row['cancelled']
+        daily[('travels.revenue', day)] += row['revenue'] or 0
+        daily[('travels.driver_rating_sum', day)] += row['rating_sum'] or 0
+        daily[('travels.driver_rating_count', day)] += row['rating_count']
+
+    passenger_rows = Passenger.objects.annotate(day=TruncDate('created_at')).values('day').annotate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        rating_sum=Sum('rating'),
+        trips=Sum('total_trips'),
+    ).order_by()
+    for row in passenger_rows:
+        day = row['day']
+        daily[('passengers.total', day)] += row['total']
+        daily[('passengers.active', day)] += row['active']
+        daily[('passengers.rating_sum', day)] += row['rating_sum'] or 0
+        daily[('passengers.total_trips', day)] += row['trips'] or 0
+
+    totals = dict.fromkeys([
+        'travels.total', 'travels.completed', 'travels.cancelled', 'travels.revenue',
+        'travels.driver_rating_sum', 'travels.driver_rating_count',
+        'passengers.total', 'passengers.active', 'passengers.rating_sum', 'passengers.total_trips',
+    ], Decimal(0))
+    rows = []
+    for (key, day), value in daily.items():
+        if value:
+            totals[key] += value
+            rows.append(DailyStat(key=key, day=day, value=value))
+    DailyStat.objects.bulk_create(rows, batch_size=1000)
+    StatCounter.objects.bulk_create([StatCounter(key=key, value=value) for key, value in totals.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0008_travel_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Kalit')),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='Qiymat')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Statistika hisoblagichi',
+                'verbose_name_plural': 'Statistika hisoblagichlari',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Kun')),
+                ('key', models.CharField(max_length=64, verbose_name='Kalit')),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='Qiymat')),
+            ],
+            options={
+                'verbose_name': 'Kunlik statistika',
+                'verbose_name_plural': 'Kunlik statistikalar',
+                'unique_together': {('key', 'day')},
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
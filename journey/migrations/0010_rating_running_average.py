@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0009_stat_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driver',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Baholar soni'),
+        ),
+        migrations.AddField(
+            model_name='driver',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Baholar yig'indisi"),
+        ),
+        migrations.AddField(
+            model_name='passenger',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Baholar soni'),
+        ),
+        migrations.AddField(
+            model_name='passenger',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Baholar yig'indisi"),
+        ),
+    ]
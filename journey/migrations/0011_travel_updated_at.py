@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Mavjud sayohatlar uchun eng so'nggi ma'lum vaqt
+    Travel = apps.get_model('journey', 'Travel')
+    Travel.objects.update(updated_at=Coalesce('completed_at', 'started_at', 'created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0010_rating_running_average'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='travel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Yangilangan vaqt'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:05
+
+from django.db import migrations
+
+# Indeks ta'rifi shu yerda muzlatilgan (journey.services.search keyin o'zgarsa ham
+# migratsiya natijasi o'zgarmaydi): jadval -> indekslangan matn ustunlari
+SEARCH_INDEXES = {
+    'journey_location': ('name',),
+    'journey_driver': ('name',),
+    'journey_passenger': ('name', 'contact'),
+}
+
+
+def sqlite_statements(table, columns):
+    fts = f'{table}_fts'
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def install(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for table, columns in SEARCH_INDEXES.items():
+                for statement in sqlite_statements(table, columns):
+                    cursor.execute(statement)
+        elif connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for table, columns in SEARCH_INDEXES.items():
+                for column in columns:
+                    # CONCURRENTLY: katta jadvalga yozish indeks qurilayotganda to'xtamaydi
+                    cursor.execute(
+                        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{column}_trgm '
+                        f'ON {table} USING gin (UPPER({column}) gin_trgm_ops)'
+                    )
+
+
+def uninstall(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for table in SEARCH_INDEXES:
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}')
+                cursor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+        elif connection.vendor == 'postgresql':
+            for table, columns in SEARCH_INDEXES.items():
+                for column in columns:
+                    cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {table}_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+    # PostgreSQL da CREATE INDEX CONCURRENTLY tranzaksiya ichida ishlamaydi
+    atomic = False
+
+    dependencies = [
+        ('journey', '0011_travel_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
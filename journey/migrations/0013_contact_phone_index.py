@@ -0,0 +1,131 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:40
+
+import re
+
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 2000
+
+# journey.services.phones va journey.services.search dan muzlatilgan nusxa:
+# migratsiya natijasi keyingi o'zgarishlarga bog'liq bo'lmasin
+DEFAULT_COUNTRY_CODE = '998'
+NATIONAL_NUMBER_LENGTH = 9
+E164_MAX_DIGITS = 15
+SEARCH_INDEXES = {
+    'journey_driver': ('name',),
+    'journey_passenger': ('name', 'contact'),
+}
+
+
+def phone_index(value):
+    value = (value or '').strip()
+    digits = re.sub(r'\D', '', value)
+    if not digits:
+        return '', ''
+
+    if value.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif len(digits) == NATIONAL_NUMBER_LENGTH:
+        digits = DEFAULT_COUNTRY_CODE + digits
+    elif len(digits) == NATIONAL_NUMBER_LENGTH + 1 and digits.startswith('8'):
+        digits = DEFAULT_COUNTRY_CODE + digits[1:]
+
+    if not digits or len(digits) > E164_MAX_DIGITS:
+        return '', ''
+    return '+' + digits, digits[::-1]
+
+
+def backfill_contact_index(apps, schema_editor):
+    # Mavjud raqamlarni normallashtirish; indekslar to'ldirilgandan keyin quriladi
+    for name in ('Passenger', 'Driver'):
+        model = apps.get_model('journey', name)
+        last_id = 0
+        while True:
+            rows = list(
+                model.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'contact')[:BACKFILL_BATCH_SIZE]
+            )
+            if not rows:
+                break
+            objects = []
+            for pk, contact in rows:
+                e164, reversed_digits = phone_index(contact)
+                objects.append(model(id=pk, contact_e164=e164, contact_reversed=reversed_digits))
+            model.objects.bulk_update(objects, ['contact_e164', 'contact_reversed'])
+            last_id = rows[-1][0]
+
+
+def restore_search_index(apps, schema_editor):
+    # SQLite AddField da jadvalni qayta yaratadi va 0012 dagi FTS triggerlari o'chadi.
+    # PostgreSQL da GIN indekslar joyida qoladi (REINDEX CONCURRENTLY tranzaksiyada ishlamaydi)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, columns in SEARCH_INDEXES.items():
+            fts = f'{table}_fts'
+            names = ', '.join(columns)
+            new_values = ', '.join(f'new.{column}' for column in columns)
+            old_values = ', '.join(f'old.{column}' for column in columns)
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0012_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driver',
+            name='contact_e164',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16, verbose_name='Telefon (E.164)'),
+        ),
+        migrations.AddField(
+            model_name='driver',
+            name='contact_reversed',
+            field=models.CharField(blank=True, default='', editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='passenger',
+            name='contact_e164',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16, verbose_name='Telefon (E.164)'),
+        ),
+        migrations.AddField(
+            model_name='passenger',
+            name='contact_reversed',
+            field=models.CharField(blank=True, default='', editable=False, max_length=15),
+        ),
+        migrations.RunPython(backfill_contact_index, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='driver',
+            index=models.Index(fields=['contact_e164'], name='journey_dri_contact_e2ee2b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driver',
+            index=models.Index(fields=['contact_reversed'], name='journey_dri_contact_932ef8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passenger',
+            index=models.Index(fields=['contact_e164'], name='journey_pas_contact_fe204e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passenger',
+            index=models.Index(fields=['contact_reversed'], name='journey_pas_contact_7faa67_idx'),
+        ),
+        migrations.RunPython(restore_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0013_contact_phone_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Vazifa')),
+                ('args', models.JSONField(blank=True, default=list, verbose_name='Argumentlar')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Nomli argumentlar')),
+                ('status', models.CharField(choices=[('queued', 'Navbatda'), ('running', 'Bajarilmoqda'), ('failed', 'Xatolik')], default='queued', max_length=10, verbose_name='Holat')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Urinishlar')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='Maksimal urinishlar')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Bajarish vaqti')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Olingan vaqt')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Oxirgi xatolik')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Fon vazifasi',
+                'verbose_name_plural': 'Fon vazifalari',
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='journey_bac_status_12dd60_idx')],
+            },
+        ),
+    ]
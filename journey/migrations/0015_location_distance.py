@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0014_background_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationDistance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_geohash', models.CharField(max_length=9)),
+                ('to_geohash', models.CharField(max_length=9)),
+                ('distance_km', models.FloatField(verbose_name='Geodezik masofa (km)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('from_location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='journey.location')),
+                ('to_location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='journey.location')),
+            ],
+            options={
+                'verbose_name': 'Lokatsiyalar orasidagi masofa',
+                'verbose_name_plural': 'Lokatsiyalar orasidagi masofalar',
+                'unique_together': {('from_location', 'to_location')},
+            },
+        ),
+    ]
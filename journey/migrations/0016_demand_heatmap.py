@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0015_location_distance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemandCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('travel', 'Sayohat boshlanish nuqtasi'), ('user_location', 'Foydalanuvchi joylashuvi')], max_length=16, verbose_name='Manba')),
+                ('bucket', models.DateTimeField(verbose_name="Vaqt oralig'i boshi")),
+                ('cell', models.CharField(max_length=12, verbose_name='Geohash katagi')),
+                ('count', models.IntegerField(default=0, verbose_name='Soni')),
+            ],
+            options={
+                'verbose_name': 'Talab katagi',
+                'verbose_name_plural': 'Talab kataklari',
+                'unique_together': {('source', 'bucket', 'cell')},
+            },
+        ),
+    ]
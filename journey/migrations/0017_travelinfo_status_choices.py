@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0016_demand_heatmap'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='travelinfo',
+            name='status',
+            field=models.CharField(choices=[('created', 'Yaratildi'), ('searching_driver', 'Haydovchi qidirilmoqda'), ('driver_found', 'Haydovchi topildi'), ('arrived', 'Yetib keldi'), ('started', 'Sayohat boshlandi'), ('completed', 'Yakunlandi'), ('cancelled', 'Bekor qilindi'), ('failed', 'Xatolik')], default='created', max_length=20, verbose_name='Holati'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:02
+
+from django.db import migrations, models
+
+
+def restore_search_index(apps, schema_editor):
+    # SQLite AlterField da journey_passenger ni qayta yaratadi va 0012 dagi FTS triggerlari
+    # o'chadi (muzlatilgan nusxa). PostgreSQL da GIN indekslar joyida qoladi
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    table, fts, names = 'journey_passenger', 'journey_passenger_fts', 'name, contact'
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, new.name, new.contact); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, old.name, old.contact); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, old.name, old.contact); "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, new.name, new.contact); END"
+        )
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journey', '0017_travelinfo_status_choices'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='passenger',
+            name='rating_sum',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name="Baholar yig'indisi"),
+        ),
+        migrations.RunPython(restore_search_index, migrations.RunPython.noop),
+    ]
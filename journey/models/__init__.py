@@ -1,11 +1,15 @@
-from .location import Location, UserLocation
+from .location import Location, UserLocation, LocationDistance
 from .driver import CarType, Car, Driver, DriverRoad
 from .passengers import Passenger
-from .travel import TravelStatus, Travel, TravelInfo
+from .travel import TravelStatus, ACTIVE_TRAVEL_STATUSES, TRAVEL_STATUS_TRANSITIONS, Travel, TravelInfo
+from .stats import StatCounter, DailyStat, DemandSource, DemandCell
+from .tasks import BackgroundTaskStatus, BackgroundTask
 
 __all__ = [
-    'Location', 'UserLocation',
+    'Location', 'UserLocation', 'LocationDistance',
     'CarType', 'Car', 'Driver', 'DriverRoad',
     'Passenger',
-    'TravelStatus', 'Travel', 'TravelInfo'
+    'TravelStatus', 'ACTIVE_TRAVEL_STATUSES', 'TRAVEL_STATUS_TRANSITIONS', 'Travel', 'TravelInfo',
+    'StatCounter', 'DailyStat', 'DemandSource', 'DemandCell',
+    'BackgroundTaskStatus', 'BackgroundTask'
 ]
\ No newline at end of file
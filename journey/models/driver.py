@@ -1,6 +1,8 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from .location import Location
+from ..services.geo import haversine_m, initial_bearing
+from ..services.phones import phone_index
 
 class CarType(models.TextChoices):
     ECONOMY = 'economy', 'Economy'
@@ -50,6 +52,9 @@ class Driver(models.Model):
     telegram_id = models.BigIntegerField(db_index=True, unique=True, verbose_name='Telegram ID')
     name = models.CharField(max_length=100, verbose_name='Ism')
     contact = models.CharField(max_length=20, db_index=True, verbose_name='Telefon raqam')
+    # Qidiruv uchun normallashtirilgan raqam (save() da hisoblanadi)
+    contact_e164 = models.CharField(max_length=16, blank=True, default='', editable=False, verbose_name='Telefon (E.164)')
+    contact_reversed = models.CharField(max_length=15, blank=True, default='', editable=False)  # Oxirgi raqamlar bo'yicha qidiruv
     car = models.ForeignKey(
         Car,
         on_delete=models.SET_NULL,
@@ -72,6 +77,9 @@ class Driver(models.Model):
         verbose_name='Reyting'
     )
     total_trips = models.PositiveIntegerField(default=0, verbose_name='Jami sayohatlar')
+    # O'rtacha reyting uchun yig'indi: rating = rating_sum / rating_count
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name='Baholar yig\'indisi')
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Baholar soni')
     is_verified = models.BooleanField(default=False, verbose_name='Tasdiqlangan')
     current_location = models.ForeignKey(
         Location,
@@ -92,11 +100,27 @@ class Driver(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['rating']),
             models.Index(fields=['is_verified']),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['contact_e164']),
+            models.Index(fields=['contact_reversed']),
         ]
 
+    CONTACT_INDEX_FIELDS = ['contact_e164', 'contact_reversed']
+
     def __str__(self):
         return f"{self.name} ({self.contact})"
 
+    def save(self, *args, **kwargs):
+        self.refresh_contact_index()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'contact' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(self.CONTACT_INDEX_FIELDS)
+        super().save(*args, **kwargs)
+
+    def refresh_contact_index(self):
+        """Telefon raqamning E.164 va teskari yozilgan ko'rinishlari"""
+        self.contact_e164, self.contact_reversed = phone_index(self.contact)
+
 class DriverRoad(models.Model):
     driver = models.ForeignKey(
         Driver,
@@ -129,16 +153,59 @@ class DriverRoad(models.Model):
         verbose_name='Joriy joylashuv'
     )
     is_active = models.BooleanField(default=True, verbose_name='Faol')
+
+    # Yo'l segmenti geometriyasi (moslashtirish indeksi uchun, save() da hisoblanadi)
+    start_lat = models.FloatField(null=True, blank=True, editable=False)
+    start_lng = models.FloatField(null=True, blank=True, editable=False)
+    end_lat = models.FloatField(null=True, blank=True, editable=False)
+    end_lng = models.FloatField(null=True, blank=True, editable=False)
+    min_lat = models.FloatField(null=True, blank=True, editable=False)
+    max_lat = models.FloatField(null=True, blank=True, editable=False)
+    min_lng = models.FloatField(null=True, blank=True, editable=False)
+    max_lng = models.FloatField(null=True, blank=True, editable=False)
+    bearing = models.FloatField(null=True, blank=True, editable=False, verbose_name='Yoʻnalish (°)')
+    length_km = models.FloatField(null=True, blank=True, editable=False, verbose_name='Uzunligi (km)')
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    GEOMETRY_FIELDS = [
+        'start_lat', 'start_lng', 'end_lat', 'end_lng',
+        'min_lat', 'max_lat', 'min_lng', 'max_lng',
+        'bearing', 'length_km',
+    ]
+
     class Meta:
         verbose_name = 'Haydovchi yoʻli'
         verbose_name_plural = 'Haydovchi yoʻllari'
         indexes = [
             models.Index(fields=['driver', 'is_active']),
             models.Index(fields=['from_location', 'to_location']),
+            models.Index(fields=['is_active', 'min_lat', 'max_lat']),
         ]
 
     def __str__(self):
-        return f"{self.driver.name}: {self.from_location} → {self.to_location}"
\ No newline at end of file
+        return f"{self.driver.name}: {self.from_location} → {self.to_location}"
+
+    def save(self, *args, **kwargs):
+        self.refresh_geometry()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(self.GEOMETRY_FIELDS)
+        super().save(*args, **kwargs)
+
+    def refresh_geometry(self):
+        """Boshlanish va tugash joylaridan segment geometriyasini hisoblash"""
+        start = self.from_location
+        end = self.to_location
+        if start is None or end is None:
+            for field in self.GEOMETRY_FIELDS:
+                setattr(self, field, None)
+            return
+
+        self.start_lat, self.start_lng = start.lat, start.lng
+        self.end_lat, self.end_lng = end.lat, end.lng
+        self.min_lat, self.max_lat = sorted((start.lat, end.lat))
+        self.min_lng, self.max_lng = sorted((start.lng, end.lng))
+        self.bearing = initial_bearing(start.lat, start.lng, end.lat, end.lng)
+        self.length_km = haversine_m(start.lat, start.lng, end.lat, end.lng) / 1000
\ No newline at end of file
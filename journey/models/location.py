@@ -1,6 +1,7 @@
 # models.py
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from ..services.geo import encode_geohash, GEOHASH_PRECISION
 
 
 class Location(models.Model):
@@ -8,6 +9,7 @@ class Location(models.Model):
     lat = models.FloatField()
     lng = models.FloatField()
     is_available = models.BooleanField(default=True)
+    geohash = models.CharField(max_length=GEOHASH_PRECISION, blank=True, default='', editable=False)  # Grid katak kaliti
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -18,11 +20,19 @@ class Location(models.Model):
         indexes = [
             models.Index(fields=['lat', 'lng']),
             models.Index(fields=['is_available']),
+            models.Index(fields=['geohash']),
         ]
 
     def __str__(self):
         return f"{self.name} ({self.lat:.6f}, {self.lng:.6f})"
 
+    def save(self, *args, **kwargs):
+        self.geohash = encode_geohash(self.lat, self.lng)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ('lat' in update_fields or 'lng' in update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
     @property
     def coordinate(self):
         """Coordinate ni JSON formatida qaytarish"""
@@ -53,4 +63,26 @@ class UserLocation(models.Model):
         ]
 
     def __str__(self):
-        return f"User {self.user} at {self.location.name}"
\ No newline at end of file
+        return f"User {self.user} at {self.location.name}"
+
+class LocationDistance(models.Model):
+    """
+    Ikki lokatsiya orasidagi geodezik masofa keshi (journey.services.routes).
+    Masofa simmetrik: juftlik from_location_id <= to_location_id ko'rinishida
+    saqlanadi. Geohash lar hisoblash paytidagi koordinatalarni bildiradi -
+    lokatsiya ko'chirilsa qator eskirgan hisoblanadi va qayta yoziladi.
+    """
+    from_location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='+')
+    to_location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='+')
+    from_geohash = models.CharField(max_length=GEOHASH_PRECISION)
+    to_geohash = models.CharField(max_length=GEOHASH_PRECISION)
+    distance_km = models.FloatField(verbose_name='Geodezik masofa (km)')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Lokatsiyalar orasidagi masofa"
+        verbose_name_plural = "Lokatsiyalar orasidagi masofalar"
+        unique_together = ['from_location', 'to_location']
+
+    def __str__(self):
+        return f"{self.from_location_id} - {self.to_location_id}: {self.distance_km:.3f} km"
@@ -1,9 +1,13 @@
 from django.db import models
+from ..services.phones import phone_index
 
 class Passenger(models.Model):
     telegram_id = models.BigIntegerField(db_index=True, unique=True, verbose_name='Telegram ID')
     name = models.CharField(max_length=100, verbose_name='Ism')
     contact = models.CharField(max_length=20, unique=True, verbose_name='Telefon raqam')
+    # Qidiruv uchun normallashtirilgan raqam (save() da hisoblanadi)
+    contact_e164 = models.CharField(max_length=16, blank=True, default='', editable=False, verbose_name='Telefon (E.164)')
+    contact_reversed = models.CharField(max_length=15, blank=True, default='', editable=False)  # Oxirgi raqamlar bo'yicha qidiruv
     rating = models.DecimalField(
         max_digits=3,
         decimal_places=2,
@@ -11,6 +15,12 @@ class Passenger(models.Model):
         verbose_name='Reyting'
     )
     total_trips = models.PositiveIntegerField(default=0, verbose_name='Jami sayohatlar')
+    # O'rtacha reyting uchun yig'indi: rating = rating_sum / rating_count.
+    # Kasr bo'lishi mumkin: update-rating o'rnatgan reyting mavjud baholar og'irligi bilan yoziladi
+    rating_sum = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False, verbose_name='Baholar yig\'indisi'
+    )
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Baholar soni')
     is_active = models.BooleanField(default=True, verbose_name='Faol')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -21,7 +31,22 @@ class Passenger(models.Model):
         indexes = [
             models.Index(fields=['telegram_id']),
             models.Index(fields=['is_active']),
+            models.Index(fields=['contact_e164']),
+            models.Index(fields=['contact_reversed']),
         ]
 
+    CONTACT_INDEX_FIELDS = ['contact_e164', 'contact_reversed']
+
     def __str__(self):
-        return f"{self.name} ({self.contact})"
\ No newline at end of file
+        return f"{self.name} ({self.contact})"
+
+    def save(self, *args, **kwargs):
+        self.refresh_contact_index()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'contact' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(self.CONTACT_INDEX_FIELDS)
+        super().save(*args, **kwargs)
+
+    def refresh_contact_index(self):
+        """Telefon raqamning E.164 va teskari yozilgan ko'rinishlari"""
+        self.contact_e164, self.contact_reversed = phone_index(self.contact)
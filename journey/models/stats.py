@@ -0,0 +1,56 @@
+from django.db import models
+
+
+class StatCounter(models.Model):
+    """Umumiy (butun davr uchun) hisoblagich yoki yig'indi"""
+    key = models.CharField(max_length=64, unique=True, verbose_name='Kalit')
+    value = models.DecimalField(max_digits=20, decimal_places=2, default=0, verbose_name='Qiymat')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Statistika hisoblagichi'
+        verbose_name_plural = 'Statistika hisoblagichlari'
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class DailyStat(models.Model):
+    """Hisoblagichning bir kunlik o'zgarishi (sana oralig'i statistikasi uchun)"""
+    day = models.DateField(verbose_name='Kun')
+    key = models.CharField(max_length=64, verbose_name='Kalit')
+    value = models.DecimalField(max_digits=20, decimal_places=2, default=0, verbose_name='Qiymat')
+
+    class Meta:
+        verbose_name = 'Kunlik statistika'
+        verbose_name_plural = 'Kunlik statistikalar'
+        unique_together = ['key', 'day']
+
+    def __str__(self):
+        return f"{self.day} {self.key} = {self.value}"
+
+
+class DemandSource(models.TextChoices):
+    TRAVEL = 'travel', 'Sayohat boshlanish nuqtasi'
+    USER_LOCATION = 'user_location', 'Foydalanuvchi joylashuvi'
+
+
+class DemandCell(models.Model):
+    """
+    Talab xaritasi: bitta manba, vaqt oralig'i va geohash katagi uchun nuqtalar
+    soni (journey.services.demand). Sayohat yoki lokatsiya yaratilganda
+    oshiriladi, backfill_demand_heatmap bilan manba jadvalidan qayta quriladi.
+    """
+    source = models.CharField(max_length=16, choices=DemandSource.choices, verbose_name='Manba')
+    bucket = models.DateTimeField(verbose_name="Vaqt oralig'i boshi")
+    cell = models.CharField(max_length=12, verbose_name='Geohash katagi')
+    count = models.IntegerField(default=0, verbose_name='Soni')
+
+    class Meta:
+        verbose_name = 'Talab katagi'
+        verbose_name_plural = 'Talab kataklari'
+        # (source, bucket) bo'yicha diapazon: so'rov faqat oynadagi qatorlarni o'qiydi
+        unique_together = ['source', 'bucket', 'cell']
+
+    def __str__(self):
+        return f"{self.source} {self.bucket:%Y-%m-%d %H:%M} {self.cell} = {self.count}"
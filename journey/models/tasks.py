@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundTaskStatus(models.TextChoices):
+    QUEUED = 'queued', 'Navbatda'
+    RUNNING = 'running', 'Bajarilmoqda'
+    FAILED = 'failed', 'Xatolik'
+
+
+class BackgroundTask(models.Model):
+    """
+    "database" backendidagi fon vazifasi (journey.services.tasks).
+    Muvaffaqiyatli bajarilgan vazifa o'chiriladi; jadvalda faqat navbatdagi,
+    bajarilayotgan va urinishlari tugagan vazifalar qoladi.
+    """
+    name = models.CharField(max_length=200, verbose_name='Vazifa')
+    args = models.JSONField(default=list, blank=True, verbose_name='Argumentlar')
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name='Nomli argumentlar')
+    status = models.CharField(
+        max_length=10,
+        choices=BackgroundTaskStatus.choices,
+        default=BackgroundTaskStatus.QUEUED,
+        verbose_name='Holat'
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Urinishlar')
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name='Maksimal urinishlar')
+    run_after = models.DateTimeField(default=timezone.now, verbose_name='Bajarish vaqti')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Olingan vaqt')
+    last_error = models.TextField(blank=True, default='', verbose_name='Oxirgi xatolik')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Fon vazifasi'
+        verbose_name_plural = 'Fon vazifalari'
+        ordering = ['run_after', 'id']
+        indexes = [
+            # Worker navbatni (status, run_after) bo'yicha o'qiydi
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status}, {self.attempts}/{self.max_attempts})"
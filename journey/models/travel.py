@@ -14,6 +14,41 @@ class TravelStatus(models.TextChoices):
     CANCELLED = "cancelled", "Bekor qilindi"
     FAILED = "failed", "Xatolik"
 
+
+# Hali yakunlanmagan (faol) sayohat holatlari
+ACTIVE_TRAVEL_STATUSES = [
+    TravelStatus.CREATED,
+    TravelStatus.SEARCHING_DRIVER,
+    TravelStatus.DRIVER_FOUND,
+    TravelStatus.ARRIVED,
+    TravelStatus.STARTED,
+]
+
+# Ruxsat etilgan holat o'tishlari; yakuniy holatlardan chiqib bo'lmaydi
+TRAVEL_STATUS_TRANSITIONS = {
+    TravelStatus.CREATED: frozenset({
+        TravelStatus.SEARCHING_DRIVER, TravelStatus.DRIVER_FOUND,
+        TravelStatus.CANCELLED, TravelStatus.FAILED,
+    }),
+    TravelStatus.SEARCHING_DRIVER: frozenset({
+        TravelStatus.DRIVER_FOUND, TravelStatus.CANCELLED, TravelStatus.FAILED,
+    }),
+    TravelStatus.DRIVER_FOUND: frozenset({
+        # Haydovchi rad etsa qidiruv qayta boshlanadi
+        TravelStatus.SEARCHING_DRIVER, TravelStatus.ARRIVED, TravelStatus.STARTED,
+        TravelStatus.CANCELLED, TravelStatus.FAILED,
+    }),
+    TravelStatus.ARRIVED: frozenset({
+        TravelStatus.STARTED, TravelStatus.CANCELLED, TravelStatus.FAILED,
+    }),
+    TravelStatus.STARTED: frozenset({
+        TravelStatus.COMPLETED, TravelStatus.FAILED,
+    }),
+    TravelStatus.COMPLETED: frozenset(),
+    TravelStatus.CANCELLED: frozenset(),
+    TravelStatus.FAILED: frozenset(),
+}
+
 class Travel(models.Model):
     from_location = models.ForeignKey(
         Location,
@@ -32,6 +67,7 @@ class Travel(models.Model):
         blank=True
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan vaqt')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Yangilangan vaqt')
     creator = models.BigIntegerField(db_index=True, verbose_name='Yaratuvchi Telegram ID')
     driver = models.ForeignKey(
         Driver,
@@ -69,6 +105,21 @@ class Travel(models.Model):
     )
     started_at = models.DateTimeField(null=True, blank=True, verbose_name='Boshlangan vaqt')
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name='Tugagan vaqt')
+    # TravelInfo.status nusxasi: faol sayohatlarni join siz, indeks orqali topish uchun
+    status = models.CharField(
+        max_length=20,
+        choices=TravelStatus.choices,
+        default=TravelStatus.CREATED,
+        editable=False,
+        verbose_name='Holati'
+    )
+    # Bazada hisoblanadigan ustun: qisman indeks sharti parametrsiz mos kelishi uchun
+    is_active = models.GeneratedField(
+        expression=models.Q(status__in=ACTIVE_TRAVEL_STATUSES),
+        output_field=models.BooleanField(),
+        db_persist=True,
+        verbose_name='Faol'
+    )
 
     class Meta:
         verbose_name = "Sayohat"
@@ -76,6 +127,13 @@ class Travel(models.Model):
         indexes = [
             models.Index(fields=['creator', 'created_at']),
             models.Index(fields=['driver', 'created_at']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(
+                fields=['created_at', 'id'],
+                name='travel_active_created_idx',
+                condition=models.Q(is_active=True)
+            ),
         ]
         ordering = ['-created_at']
 
@@ -130,4 +188,17 @@ class TravelInfo(models.Model):
         verbose_name_plural = "Sayohat ma'lumotlari"
 
     def __str__(self):
-        return f"Travel Info for {self.travel}"
\ No newline at end of file
+        return f"Travel Info for {self.travel}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'status' in update_fields:
+            self.sync_travel_status()
+
+    def sync_travel_status(self):
+        """Travel.status ni TravelInfo.status bilan bir xil holatda saqlash"""
+        Travel.objects.filter(pk=self.travel_id).exclude(status=self.status).update(status=self.status)
+        if TravelInfo.travel.is_cached(self):
+            # Keyingi travel.save() eski holatni qayta yozib yubormasligi uchun
+            self.travel.status = self.status
\ No newline at end of file
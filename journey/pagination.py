@@ -0,0 +1,145 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TravelCursorPagination(BasePagination):
+    """
+    `(created_at, id)` juftligi bo'yicha keyset (cursor) paginatsiya.
+
+    OFFSET va COUNT(*) ishlatilmaydi: har bir sahifa oldingi sahifaning oxirgi
+    qatoridan boshlab `(creator, created_at)` / `(driver, created_at)`
+    indekslari bo'yicha o'qiladi, shuning uchun N-sahifa 1-sahifa bilan bir xil turadi.
+    Cursor ochiq matn emas (base64), mijoz uni faqat qaytarib yuboradi.
+    """
+
+    page_size = getattr(settings, 'TRAVEL_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'TRAVEL_MAX_PAGE_SIZE', 500)
+    cursor_query_param = 'cursor'
+    ordering_field = 'created_at'
+    invalid_cursor_message = 'Noto\'g\'ri cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.descending = self.get_descending(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor['reverse']
+        # Oldingi sahifa uchun tartib teskari o'qiladi va natija qayta aylantiriladi
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.ordering_field}', f'{prefix}pk')
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.keyset_filter(self.cursor, descending))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def keyset_filter(self, cursor, descending):
+        lookup = 'lt' if descending else 'gt'
+        value = cursor['value']
+        return (
+            Q(**{f'{self.ordering_field}__{lookup}': value})
+            | Q(**{self.ordering_field: value, f'pk__{lookup}': cursor['pk']})
+        )
+
+    def get_descending(self, request, queryset, view):
+        """Faqat created_at bo'yicha o'sish yoki kamayish tartibi qo'llanadi"""
+        ordering = None
+        if view is not None and OrderingFilter in getattr(view, 'filter_backends', []):
+            ordering = OrderingFilter().get_ordering(request, queryset, view)
+        if ordering and ordering[0] == self.ordering_field:
+            return False
+        return True
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            value, pk, reverse = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return {'value': value, 'pk': pk, 'reverse': bool(reverse)}
+
+    def encode_cursor(self, item, reverse):
+        if isinstance(item, dict):
+            value, pk = item[self.ordering_field], item['id']
+        else:
+            value, pk = getattr(item, self.ordering_field), item.pk
+        payload = json.dumps([value.isoformat(), pk, int(reverse)], separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Bo'sh sahifa: pozitsiya yo'q, ro'yxat boshiga havola
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
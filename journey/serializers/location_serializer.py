@@ -1,6 +1,7 @@
 # serializers.py
 from rest_framework import serializers
 from ..models.location import Location, UserLocation
+from ..services.locations import NEARBY_MAX_RADIUS_M, NEARBY_DEFAULT_LIMIT, BATCH_MAX_SIZE
 
 
 class CoordinateSerializer(serializers.Serializer):
@@ -19,6 +20,21 @@ class LocationSerializer(serializers.ModelSerializer):
         return {"lat": obj.lat, "lng": obj.lng}
 
 
+class NearbyLocationSerializer(LocationSerializer):
+    distance_m = serializers.FloatField(read_only=True)
+
+    class Meta(LocationSerializer.Meta):
+        fields = LocationSerializer.Meta.fields + ['distance_m']
+
+
+class NearbyLocationQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(min_value=1, max_value=NEARBY_MAX_RADIUS_M, default=200)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=NEARBY_DEFAULT_LIMIT)
+    available = serializers.BooleanField(default=False)
+
+
 class UserLocationCreateSerializer(serializers.Serializer):
     telegram_id = serializers.IntegerField(required=True)
     coordinate = CoordinateSerializer(required=True)
@@ -33,6 +49,14 @@ class UserLocationCreateSerializer(serializers.Serializer):
     )
 
 
+class UserLocationBatchSerializer(serializers.Serializer):
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=BATCH_MAX_SIZE
+    )
+
+
 class UserLocationSerializer(serializers.ModelSerializer):
     location = LocationSerializer(read_only=True)
 
@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from rest_framework.fields import empty
 from django.core.validators import MinValueValidator, MaxValueValidator
 from journey.models import Passenger
+from journey.services.passengers import BULK_UPSERT_MAX_SIZE, contact_q
 
 
 class PassengerBaseSerializer(serializers.ModelSerializer):
@@ -30,6 +32,14 @@ class PassengerCreateSerializer(PassengerBaseSerializer):
             )
         return value
 
+    def validate_contact(self, value):
+        # Boshqa yozilishdagi bir xil raqam ham band hisoblanadi
+        if Passenger.objects.filter(contact_q(value)).exists():
+            raise serializers.ValidationError(
+                "Bu telefon raqam boshqa yo'lovchiga tegishli"
+            )
+        return value
+
 
 class PassengerUpdateSerializer(serializers.ModelSerializer):
     name = serializers.CharField(max_length=100, required=False)
@@ -39,6 +49,16 @@ class PassengerUpdateSerializer(serializers.ModelSerializer):
         model = Passenger
         fields = ['name', 'contact', 'is_active']
 
+    def validate_contact(self, value):
+        passengers = Passenger.objects.filter(contact_q(value))
+        if self.instance is not None:
+            passengers = passengers.exclude(pk=self.instance.pk)
+        if passengers.exists():
+            raise serializers.ValidationError(
+                "Bu telefon raqam boshqa yo'lovchiga tegishli"
+            )
+        return value
+
 
 class PassengerDetailSerializer(PassengerBaseSerializer):
     rating = serializers.DecimalField(max_digits=3, decimal_places=2, read_only=True)
@@ -73,8 +93,44 @@ class PassengerRatingSerializer(serializers.Serializer):
     )
 
 
+class PassengerScoreSerializer(serializers.Serializer):
+    # Bitta baho (sayohat baholari kabi butun son); o'rtacha reyting undan hisoblanadi
+    rating = serializers.IntegerField(
+        validators=[MinValueValidator(0), MaxValueValidator(5)]
+    )
+
+
 class PassengerStatsSerializer(serializers.Serializer):
     total_passengers = serializers.IntegerField()
     active_passengers = serializers.IntegerField()
     average_rating = serializers.DecimalField(max_digits=3, decimal_places=2)
-    total_trips = serializers.IntegerField()
\ No newline at end of file
+    total_trips = serializers.IntegerField()
+
+
+class PassengerBulkUpsertSerializer(serializers.Serializer):
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=BULK_UPSERT_MAX_SIZE
+    )
+
+    def validate_items_individually(self):
+        """
+        Har bir yozuvni PassengerBaseSerializer maydonlari bilan tekshirish.
+        Maydon obyektlari bir marta yaratiladi, shuning uchun minglab yozuvda ham tez.
+        Natija: ([(index, data), ...], {index: errors})
+        """
+        fields = PassengerBaseSerializer().fields
+        valid, errors = [], {}
+        for index, item in enumerate(self.validated_data['items']):
+            data, item_errors = {}, {}
+            for name in ('telegram_id', 'name', 'contact'):
+                try:
+                    data[name] = fields[name].run_validation(item.get(name, empty))
+                except serializers.ValidationError as exc:
+                    item_errors[name] = exc.detail
+            if item_errors:
+                errors[index] = item_errors
+            else:
+                valid.append((index, data))
+        return valid, errors
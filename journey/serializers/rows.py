@@ -0,0 +1,165 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# to_representation qiymatni o'zgartirmaydigan maydonlar (bazadan to'g'ri tur keladi)
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.ReadOnlyField,
+)
+
+
+class ValuesRowSerializer:
+    """
+    ModelSerializer bilan bir xil JSON ni `values()` qatorlaridan yig'ish.
+
+    Serializer maydonlari bir marta tahlil qilinadi: kerakli ustunlar
+    (`from_location__name` kabi join lar bilan) va har bir qatorni dict ga
+    aylantiradigan tayyor funksiya hosil bo'ladi. Model obyektlari va DRF
+    maydonlari har qator uchun yaratilmaydi; Decimal va datetime kabi
+    formatlash talab qiladigan qiymatlar o'sha serializer maydonining
+    `to_representation` i orqali o'tadi, shuning uchun natija bir xil.
+
+    Model property lari (`duration_minutes` kabi) `computed` orqali beriladi:
+    {'maydon': (['kerakli', 'ustunlar'], funksiya(row))}.
+
+    Joriy vaqt zonasi har qator uchun emas, bir marta aniqlanadi: DateTimeField
+    uni har bir qiymatda qayta so'raydi va bu ro'yxat vaqtining katta qismi edi.
+    """
+
+    def __init__(self, serializer_class, computed=None):
+        self.serializer_class = serializer_class
+        self.computed = computed or {}
+
+    @cached_property
+    def _compiled(self):
+        columns = []
+        to_dict = self._compile(self.serializer_class(), '', columns, self.computed)
+        return list(dict.fromkeys(columns)), to_dict
+
+    @property
+    def columns(self):
+        return self._compiled[0]
+
+    def values(self, queryset):
+        """Querysetni kerakli ustunlar bilan values() ga o'tkazish"""
+        return queryset.select_related(None).prefetch_related(None).values(*self.columns)
+
+    def to_representation(self, rows):
+        to_dict = self._compiled[1]
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        return [to_dict(row, tz) for row in rows]
+
+    def _compile(self, serializer, prefix, columns, computed):
+        model = serializer.Meta.model
+        getters = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if name in computed:
+                needed, function = computed[name]
+                columns.extend(prefix + column for column in needed)
+                getters.append((name, _computed_getter(function)))
+                continue
+
+            if field.source == '*' or len(field.source_attrs) != 1:
+                raise ImproperlyConfigured(
+                    f'{serializer.__class__.__name__}.{name}: faqat bevosita model maydonlari qo\'llab-quvvatlanadi'
+                )
+            source = field.source
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f'{serializer.__class__.__name__}.{name}: "{source}" model maydoni emas, computed orqali bering'
+                )
+
+            column = prefix + source
+            if isinstance(field, serializers.BaseSerializer):
+                if getattr(field, 'many', False):
+                    raise ImproperlyConfigured(
+                        f'{serializer.__class__.__name__}.{name}: many=True qo\'llab-quvvatlanmaydi'
+                    )
+                # FK ustuni (id) bo'sh bo'lsa, ichki obyekt ham null
+                columns.append(column)
+                nested = self._compile(field, column + '__', columns, {})
+                getters.append((name, _nested_getter(column, nested)))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                columns.append(column)
+                getters.append((name, _plain_getter(column)))
+            elif model_field.is_relation:
+                raise ImproperlyConfigured(
+                    f'{serializer.__class__.__name__}.{name}: {field.__class__.__name__} qo\'llab-quvvatlanmaydi'
+                )
+            else:
+                columns.append(column)
+                if isinstance(field, PASSTHROUGH_FIELDS):
+                    getters.append((name, _plain_getter(column)))
+                elif isinstance(field, serializers.DateTimeField):
+                    getters.append((name, _datetime_getter(column, field)))
+                else:
+                    getters.append((name, _field_getter(column, field.to_representation)))
+
+        getters = tuple(getters)
+
+        def to_dict(row, tz):
+            return {name: getter(row, tz) for name, getter in getters}
+
+        return to_dict
+
+
+def _computed_getter(function):
+    def getter(row, tz):
+        return function(row)
+    return getter
+
+
+def _plain_getter(column):
+    def getter(row, tz):
+        return row[column]
+    return getter
+
+
+def _field_getter(column, to_representation):
+    def getter(row, tz):
+        value = row[column]
+        return None if value is None else to_representation(value)
+    return getter
+
+
+def _datetime_getter(column, field):
+    """
+    DateTimeField.to_representation ning ISO 8601 holati, vaqt zonasi tashqaridan.
+    Boshqa formatlar va naive qiymatlar maydonning o'ziga topshiriladi.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, 'timezone'):
+        return _field_getter(column, field.to_representation)
+
+    to_representation = field.to_representation
+
+    def getter(row, tz):
+        value = row[column]
+        if value is None:
+            return None
+        if tz is None or value.tzinfo is None:
+            return to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return getter
+
+
+def _nested_getter(column, to_dict):
+    def getter(row, tz):
+        return None if row[column] is None else to_dict(row, tz)
+    return getter
@@ -1,6 +1,13 @@
+from datetime import timedelta
+
 from rest_framework import serializers
 from django.core.validators import MinValueValidator, MaxValueValidator
-from journey.models import Travel, TravelInfo, TravelStatus, Location, Driver, Passenger
+from django.utils import timezone
+from journey.models import Travel, TravelInfo, TravelStatus, Location, Driver, DriverRoad, Passenger, DemandSource
+from journey.services import corridor
+from journey.services.demand import demand_options
+from journey.services.export import EXPORT_FORMATS
+from journey.serializers.rows import ValuesRowSerializer
 
 
 class LocationSerializer(serializers.ModelSerializer):
@@ -15,6 +22,40 @@ class DriverSimpleSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'contact', 'rating']
 
 
+class NearbyDriverSerializer(DriverSimpleSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta(DriverSimpleSerializer.Meta):
+        fields = DriverSimpleSerializer.Meta.fields + ['distance_km']
+
+
+class NearbyDriverQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    radius_km = serializers.FloatField(min_value=0.1, max_value=100, default=5)
+
+
+class DriverRoadMatchSerializer(serializers.ModelSerializer):
+    driver = DriverSimpleSerializer(read_only=True)
+    from_location = LocationSerializer(read_only=True)
+    to_location = LocationSerializer(read_only=True)
+    detour_km = serializers.FloatField(read_only=True)
+    pickup_distance_km = serializers.FloatField(read_only=True)
+    dropoff_distance_km = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = DriverRoad
+        fields = [
+            'id', 'driver', 'from_location', 'to_location', 'bearing', 'length_km',
+            'detour_km', 'pickup_distance_km', 'dropoff_distance_km'
+        ]
+
+
+class RoadMatchQuerySerializer(serializers.Serializer):
+    tolerance_km = serializers.FloatField(min_value=0.1, max_value=50, default=corridor.DEFAULT_TOLERANCE_KM)
+    max_bearing_diff = serializers.FloatField(min_value=1, max_value=180, default=corridor.DEFAULT_MAX_BEARING_DIFF)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=corridor.DEFAULT_LIMIT)
+
+
 class PassengerSimpleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Passenger
@@ -56,6 +97,13 @@ class TravelUpdateSerializer(serializers.ModelSerializer):
             'estimated_duration_min', 'started_at', 'completed_at'
         ]
 
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Faqat yuborilgan ustunlar: parallel o'zgargan holat (status) eski qiymat bilan yozilmasin
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
 
 class TravelDetailSerializer(TravelBaseSerializer):
     duration_minutes = serializers.ReadOnlyField()
@@ -64,6 +112,20 @@ class TravelDetailSerializer(TravelBaseSerializer):
         fields = TravelBaseSerializer.Meta.fields + ['duration_minutes']
 
 
+def _duration_minutes(row):
+    """Travel.duration_minutes ning values() qatori uchun varianti"""
+    if row['started_at'] and row['completed_at']:
+        return (row['completed_at'] - row['started_at']).total_seconds() // 60
+    return None
+
+
+# Ro'yxat endpointlari uchun tezkor yo'l: TravelDetailSerializer bilan bir xil JSON
+travel_detail_rows = ValuesRowSerializer(
+    TravelDetailSerializer,
+    computed={'duration_minutes': (['started_at', 'completed_at'], _duration_minutes)}
+)
+
+
 class TravelInfoSerializer(serializers.ModelSerializer):
     passengers = PassengerSimpleSerializer(many=True, read_only=True)
     passenger_ids = serializers.ListField(
@@ -108,4 +170,50 @@ class TravelStatsSerializer(serializers.Serializer):
     completed_travels = serializers.IntegerField()
     cancelled_travels = serializers.IntegerField()
     total_revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
-    average_rating = serializers.DecimalField(max_digits=3, decimal_places=2)
\ No newline at end of file
+    average_rating = serializers.DecimalField(max_digits=3, decimal_places=2)
+
+
+class StatsQuerySerializer(serializers.Serializer):
+    """Statistika uchun ixtiyoriy sana oralig'i (obyekt yaratilgan kun bo'yicha)"""
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError('date_from date_to dan katta bo\'lmasligi kerak')
+        return data
+
+
+class HeatmapQuerySerializer(serializers.Serializer):
+    """
+    Talab xaritasi uchun to'rtburchak va vaqt oynasi.
+    Oyna berilmasa - oxirgi DEMAND_HEATMAP['DEFAULT_WINDOW_HOURS'] soat.
+    """
+    min_lat = serializers.FloatField(min_value=-90, max_value=90)
+    min_lng = serializers.FloatField(min_value=-180, max_value=180)
+    max_lat = serializers.FloatField(min_value=-90, max_value=90)
+    max_lng = serializers.FloatField(min_value=-180, max_value=180)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    precision = serializers.IntegerField(min_value=1, max_value=12, required=False)
+    source = serializers.ChoiceField(choices=DemandSource.choices, default=DemandSource.TRAVEL)
+
+    def validate(self, data):
+        if data['min_lat'] > data['max_lat'] or data['min_lng'] > data['max_lng']:
+            raise serializers.ValidationError('min_lat/min_lng max_lat/max_lng dan katta bo\'lmasligi kerak')
+
+        options = demand_options()
+        until = data.get('until') or timezone.now()
+        since = data.get('since') or until - timedelta(hours=options['DEFAULT_WINDOW_HOURS'])
+        if since >= until:
+            raise serializers.ValidationError('since until dan kichik bo\'lishi kerak')
+        if until - since > timedelta(days=options['MAX_WINDOW_DAYS']):
+            raise serializers.ValidationError(f"Vaqt oynasi {options['MAX_WINDOW_DAYS']} kundan oshmasligi kerak")
+
+        data['since'] = since
+        data['until'] = until
+        return data
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default='ndjson')
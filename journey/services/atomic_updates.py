@@ -0,0 +1,163 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from ..models.driver import Driver
+from ..models.passengers import Passenger
+from . import stats as stats_service
+from .passenger_cache import passenger_cache
+
+
+def increment_passenger_trips(telegram_id, by=1):
+    """
+    `total_trips = total_trips + by` bitta UPDATE bilan (o'qib-yozish yo'q).
+    UPDATE dan keyin qator tranzaksiya oxirigacha qulflangan, shuning uchun
+    qayta o'qilgan qiymat aynan shu yangilanish natijasi.
+    Natija: yangilangan Passenger yoki topilmasa None.
+    """
+    with transaction.atomic():
+        updated = Passenger.objects.filter(telegram_id=telegram_id).update(
+            total_trips=F('total_trips') + by,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            return None
+
+        passenger = Passenger.objects.get(telegram_id=telegram_id)
+        stats_service.record_passengers_trips([passenger.created_at], by)
+        transaction.on_commit(partial(passenger_cache.invalidate, passenger.telegram_id))
+        return passenger
+
+
+def set_passenger_rating(telegram_id, rating):
+    """
+    Reytingni qo'lda o'rnatish (update-rating). O'rtacha rating_sum / rating_count
+    bilan mos qoladi: qiymat mavjud baholar soni og'irligi bilan (kamida 1)
+    yig'indiga yoziladi, keyingi sayohat baholari shu qiymatdan davom etadi.
+    Natija: yangilangan Passenger yoki topilmasa None.
+    """
+    with transaction.atomic():
+        row = (
+            Passenger.objects.select_for_update()
+            .filter(telegram_id=telegram_id)
+            .values_list('pk', 'rating', 'rating_count')
+            .first()
+        )
+        if row is None:
+            return None
+        pk, old_rating, rating_count = row
+
+        weight = max(rating_count, 1)
+        Passenger.objects.filter(pk=pk).update(
+            rating=rating,
+            rating_sum=rating * weight,
+            rating_count=weight,
+            updated_at=timezone.now()
+        )
+        passenger = Passenger.objects.get(pk=pk)
+        before = {**stats_service.passenger_snapshot(passenger), stats_service.PASSENGERS_RATING_SUM: old_rating}
+        stats_service.record_passenger_change(passenger, before)
+        transaction.on_commit(partial(passenger_cache.invalidate, passenger.telegram_id))
+        return passenger
+
+
+def add_passenger_rating(telegram_id, rating):
+    """
+    Bitta bahoni yo'lovchining o'rtacha reytingiga qo'shish (add-rating):
+    rating_sum += baho, rating_count += 1, rating = rating_sum / rating_count.
+    Natija: yangilangan Passenger yoki topilmasa None.
+    """
+    with transaction.atomic():
+        pk = Passenger.objects.filter(telegram_id=telegram_id).values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+
+        apply_passenger_rating([pk], rating)
+        return Passenger.objects.get(pk=pk)
+
+
+def increment_travel_trips(travel_id, driver_id=None):
+    """
+    Yakunlangan sayohatning barcha yo'lovchilari va haydovchisi uchun
+    `total_trips` ni bittadan oshirish: har bir jadval uchun bitta UPDATE.
+    Natija: {'passengers': yangilangan yo'lovchilar soni, 'driver': 0 yoki 1}
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            Passenger.objects.filter(travels__travel_id=travel_id)
+            .values_list('pk', 'telegram_id', 'created_at')
+        )
+        updated_passengers = 0
+        if rows:
+            updated_passengers = Passenger.objects.filter(pk__in=[row[0] for row in rows]).update(
+                total_trips=F('total_trips') + 1,
+                updated_at=now
+            )
+            stats_service.record_passengers_trips([row[2] for row in rows])
+            transaction.on_commit(partial(passenger_cache.invalidate_many, [row[1] for row in rows]))
+
+        updated_driver = 0
+        if driver_id is not None:
+            updated_driver = Driver.objects.filter(pk=driver_id).update(
+                total_trips=F('total_trips') + 1,
+                updated_at=now
+            )
+
+    return {'passengers': updated_passengers, 'driver': updated_driver}
+
+
+def _running_average(new_rating, old_rating):
+    """rating_sum / rating_count juftligi va undan hisoblangan reyting uchun UPDATE ifodalari"""
+    if old_rating is None:
+        sum_delta, count_delta = new_rating, 1
+    else:
+        # Eski baho hisobda bo'lmasligi mumkin (0010 dan oldingi sayohat, backfill_ratings
+        # ishlatilmagan): rating_count = 0 bo'lsa yangi baho birinchi baho sifatida
+        # qo'shiladi - aks holda UPDATE nolga bo'linadi
+        sum_delta = Case(When(rating_count=0, then=Value(new_rating)), default=Value(new_rating - old_rating))
+        count_delta = Case(When(rating_count=0, then=Value(1)), default=Value(0))
+
+    rating_sum = F('rating_sum') + sum_delta
+    rating_count = F('rating_count') + count_delta
+    return {
+        'rating_sum': rating_sum,
+        'rating_count': rating_count,
+        # SET ichida ustunlarning eski qiymati o'qiladi, shuning uchun farqlar qayta qo'shiladi
+        'rating': Cast(rating_sum, FloatField()) / rating_count,
+        'updated_at': timezone.now(),
+    }
+
+
+def apply_driver_rating(driver_id, new_rating, old_rating=None):
+    """
+    Sayohat uchun qo'yilgan (yoki o'zgartirilgan) bahoni haydovchining
+    o'rtacha reytingiga bitta UPDATE bilan qo'shish.
+    """
+    if driver_id is None or new_rating == old_rating:
+        return 0
+    return Driver.objects.filter(pk=driver_id).update(**_running_average(new_rating, old_rating))
+
+
+def apply_passenger_rating(passenger_ids, new_rating, old_rating=None):
+    """Sayohat yo'lovchilariga qo'yilgan bahoni ularning o'rtacha reytingiga qo'shish"""
+    passenger_ids = list(passenger_ids)
+    if not passenger_ids or new_rating == old_rating:
+        return 0
+
+    with transaction.atomic():
+        passengers = Passenger.objects.filter(pk__in=passenger_ids)
+        rows = list(passengers.select_for_update().values_list('pk', 'telegram_id', 'rating', 'created_at'))
+        updated = passengers.update(**_running_average(new_rating, old_rating))
+
+        new_ratings = dict(passengers.values_list('pk', 'rating'))
+        stats_service.record_passengers_rating([
+            (created_at, new_ratings[pk] - rating)
+            for pk, _, rating, created_at in rows if pk in new_ratings
+        ])
+        transaction.on_commit(partial(passenger_cache.invalidate_many, [row[1] for row in rows]))
+
+    return updated
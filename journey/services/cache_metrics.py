@@ -0,0 +1,35 @@
+import threading
+from collections import Counter
+
+
+class HitCounter:
+    """Kesh murojaatlari uchun jarayon ichidagi hit/miss hisoblagichlari"""
+
+    def __init__(self, *hit_names):
+        self.hit_names = hit_names or ('hits',)
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+
+        hits = sum(counts.get(name, 0) for name in self.hit_names)
+        requests = hits + counts.get('misses', 0)
+        data = {name: counts.get(name, 0) for name in self.hit_names}
+        data.update({
+            'misses': counts.get('misses', 0),
+            'requests': requests,
+            'hit_rate': round(hits / requests, 4) if requests else None,
+        })
+        for name, value in counts.items():
+            data.setdefault(name, value)
+        return data
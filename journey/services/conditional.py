@@ -0,0 +1,86 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+
+from ..models.travel import Travel
+
+# Sayohat javobiga (TravelWithInfoSerializer) kiradigan barcha jadvallarning o'zgarish vaqtlari
+TRAVEL_VERSION_FIELDS = (
+    'updated_at', 'info__updated_at', 'from_location__updated_at',
+    'to_location__updated_at', 'driver__updated_at',
+)
+
+
+def make_etag(*parts):
+    """Versiya qismlaridan (vaqtlar, id lar yoki tayyor payload) ETag"""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def parse_timestamp(value):
+    """Payload dagi vaqt satrini aware datetime ga; bo'lmasa None"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def travel_version(pk):
+    """
+    Sayohat javobining versiyasi bitta yengil so'rov bilan: (etag, last_modified).
+    Serializatsiya va yo'lovchilarni yuklash yo'q; sayohat topilmasa None.
+    """
+    try:
+        queryset = Travel.objects.filter(pk=pk)
+    except (TypeError, ValueError):
+        return None
+
+    rows = list(
+        queryset.values(*TRAVEL_VERSION_FIELDS).annotate(
+            passengers_updated=Max('info__passengers__updated_at'),
+            passengers_count=Count('info__passengers'),
+        )
+    )
+    if not rows:
+        return None
+    row = rows[0]
+
+    parts = [row[field] for field in TRAVEL_VERSION_FIELDS] + [row['passengers_updated'], row['passengers_count']]
+    last_modified = max(value for value in parts[:-1] if value is not None)
+    return make_etag(*parts), last_modified
+
+
+def location_version(location_data):
+    """Oxirgi joylashuv payloadi (UserLocationSerializer) versiyasi: (etag, last_modified)"""
+    return (
+        make_etag(location_data['id'], location_data['created_at']),
+        parse_timestamp(location_data['created_at'])
+    )
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    If-None-Match / If-Modified-Since (va If-Match) shartlarini tekshirish.
+    Mijozdagi nusxa eskirmagan bo'lsa 304 javob, aks holda None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None and response.status_code == 304:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """ETag / Last-Modified sarlavhalari; mijoz har safar qayta tekshiradi (no-cache)"""
+    if response.status_code in (200, 304):
+        response.headers['ETag'] = etag
+        if last_modified:
+            response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,139 @@
+import math
+
+import numpy as np
+
+from ..models.driver import DriverRoad
+from .geo import METERS_PER_DEGREE, initial_bearing
+from .geo_vector import EARTH_RADIUS_KM, bearing_difference, haversine_km
+
+DEFAULT_TOLERANCE_KM = 3.0
+DEFAULT_MAX_BEARING_DIFF = 45.0
+DEFAULT_LIMIT = 20
+
+_CANDIDATE_FIELDS = (
+    'id', 'start_lat', 'start_lng', 'end_lat', 'end_lng', 'bearing',
+    'current_location__lat', 'current_location__lng', 'driver__rating',
+)
+
+
+def _project(lat, lng, origin_lat, origin_lng, cos_lat):
+    """Nuqtani har bir yo'l boshiga nisbatan tekis (km) koordinatalarga o'tkazish"""
+    x = np.radians(lng - origin_lng) * cos_lat * EARTH_RADIUS_KM
+    y = np.radians(lat - origin_lat) * EARTH_RADIUS_KM
+    return x, y
+
+
+def _candidate_rows(pickup, dropoff, tolerance_km):
+    """Chegaraviy to'rtburchagi ikkala nuqtani ham qamraydigan faol yo'llar"""
+    tol_lat = tolerance_km * 1000 / METERS_PER_DEGREE
+    widest_lat = max(abs(pickup.lat), abs(dropoff.lat)) + tol_lat
+    tol_lng = tol_lat / max(math.cos(math.radians(min(widest_lat, 89.0))), 0.01)
+
+    low_lat, high_lat = sorted((pickup.lat, dropoff.lat))
+    low_lng, high_lng = sorted((pickup.lng, dropoff.lng))
+
+    return list(
+        DriverRoad.objects.filter(
+            is_active=True,
+            min_lat__lte=low_lat + tol_lat,
+            max_lat__gte=high_lat - tol_lat,
+            min_lng__lte=low_lng + tol_lng,
+            max_lng__gte=high_lng - tol_lng,
+        ).values_list(*_CANDIDATE_FIELDS)
+    )
+
+
+def match_roads(pickup, dropoff, tolerance_km=DEFAULT_TOLERANCE_KM,
+                max_bearing_diff=DEFAULT_MAX_BEARING_DIFF, limit=DEFAULT_LIMIT):
+    """
+    Yo'lovchini olish va tushirish joylari yo'nalishi bo'yicha, to'g'ri tartibda
+    tolerans ichida joylashgan haydovchi yo'llarini topish.
+
+    Nomzodlar oldindan hisoblangan chegaraviy to'rtburchak bo'yicha SQLda
+    saralanadi, geometriya esa barcha nomzodlar uchun bir vaqtda NumPy bilan
+    hisoblanadi. Natija qo'shimcha yo'l (detour) va haydovchi reytingi bo'yicha
+    tartiblangan `DriverRoad` obyektlari; har biriga `detour_km`,
+    `pickup_distance_km` va `dropoff_distance_km` atributlari qo'shiladi.
+    """
+    rows = _candidate_rows(pickup, dropoff, tolerance_km)
+    if not rows:
+        return []
+
+    columns = list(zip(*rows))
+    ids = np.array(columns[0], dtype=np.int64)
+    start_lat, start_lng, end_lat, end_lng, road_bearing = (
+        np.array(column, dtype=np.float64) for column in columns[1:6]
+    )
+    current_lat = np.array([np.nan if v is None else v for v in columns[6]], dtype=np.float64)
+    current_lng = np.array([np.nan if v is None else v for v in columns[7]], dtype=np.float64)
+    ratings = np.array([float(v) for v in columns[8]], dtype=np.float64)
+
+    cos_lat = np.cos(np.radians((start_lat + end_lat) / 2))
+    end_x, end_y = _project(end_lat, end_lng, start_lat, start_lng, cos_lat)
+    length_sq = np.maximum(end_x ** 2 + end_y ** 2, 1e-12)
+    length = np.sqrt(length_sq)
+
+    def locate(lat, lng):
+        # Segmentdagi nisbiy o'rin (0 - boshi, 1 - oxiri) va segmentgacha masofa
+        x, y = _project(lat, lng, start_lat, start_lng, cos_lat)
+        position = (x * end_x + y * end_y) / length_sq
+        clipped = np.clip(position, 0.0, 1.0)
+        offset = np.hypot(x - clipped * end_x, y - clipped * end_y)
+        return position, offset
+
+    pickup_pos, pickup_offset = locate(pickup.lat, pickup.lng)
+    dropoff_pos, dropoff_offset = locate(dropoff.lat, dropoff.lng)
+
+    has_current = ~np.isnan(current_lat)
+    current_pos, _ = locate(np.where(has_current, current_lat, start_lat),
+                            np.where(has_current, current_lng, start_lng))
+    slack = tolerance_km / length
+
+    trip_bearing = initial_bearing(pickup.lat, pickup.lng, dropoff.lat, dropoff.lng)
+
+    mask = (
+        (pickup_offset <= tolerance_km)
+        & (dropoff_offset <= tolerance_km)
+        & (pickup_pos < dropoff_pos)
+        & (bearing_difference(road_bearing, trip_bearing) <= max_bearing_diff)
+        # Haydovchi olish joyidan o'tib ketmagan bo'lishi kerak
+        & (~has_current | (pickup_pos >= current_pos - slack))
+    )
+    if not mask.any():
+        return []
+
+    ids = ids[mask]
+    ratings = ratings[mask]
+    pickup_offset = pickup_offset[mask]
+    dropoff_offset = dropoff_offset[mask]
+    origin_lat = np.where(has_current, current_lat, start_lat)[mask]
+    origin_lng = np.where(has_current, current_lng, start_lng)[mask]
+    end_lat = end_lat[mask]
+    end_lng = end_lng[mask]
+
+    # Haydovchi yo'li: origin -> olish joyi -> tushirish joyi -> manzil
+    detour = (
+        haversine_km(origin_lat, origin_lng, pickup.lat, pickup.lng)
+        + haversine_km(pickup.lat, pickup.lng, dropoff.lat, dropoff.lng)
+        + haversine_km(dropoff.lat, dropoff.lng, end_lat, end_lng)
+        - haversine_km(origin_lat, origin_lng, end_lat, end_lng)
+    )
+    detour = np.maximum(detour, 0.0)
+
+    # Avval 100 metrgacha yaxlitlangan detour, teng bo'lsa yuqori reyting
+    order = np.lexsort((-ratings, np.round(detour, 1)))[:limit]
+
+    roads = DriverRoad.objects.select_related(
+        'driver', 'from_location', 'to_location'
+    ).in_bulk([int(ids[i]) for i in order])
+
+    results = []
+    for i in order:
+        road = roads.get(int(ids[i]))
+        if road is None:
+            continue
+        road.detour_km = round(float(detour[i]), 3)
+        road.pickup_distance_km = round(float(pickup_offset[i]), 3)
+        road.dropoff_distance_km = round(float(dropoff_offset[i]), 3)
+        results.append(road)
+    return results
@@ -0,0 +1,21 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def add_to_counter(model, lookup, delta, field='value'):
+    """
+    `lookup` bilan topilgan qatorga `delta` ni bitta UPDATE bilan qo'shish,
+    qator hali bo'lmasa yaratish. Parallel yaratishda IntegrityError bo'lsa
+    qayta UPDATE qilinadi.
+    """
+    if not delta:
+        return
+
+    if model.objects.filter(**lookup).update(**{field: F(field) + delta}):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{field: delta})
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**{field: F(field) + delta})
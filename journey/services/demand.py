@@ -0,0 +1,164 @@
+import math
+from collections import Counter
+from functools import lru_cache
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Substr
+
+from ..models.location import UserLocation
+from ..models.stats import DemandCell, DemandSource
+from ..models.travel import Travel
+from .counters import add_to_counter
+from .geo import cells_for_bbox, decode_geohash_bbox, encode_geohash, prefix_upper_bound
+
+DEFAULTS = {
+    'PRECISION': 6,  # ~1.2km x 0.6km katak
+    'BUCKET_MINUTES': 15,
+    'USER_LOCATIONS': True,
+    'DEFAULT_WINDOW_HOURS': 24,
+    'MAX_WINDOW_DAYS': 31,
+    'MAX_COVER_CELLS': 16,
+}
+
+# Har bir manba uchun: model va nuqtaning joylashuv maydoni
+SOURCES = {
+    DemandSource.TRAVEL: (Travel, 'from_location'),
+    DemandSource.USER_LOCATION: (UserLocation, 'location'),
+}
+
+
+def demand_options():
+    return {**DEFAULTS, **getattr(settings, 'DEMAND_HEATMAP', {})}
+
+
+def bucket_start(moment, minutes=None):
+    """`moment` tushadigan vaqt oralig'ining boshi (UTC)"""
+    seconds = (minutes or demand_options()['BUCKET_MINUTES']) * 60
+    return datetime.fromtimestamp(math.floor(moment.timestamp() / seconds) * seconds, tz=dt_timezone.utc)
+
+
+def point_cell(lat, lng, geohash='', precision=None):
+    """Nuqtaning katagi: saqlangan geohash prefiksi, bo'lmasa koordinatadan"""
+    precision = precision or demand_options()['PRECISION']
+    if geohash and len(geohash) >= precision:
+        return geohash[:precision]
+    return encode_geohash(lat, lng, precision)
+
+
+def travel_point(travel):
+    location = travel.from_location
+    return travel.created_at, location.lat, location.lng, location.geohash
+
+
+def count_points(points, options=None):
+    """`points` - [(created_at, lat, lng, geohash), ...]. Natija: Counter{(bucket, cell): soni}"""
+    options = options or demand_options()
+    counts = Counter()
+    for created_at, lat, lng, geohash in points:
+        bucket = bucket_start(created_at, options['BUCKET_MINUTES'])
+        counts[(bucket, point_cell(lat, lng, geohash, options['PRECISION']))] += 1
+    return counts
+
+
+def record_counts(source, counts):
+    """
+    {(bucket, cell): farq} ni jadvalga qo'shish (chaqiruvchining tranzaksiyasida).
+    Qatorlar tartib bilan yangilanadi: parallel tranzaksiyalar bir-birini kutadi, deadlock bo'lmaydi.
+    """
+    for (bucket, cell), delta in sorted(counts.items()):
+        add_to_counter(DemandCell, {'source': source, 'bucket': bucket, 'cell': cell}, delta, field='count')
+
+
+@lru_cache(maxsize=65536)
+def cell_bounds(cell):
+    """Katak chegaralari va markazi: (min_lat, min_lng, max_lat, max_lng, lat, lng) - shahar kataklari takrorlanadi"""
+    min_lat, min_lng, max_lat, max_lng = decode_geohash_bbox(cell)
+    return min_lat, min_lng, max_lat, max_lng, round((min_lat + max_lat) / 2, 6), round((min_lng + max_lng) / 2, 6)
+
+
+def heatmap(min_lat, min_lng, max_lat, max_lng, since, until, precision=None, source=DemandSource.TRAVEL):
+    """
+    To'rtburchak va vaqt oynasidagi kataklar bo'yicha nuqtalar soni.
+
+    Oyna oraliq chegaralariga kengaytiriladi: [bucket_start(since), until).
+    Jadval (source, bucket) bo'yicha diapazonda o'qiladi, to'rtburchak esa bir
+    nechta geohash prefiksi diapazoniga aylantiriladi - so'rov narxi tarix
+    hajmiga emas, oynadagi qatorlar soniga bog'liq. `precision` saqlangan
+    aniqlikdan kichik bo'lsa kataklar prefiks bo'yicha yig'iladi.
+    Natija: {'since', 'until', 'precision', 'cells': [{'cell', 'lat', 'lng', 'count'}], 'total'}
+    """
+    options = demand_options()
+    precision = min(precision or options['PRECISION'], options['PRECISION'])
+    since = bucket_start(since, options['BUCKET_MINUTES'])
+
+    area = Q()
+    for prefix in cells_for_bbox(min_lat, min_lng, max_lat, max_lng, precision, options['MAX_COVER_CELLS']):
+        area |= Q(cell__gte=prefix, cell__lt=prefix_upper_bound(prefix))
+
+    rows = DemandCell.objects.filter(area, source=source, bucket__gte=since, bucket__lt=until)
+    if precision < options['PRECISION']:
+        rows = rows.annotate(key=Substr('cell', 1, precision)).values('key')
+    else:
+        rows = rows.values(key=F('cell'))
+    rows = rows.annotate(total=Sum('count')).order_by().values_list('key', 'total')
+
+    cells = []
+    for cell, count in rows:
+        cell_min_lat, cell_min_lng, cell_max_lat, cell_max_lng, lat, lng = cell_bounds(cell)
+        if not count or cell_max_lat < min_lat or cell_min_lat > max_lat \
+                or cell_max_lng < min_lng or cell_min_lng > max_lng:
+            continue
+        cells.append({'cell': cell, 'lat': lat, 'lng': lng, 'count': count})
+    cells.sort(key=lambda item: (-item['count'], item['cell']))
+
+    return {
+        'since': since,
+        'until': until,
+        'precision': precision,
+        'bucket_minutes': options['BUCKET_MINUTES'],
+        'cells': cells,
+        'total': sum(item['count'] for item in cells),
+    }
+
+
+def rebuild_demand(source, since=None, batch_size=5000):
+    """
+    Manba jadvalidan (Travel / UserLocation) kataklarni qaytadan hisoblash.
+    `since` berilsa faqat u tushgan oraliqdan keyingi qatorlar qayta yoziladi.
+    Natija: (o'qilgan nuqtalar soni, yozilgan qatorlar soni)
+    """
+    options = demand_options()
+    model, field = SOURCES[source]
+    columns = ('created_at', f'{field}__lat', f'{field}__lng', f'{field}__geohash')
+    queryset = model.objects.filter(**{f'{field}__isnull': False}).order_by('pk')
+    cells = DemandCell.objects.filter(source=source)
+    if since is not None:
+        since = bucket_start(since, options['BUCKET_MINUTES'])
+        queryset = queryset.filter(created_at__gte=since)
+        cells = cells.filter(bucket__gte=since)
+
+    with transaction.atomic():
+        counts = Counter()
+        points = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).values_list('pk', *columns)[:batch_size])
+            if not batch:
+                break
+            counts.update(count_points((row[1:] for row in batch), options))
+            points += len(batch)
+            last_pk = batch[-1][0]
+
+        cells.delete()
+        DemandCell.objects.bulk_create(
+            [
+                DemandCell(source=source, bucket=bucket, cell=cell, count=count)
+                for (bucket, cell), count in counts.items()
+            ],
+            batch_size=1000
+        )
+
+    return points, len(counts)
@@ -0,0 +1,190 @@
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+
+from ..models.driver import Driver, DriverStatus
+from .geo_vector import EARTH_RADIUS_KM
+
+
+class DriverLocationIndex:
+    """
+    Faol haydovchilar koordinatalarining jarayon ichidagi ixcham NumPy indeksi.
+
+    Koordinatalar radianlarda uzluksiz massivlarda saqlanadi, o'chirish oxirgi
+    qator bilan almashtirish orqali bajariladi. Boshqa workerlardagi o'zgarishlar
+    `Driver.updated_at` bo'yicha delta so'rov bilan, davriy ravishda esa to'liq
+    qayta yuklash bilan olinadi.
+    """
+
+    def __init__(self, sync_interval=None, reload_interval=None):
+        self.sync_interval = (
+            sync_interval if sync_interval is not None
+            else getattr(settings, 'DRIVER_INDEX_SYNC_SECONDS', 2)
+        )
+        self.reload_interval = (
+            reload_interval if reload_interval is not None
+            else getattr(settings, 'DRIVER_INDEX_RELOAD_SECONDS', 300)
+        )
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lat = np.empty(0, dtype=np.float64)
+        self._lng = np.empty(0, dtype=np.float64)
+        self._cos_lat = np.empty(0, dtype=np.float64)
+        self._size = 0
+        self._rows = {}
+        self._watermark = None
+        self._loaded_at = None
+        self._synced_at = None
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, capacity):
+        if capacity <= len(self._ids):
+            return
+        capacity = max(capacity, 2 * len(self._ids), 64)
+        for name in ('_ids', '_lat', '_lng', '_cos_lat'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def upsert(self, driver_id, lat, lng):
+        """Haydovchi koordinatasini qo'shish yoki yangilash"""
+        lat_rad = np.radians(lat)
+        with self._lock:
+            row = self._rows.get(driver_id)
+            if row is None:
+                self._reserve(self._size + 1)
+                row = self._size
+                self._size += 1
+                self._rows[driver_id] = row
+                self._ids[row] = driver_id
+            self._lat[row] = lat_rad
+            self._lng[row] = np.radians(lng)
+            self._cos_lat[row] = np.cos(lat_rad)
+
+    def remove(self, driver_id):
+        """Haydovchini indeksdan olib tashlash"""
+        with self._lock:
+            row = self._rows.pop(driver_id, None)
+            if row is None:
+                return
+            last = self._size - 1
+            if row != last:
+                moved_id = int(self._ids[last])
+                for array in (self._ids, self._lat, self._lng, self._cos_lat):
+                    array[row] = array[last]
+                self._rows[moved_id] = row
+            self._size = last
+
+    def apply(self, driver_id, status, lat, lng):
+        """Haydovchi holatiga qarab indeksni yangilash"""
+        if status == DriverStatus.ACTIVE and lat is not None and lng is not None:
+            self.upsert(driver_id, lat, lng)
+        else:
+            self.remove(driver_id)
+
+    def _fetch(self, queryset):
+        return queryset.values_list(
+            'id', 'status', 'current_location__lat', 'current_location__lng', 'updated_at'
+        )
+
+    def reload(self):
+        """Indeksni bazadan to'liq qayta yuklash"""
+        rows = list(self._fetch(
+            Driver.objects.filter(status=DriverStatus.ACTIVE, current_location__isnull=False)
+        ))
+        watermark = Driver.objects.aggregate(value=Max('updated_at'))['value']
+
+        with self._lock:
+            self._clear()
+            self._reserve(len(rows))
+            for driver_id, status, lat, lng, _ in rows:
+                self.apply(driver_id, status, lat, lng)
+            self._watermark = watermark
+            self._loaded_at = self._synced_at = time.monotonic()
+
+    def sync(self):
+        """Oxirgi sinxronizatsiyadan keyin o'zgargan haydovchilarni qo'llash"""
+        queryset = Driver.objects.all()
+        if self._watermark is not None:
+            queryset = queryset.filter(updated_at__gte=self._watermark)
+
+        rows = list(self._fetch(queryset))
+        with self._lock:
+            for driver_id, status, lat, lng, updated_at in rows:
+                self.apply(driver_id, status, lat, lng)
+                if self._watermark is None or updated_at > self._watermark:
+                    self._watermark = updated_at
+            self._synced_at = time.monotonic()
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.reload_interval:
+            self.reload()
+        elif now - self._synced_at >= self.sync_interval:
+            self.sync()
+
+    def nearest(self, lat, lng, limit=10, max_distance_km=None):
+        """
+        Nuqtaga eng yaqin haydovchilar.
+        Natija: [(driver_id, distance_km), ...] masofa bo'yicha o'sish tartibida
+        """
+        self.ensure_fresh()
+
+        lat_rad = np.radians(lat)
+        lng_rad = np.radians(lng)
+        with self._lock:
+            size = self._size
+            if not size or limit <= 0:
+                return []
+            ids = self._ids[:size].copy()
+            d_lat = self._lat[:size] - lat_rad
+            d_lng = self._lng[:size] - lng_rad
+            cos_lat = self._cos_lat[:size].copy()
+
+        a = np.sin(d_lat / 2) ** 2 + np.cos(lat_rad) * cos_lat * np.sin(d_lng / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        if max_distance_km is not None:
+            mask = distances <= max_distance_km
+            ids = ids[mask]
+            distances = distances[mask]
+
+        if len(distances) > limit:
+            top = np.argpartition(distances, limit - 1)[:limit]
+        else:
+            top = np.arange(len(distances))
+        top = top[np.argsort(distances[top])]
+
+        return [(int(ids[i]), float(distances[i])) for i in top]
+
+
+driver_index = DriverLocationIndex()
+
+
+def find_nearest_drivers(lat, lng, limit=10, max_distance_km=None):
+    """
+    Eng yaqin faol haydovchilarni modellar bilan birga qaytarish.
+    Natija: [(driver, distance_km), ...]
+    """
+    matches = driver_index.nearest(lat, lng, limit=limit, max_distance_km=max_distance_km)
+    if not matches:
+        return []
+
+    drivers = Driver.objects.filter(
+        id__in=[driver_id for driver_id, _ in matches],
+        status=DriverStatus.ACTIVE
+    ).in_bulk()
+    return [
+        (drivers[driver_id], distance)
+        for driver_id, distance in matches
+        if driver_id in drivers
+    ]
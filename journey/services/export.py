@@ -0,0 +1,164 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from ..models.passengers import Passenger
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_CHUNK_SIZE = 2000
+# Javob bo'laklari: har bir satr alohida yuborilmaydi
+LINES_PER_WRITE = 500
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# CSV ustunlari: ichma-ich maydonlar nuqta bilan ("from_location.name")
+TRAVEL_CSV_COLUMNS = [
+    'id', 'created_at', 'status', 'creator',
+    'from_location.id', 'from_location.name', 'from_location.lat', 'from_location.lng',
+    'to_location.id', 'to_location.name', 'to_location.lat', 'to_location.lng',
+    'driver.id', 'driver.name', 'driver.contact',
+    'expected_price', 'final_price', 'distance_km', 'estimated_duration_min',
+    'started_at', 'completed_at',
+    'info.has_female', 'info.driver_rating', 'info.passenger_rating', 'info.special_requests',
+    'passengers',
+]
+
+USER_LOCATION_CSV_COLUMNS = [
+    'id', 'telegram_id', 'created_at', 'location_id', 'name', 'lat', 'lng',
+    'accuracy', 'live_period', 'heading',
+]
+
+
+class _Echo:
+    """csv.writer uchun: yozilgan satrni saqlamasdan qaytaradi"""
+
+    def write(self, value):
+        return value
+
+
+def _location(location):
+    if location is None:
+        return None
+    return {'id': location.id, 'name': location.name, 'lat': location.lat, 'lng': location.lng}
+
+
+def travel_record(travel):
+    """Bitta sayohat (joylar, haydovchi, TravelInfo va yo'lovchilar bilan)"""
+    info = getattr(travel, 'info', None)
+    driver = travel.driver
+    return {
+        'id': travel.id,
+        'created_at': travel.created_at,
+        'status': travel.status,
+        'creator': travel.creator,
+        'from_location': _location(travel.from_location),
+        'to_location': _location(travel.to_location),
+        'driver': {'id': driver.id, 'name': driver.name, 'contact': driver.contact} if driver else None,
+        'expected_price': travel.expected_price,
+        'final_price': travel.final_price,
+        'distance_km': travel.distance_km,
+        'estimated_duration_min': travel.estimated_duration_min,
+        'started_at': travel.started_at,
+        'completed_at': travel.completed_at,
+        'info': {
+            'has_female': info.has_female,
+            'driver_rating': info.driver_rating,
+            'passenger_rating': info.passenger_rating,
+            'special_requests': info.special_requests,
+        } if info else None,
+        'passengers': [
+            {'telegram_id': passenger.telegram_id, 'name': passenger.name, 'contact': passenger.contact}
+            for passenger in info.passengers.all()
+        ] if info else [],
+    }
+
+
+def user_location_record(user_location):
+    location = user_location.location
+    return {
+        'id': user_location.id,
+        'telegram_id': user_location.user,
+        'created_at': user_location.created_at,
+        'location_id': location.id,
+        'name': location.name,
+        'lat': location.lat,
+        'lng': location.lng,
+        'accuracy': user_location.accuracy,
+        'live_period': user_location.live_period,
+        'heading': user_location.heading,
+    }
+
+
+def _csv_value(record, column):
+    value = record
+    for key in column.split('.'):
+        value = value.get(key) if value is not None else None
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        # Yo'lovchilar CSV da bitta ustunda: telegram_id lar ";" bilan
+        return ';'.join(str(item['telegram_id']) for item in value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def ndjson_lines(records):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buffer = []
+    for record in records:
+        buffer.append(encoder.encode(record) + '\n')
+        if len(buffer) >= LINES_PER_WRITE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def csv_lines(records, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    buffer = []
+    for record in records:
+        buffer.append(writer.writerow([_csv_value(record, column) for column in columns]))
+        if len(buffer) >= LINES_PER_WRITE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _streaming_response(records, output, columns, name):
+    lines = ndjson_lines(records) if output == 'ndjson' else csv_lines(records, columns)
+    response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[output])
+    stamp = timezone.now().strftime('%Y%m%d%H%M%S')
+    response['Content-Disposition'] = f'attachment; filename="{name}-{stamp}.{output}"'
+    return response
+
+
+def export_travels(queryset, output, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Sayohatlarni NDJSON yoki CSV sifatida oqim bilan qaytarish.
+    Qatorlar `iterator(chunk_size)` bilan o'qiladi, yo'lovchilar esa har bir
+    bo'lak uchun bitta prefetch so'rovi bilan olinadi - xotira qatorlar soniga bog'liq emas.
+    """
+    queryset = queryset.select_related(
+        'from_location', 'to_location', 'driver', 'info'
+    ).prefetch_related(
+        Prefetch('info__passengers', queryset=Passenger.objects.only('id', 'telegram_id', 'name', 'contact'))
+    )
+    records = (travel_record(travel) for travel in queryset.iterator(chunk_size=chunk_size))
+    return _streaming_response(records, output, TRAVEL_CSV_COLUMNS, 'travels')
+
+
+def export_user_locations(queryset, output, chunk_size=EXPORT_CHUNK_SIZE):
+    """UserLocation tarixini NDJSON yoki CSV sifatida oqim bilan qaytarish"""
+    queryset = queryset.select_related('location')
+    records = (user_location_record(item) for item in queryset.iterator(chunk_size=chunk_size))
+    return _streaming_response(records, output, USER_LOCATION_CSV_COLUMNS, 'user-locations')
@@ -0,0 +1,178 @@
+import math
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9  # ~4.8m x 4.8m katak
+MAX_SEARCH_PRECISION = 8
+
+_DECODE_MAP = {char: index for index, char in enumerate(GEOHASH_ALPHABET)}
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Ikki nuqta orasidagi masofa (metr)"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def initial_bearing(lat1, lng1, lat2, lng2):
+    """Birinchi nuqtadan ikkinchisiga boshlang'ich yo'nalish (0-360 gradus)"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_lambda = math.radians(lng2 - lng1)
+
+    x = math.sin(d_lambda) * math.cos(phi2)
+    y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(d_lambda)
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Koordinatani geohash satriga aylantirish"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+
+def decode_geohash_bbox(geohash):
+    """Geohash katagining chegaralari: (min_lat, min_lng, max_lat, max_lng)"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _DECODE_MAP[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def cell_size_m(precision, lat):
+    """Berilgan aniqlikdagi katakning (balandlik, kenglik) o'lchami metrda"""
+    total_bits = 5 * precision
+    lat_bits = total_bits // 2
+    lng_bits = total_bits - lat_bits
+
+    height = 180.0 / (2 ** lat_bits) * METERS_PER_DEGREE
+    width = 360.0 / (2 ** lng_bits) * METERS_PER_DEGREE * math.cos(math.radians(lat))
+    return height, width
+
+
+def precision_for_radius(lat, radius_m):
+    """Radius qo'shni kataklardan chiqib ketmaydigan eng mayda aniqlik"""
+    for precision in range(MAX_SEARCH_PRECISION, 0, -1):
+        height, width = cell_size_m(precision, lat)
+        if min(height, width) >= radius_m:
+            return precision
+    return 1
+
+
+def neighbour_cells(geohash):
+    """Katakning o'zi va uning 8 ta qo'shnisi"""
+    min_lat, min_lng, max_lat, max_lng = decode_geohash_bbox(geohash)
+    height = max_lat - min_lat
+    width = max_lng - min_lng
+    center_lat = (min_lat + max_lat) / 2
+    center_lng = (min_lng + max_lng) / 2
+
+    cells = []
+    for d_lat in (-1, 0, 1):
+        lat = center_lat + d_lat * height
+        if lat < -90 or lat > 90:
+            continue
+        for d_lng in (-1, 0, 1):
+            lng = center_lng + d_lng * width
+            lng = (lng + 180) % 360 - 180
+            cell = encode_geohash(lat, lng, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def cells_for_radius(lat, lng, radius_m):
+    """Radius ichidagi barcha nuqtalarni qamrab oluvchi geohash prefikslari"""
+    precision = precision_for_radius(lat, radius_m)
+    return neighbour_cells(encode_geohash(lat, lng, precision))
+
+
+def bounding_box(lat, lng, radius_m):
+    """Aylanani to'liq o'rab turgan to'rtburchak: (min_lat, min_lng, max_lat, max_lng)"""
+    d_lat = radius_m / METERS_PER_DEGREE
+    angular = radius_m / EARTH_RADIUS_M
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat <= math.sin(angular):
+        d_lng = 180.0
+    else:
+        d_lng = math.degrees(math.asin(math.sin(angular) / cos_lat))
+    return lat - d_lat, lng - d_lng, lat + d_lat, lng + d_lng
+
+
+def prefix_upper_bound(prefix):
+    """Prefiks bilan boshlanuvchi satrlar uchun yuqori chegara (index range scan uchun)"""
+    return prefix + '~'
+
+
+def cells_for_bbox(min_lat, min_lng, max_lat, max_lng, precision, max_cells=16):
+    """
+    To'rtburchakni to'liq qoplovchi geohash kataklari. `precision` dan boshlab
+    kataklar soni `max_cells` dan oshmaydigan eng mayda aniqlik tanlanadi.
+    """
+    for precision in range(precision, 0, -1):
+        total_bits = 5 * precision
+        height = 180.0 / (2 ** (total_bits // 2))
+        width = 360.0 / (2 ** (total_bits - total_bits // 2))
+        lat_last = int(180.0 / height) - 1
+        lng_last = int(360.0 / width) - 1
+        rows = range(min(int((min_lat + 90) // height), lat_last), min(int((max_lat + 90) // height), lat_last) + 1)
+        cols = range(min(int((min_lng + 180) // width), lng_last), min(int((max_lng + 180) // width), lng_last) + 1)
+        if len(rows) * len(cols) <= max_cells:
+            break
+
+    return [
+        encode_geohash(-90 + (row + 0.5) * height, -180 + (col + 0.5) * width, precision)
+        for row in rows
+        for col in cols
+    ]
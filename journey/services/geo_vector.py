@@ -0,0 +1,82 @@
+import numpy as np
+
+from .geo import EARTH_RADIUS_M
+
+EARTH_RADIUS_KM = EARTH_RADIUS_M / 1000
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Massivlar uchun vektorlashtirilgan haversine masofa (km), kirish gradusda"""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    d_lat = lat2 - lat1
+    d_lng = np.radians(np.asarray(lng2) - np.asarray(lng1))
+
+    a = np.sin(d_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(d_lng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bearing_difference(a, b):
+    """Ikki yo'nalish orasidagi eng kichik burchak (0-180 gradus)"""
+    return np.abs((np.asarray(a) - np.asarray(b) + 180) % 360 - 180)
+
+
+# WGS-84 ellipsoidi (GPS koordinatalari shu ellipsoidda)
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+
+def geodesic_km(lat1, lng1, lat2, lng2, tolerance=1e-12, max_iterations=100):
+    """
+    WGS-84 ellipsoidi bo'yicha geodezik masofa (km), massivlar uchun
+    vektorlashtirilgan Vincenty teskari masalasi (aniqligi ~1 mm).
+    Yaqinlashmagan (deyarli qarama-qarshi nuqtalar) juftliklar
+    geopy.distance.geodesic (Karney) bilan alohida hisoblanadi.
+    """
+    lat1, lng1, lat2, lng2 = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (lat1, lng1, lat2, lng2)))
+    f = WGS84_F
+
+    big_l = np.radians(lng2 - lng1)
+    u1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    lam = big_l
+    converged = np.zeros(lam.shape, dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(max_iterations):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            # Ustma-ust nuqtalar: sin_sigma = 0, masofa 0
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # Ekvator bo'ylab chiziq: cos2_alpha = 0
+            cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+            c = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+            previous = lam
+            lam = big_l + (1 - c) * f * sin_alpha * (
+                sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+            )
+            converged = np.abs(lam - previous) <= tolerance
+            if converged.all():
+                break
+
+    u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (cos_2sigma_m + big_b / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+        - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+    ))
+    distance = WGS84_B * big_a * (sigma - delta_sigma) / 1000
+
+    if not converged.all():
+        from geopy.distance import geodesic
+
+        for index in zip(*np.nonzero(~converged)):
+            distance[index] = geodesic((lat1[index], lng1[index]), (lat2[index], lng2[index])).km
+    return distance
@@ -0,0 +1,171 @@
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from ..models.location import Location, UserLocation
+from .geo import bounding_box, cells_for_radius, encode_geohash, haversine_m, prefix_upper_bound
+
+NEARBY_MAX_RADIUS_M = 50000
+NEARBY_DEFAULT_LIMIT = 20
+BATCH_MAX_SIZE = 1000
+
+
+def nearby_locations(lat, lng, radius_m, limit=NEARBY_DEFAULT_LIMIT, only_available=False):
+    """
+    Radius ichidagi joylashuvlarni masofa bo'yicha saralab qaytarish.
+    Faqat qo'shni geohash kataklari ko'riladi, shuning uchun butun jadval skan qilinmaydi.
+    Natija: [(location, distance_m), ...]
+    """
+    cells = cells_for_radius(lat, lng, radius_m)
+    # startswith o'rniga oraliq so'rov: LIKE indeksni hamma backendlarda ishlatmaydi
+    cell_filter = reduce(or_, (
+        Q(geohash__gte=cell, geohash__lt=prefix_upper_bound(cell)) for cell in cells
+    ))
+
+    # Aylanani o'rab turgan to'rtburchak: Pythonga keladigan nomzodlar sonini kamaytiradi
+    min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, radius_m)
+
+    queryset = Location.objects.filter(
+        cell_filter,
+        lat__range=(min_lat, max_lat),
+        lng__range=(min_lng, max_lng)
+    )
+    if only_available:
+        queryset = queryset.filter(is_available=True)
+
+    candidates = []
+    for location_id, location_lat, location_lng in queryset.values_list('id', 'lat', 'lng'):
+        distance = haversine_m(lat, lng, location_lat, location_lng)
+        if distance <= radius_m:
+            candidates.append((distance, location_id))
+
+    candidates.sort()
+    candidates = candidates[:limit]
+
+    # To'liq obyektlar faqat natijaga kirganlar uchun olinadi
+    locations = Location.objects.in_bulk([location_id for _, location_id in candidates])
+    return [(locations[location_id], distance) for distance, location_id in candidates]
+
+
+def _create_each(user_locations, results):
+    """UserLocation larni bittadan saqlash; unikal to'qnashuv `results` ga xato sifatida yoziladi"""
+    created = []
+    for index, pair, user_location in user_locations:
+        user_location.pk = None
+        try:
+            with transaction.atomic():
+                user_location.save(force_insert=True)
+        except IntegrityError:
+            results[index] = {
+                'index': index,
+                'status': 'error',
+                'errors': {'coordinate': ['Bu lokatsiya allaqachon saqlangan']}
+            }
+            continue
+        created.append((index, pair, user_location))
+    return created
+
+
+def ingest_user_locations(items):
+    """
+    Ko'plab foydalanuvchi lokatsiyalarini bir tranzaksiyada saqlash.
+
+    `items` - validatsiyadan o'tgan `(index, data)` juftliklari. Mavjud Location
+    qatorlari bitta so'rov bilan topiladi, yetishmaganlari va UserLocation
+    qatorlari `bulk_create` bilan yoziladi.
+    Natija: (`index` bo'yicha natijalar lug'ati,
+             {telegram_id: har bir foydalanuvchining oxirgi UserLocation obyekti})
+    """
+    if not items:
+        return {}, {}
+
+    pairs = {(data['coordinate']['lat'], data['coordinate']['lng']) for _, data in items}
+    lats = {lat for lat, _ in pairs}
+    lngs = {lng for _, lng in pairs}
+
+    with transaction.atomic():
+        # 1. Mavjud locationlarni bitta so'rov bilan topish
+        location_ids = {
+            (lat, lng): location_id
+            for location_id, lat, lng in Location.objects.filter(
+                lat__in=lats, lng__in=lngs
+            ).values_list('id', 'lat', 'lng')
+            if (lat, lng) in pairs
+        }
+
+        # 2. Yetishmayotgan locationlarni yaratish
+        missing = {}
+        for _, data in items:
+            pair = (data['coordinate']['lat'], data['coordinate']['lng'])
+            if pair not in location_ids and pair not in missing:
+                missing[pair] = Location(
+                    name=data.get('name') or '',
+                    lat=pair[0],
+                    lng=pair[1],
+                    geohash=encode_geohash(*pair)
+                )
+
+        if missing:
+            Location.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            # ignore_conflicts bilan id qaytmaydi, shuning uchun qayta o'qiladi
+            for location_id, lat, lng in Location.objects.filter(
+                lat__in={lat for lat, _ in missing},
+                lng__in={lng for _, lng in missing}
+            ).values_list('id', 'lat', 'lng'):
+                if (lat, lng) in missing:
+                    location_ids[(lat, lng)] = location_id
+
+        # 3. Har bir location faqat bitta UserLocationga ega bo'lishi mumkin
+        taken = set(UserLocation.objects.filter(
+            location_id__in=location_ids.values()
+        ).values_list('location_id', flat=True))
+
+        results = {}
+        user_locations = []
+        for index, data in items:
+            pair = (data['coordinate']['lat'], data['coordinate']['lng'])
+            location_id = location_ids[pair]
+            if location_id in taken:
+                results[index] = {
+                    'index': index,
+                    'status': 'error',
+                    'errors': {'coordinate': ['Bu lokatsiya allaqachon saqlangan']}
+                }
+                continue
+
+            taken.add(location_id)
+            user_locations.append((index, pair, UserLocation(
+                user=data['telegram_id'],
+                location_id=location_id,
+                accuracy=data.get('accuracy'),
+                live_period=data.get('live_period'),
+                heading=data.get('heading')
+            )))
+
+        try:
+            with transaction.atomic():
+                UserLocation.objects.bulk_create([user_location for _, _, user_location in user_locations])
+        except IntegrityError:
+            # Parallel so'rov tekshiruvdan keyin xuddi shu lokatsiyani saqlagan:
+            # har bir yozuv alohida savepointda, faqat to'qnashganlari xato bo'ladi
+            user_locations = _create_each(user_locations, results)
+
+    latest = {}
+    for index, pair, user_location in user_locations:
+        results[index] = {
+            'index': index,
+            'status': 'created',
+            'id': user_location.id,
+            'location_id': user_location.location_id,
+            'location_created': pair in missing
+        }
+        latest[user_location.user] = user_location
+
+    # Oxirgi pozitsiyalarni serializatsiya qilish uchun locationlar bitta so'rovda olinadi
+    locations = Location.objects.in_bulk([user_location.location_id for user_location in latest.values()])
+    for user_location in latest.values():
+        user_location.location = locations[user_location.location_id]
+
+    return results, latest
@@ -0,0 +1,145 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from .cache_metrics import HitCounter
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'shared',
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'journey:passenger',
+    'TIMEOUT': 60 * 60,
+    'INVALIDATION_TTL': 2,
+    'LOCAL_MAXSIZE': 10000,
+    'LOCAL_TTL': 1.0,
+}
+
+# Invalidatsiyadan keyingi qisqa muddatda eski ma'lumot qayta yozilmasligi uchun belgi
+TOMBSTONE = '__invalidated__'
+
+
+class PassengerCache:
+    """
+    Telegram ID bo'yicha `PassengerDetailSerializer` natijasining read-through keshi.
+
+    BACKEND='shared' - Django kesh backendi (production da Redis) va uning
+    oldida qisqa TTL li jarayon ichidagi LRU; BACKEND='local' - faqat jarayon
+    ichidagi LRU (bitta worker yoki testlar uchun).
+    Invalidatsiya kalitni o'chirmaydi, qisqa muddatli belgi qo'yadi: o'zgarishdan
+    oldin bazadan o'qigan parallel so'rov eski qiymatni keshga yoza olmaydi.
+    Umumiy kesh xatoligi (Redis uzilgan) so'rovni yiqitmaydi: miss hisoblanadi
+    va chaqiruvchi bazadan o'qiydi.
+    """
+
+    def __init__(self, options=None):
+        options = {**DEFAULTS, **(options or getattr(settings, 'PASSENGER_CACHE', {}))}
+        self.backend = options['BACKEND']
+        if self.backend not in ('shared', 'local'):
+            raise ImproperlyConfigured(f"PASSENGER_CACHE['BACKEND'] noto'g'ri: {self.backend}")
+
+        self.cache_alias = options['CACHE_ALIAS']
+        self.key_prefix = options['KEY_PREFIX']
+        self.timeout = options['TIMEOUT']
+        self.invalidation_ttl = options['INVALIDATION_TTL']
+        local_ttl = options['LOCAL_TTL'] if self.backend == 'shared' else self.timeout
+        self.local = LRUCache(maxsize=options['LOCAL_MAXSIZE'], ttl=local_ttl)
+        self.counter = HitCounter('local_hits', 'shared_hits')
+
+    @property
+    def shared(self):
+        if self.backend != 'shared':
+            return None
+        return caches[self.cache_alias]
+
+    def _shared_call(self, method, *args):
+        """Umumiy kesh murojaati; backend xatoligida None"""
+        try:
+            return getattr(self.shared, method)(*args)
+        except Exception:
+            self.counter.incr('shared_errors')
+            logger.warning('Yo\'lovchilar keshi (%s): %s bajarilmadi', self.cache_alias, method, exc_info=True)
+            return None
+
+    def _key(self, telegram_id):
+        return f'{self.key_prefix}:{telegram_id}'
+
+    def get(self, telegram_id):
+        """Keshdagi payload; topilmasa None"""
+        payload = self.local.get(telegram_id)
+        if payload is not None and payload != TOMBSTONE:
+            self.counter.incr('local_hits')
+            return payload
+
+        if self.backend == 'shared':
+            payload = self._shared_call('get', self._key(telegram_id))
+            if payload is not None and payload != TOMBSTONE:
+                self.counter.incr('shared_hits')
+                self.local.set(telegram_id, payload)
+                return payload
+
+        self.counter.incr('misses')
+        return None
+
+    def fill(self, telegram_id, payload):
+        """Bazadan o'qilgan payloadni yozish (yaqinda invalidatsiya bo'lgan bo'lsa yozilmaydi)"""
+        payload = dict(payload)
+        if self.backend != 'shared':
+            return self.local.add(telegram_id, payload)
+
+        if not self._shared_call('add', self._key(telegram_id), payload, self.timeout):
+            return False
+        self.local.set(telegram_id, payload)
+        return True
+
+    def get_or_load(self, telegram_id, loader):
+        """
+        Read-through: keshda bo'lmasa `loader()` chaqiriladi va natija keshga yoziladi.
+        `loader` yo'lovchi topilmasa None qaytaradi (None keshlanmaydi).
+        """
+        payload = self.get(telegram_id)
+        if payload is not None:
+            return payload
+
+        payload = loader()
+        if payload is not None:
+            self.fill(telegram_id, payload)
+        return payload
+
+    def invalidate(self, telegram_id):
+        self.invalidate_many([telegram_id])
+
+    def invalidate_many(self, telegram_ids):
+        """Bir nechta yo'lovchi keshini bitta umumiy kesh murojaati bilan bekor qilish"""
+        telegram_ids = list(telegram_ids)
+        if not telegram_ids:
+            return
+
+        shared = self.backend == 'shared'
+        for telegram_id in telegram_ids:
+            if shared:
+                self.local.delete(telegram_id)
+            else:
+                self.local.set(telegram_id, TOMBSTONE, ttl=self.invalidation_ttl)
+        if shared:
+            self._shared_call(
+                'set_many',
+                {self._key(telegram_id): TOMBSTONE for telegram_id in telegram_ids},
+                self.invalidation_ttl
+            )
+        self.counter.incr('invalidations', len(telegram_ids))
+
+    def stats(self):
+        data = self.counter.snapshot()
+        data['backend'] = self.backend
+        data['local_size'] = len(self.local)
+        if self.backend == 'shared':
+            data['cache_alias'] = self.cache_alias
+        return data
+
+
+passenger_cache = PassengerCache()
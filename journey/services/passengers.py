@@ -0,0 +1,152 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+
+from ..models.passengers import Passenger
+from . import stats as stats_service
+from .passenger_cache import passenger_cache
+from .phones import normalize_phone
+
+BULK_UPSERT_MAX_SIZE = 100000
+# IN (...) ro'yxatlari va INSERT qismlari uchun (SQLite parametrlar chegarasi)
+LOOKUP_CHUNK_SIZE = 900
+INSERT_BATCH_SIZE = 1000
+
+
+def _chunks(values, size=LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def contact_key(contact):
+    """Raqam bandligini tekshirish kaliti: E.164 ko'rinishi, raqamga o'xshamasa o'zi"""
+    return normalize_phone(contact) or contact
+
+
+def contact_q(contact):
+    """`contact` bilan bir xil raqamli yo'lovchilar (yozilishidan qat'i nazar)"""
+    e164 = normalize_phone(contact)
+    return Q(contact_e164=e164) if e164 else Q(contact=contact)
+
+
+def contact_owners(contacts):
+    """{kalit: {telegram_id, ...}} - berilgan raqamlar kimlarga tegishli (bo'laklab IN so'rovlari)"""
+    e164_keys, raw_keys = set(), set()
+    for contact in contacts:
+        e164 = normalize_phone(contact)
+        if e164:
+            e164_keys.add(e164)
+        else:
+            raw_keys.add(contact)
+
+    owners = {}
+    for field, values in (('contact_e164', sorted(e164_keys)), ('contact', sorted(raw_keys))):
+        for chunk in _chunks(values):
+            rows = Passenger.objects.filter(**{f'{field}__in': chunk}).values_list('contact_e164', 'contact', 'telegram_id')
+            for e164, contact, telegram_id in rows:
+                owners.setdefault(e164 or contact, set()).add(telegram_id)
+    return owners
+
+
+def _error(index, telegram_id, field, message):
+    return {'index': index, 'telegram_id': telegram_id, 'status': 'error', 'errors': {field: [message]}}
+
+
+def bulk_upsert_passengers(items):
+    """
+    Ko'plab yo'lovchini telegram_id bo'yicha yaratish yoki yangilash (name, contact).
+
+    `items` - validatsiyadan o'tgan `(index, data)` juftliklari. Mavjud yo'lovchilar
+    va band telefon raqamlari bir necha IN so'rovi bilan olinadi, yozish esa
+    bitta `bulk_create(update_conflicts=True)` chaqiruvi bilan bajariladi.
+    Natija: `index` bo'yicha natijalar lug'ati
+    (status: created / updated / unchanged / error)
+    """
+    results = {}
+
+    # 1. So'rov ichidagi takrorlar: bir telegram_id uchun oxirgi yozuv olinadi
+    latest = {}
+    for index, data in items:
+        previous = latest.get(data['telegram_id'])
+        if previous is not None:
+            results[previous[0]] = _error(
+                previous[0], data['telegram_id'], 'telegram_id', 'Bu Telegram ID so\'rovda takrorlangan'
+            )
+        latest[data['telegram_id']] = (index, data)
+
+    records = sorted(latest.values(), key=lambda item: item[0])
+    contact_owner = {}
+    unique_records = []
+    for index, data in records:
+        # "+998 90 ..." va "90 ..." bitta raqam: normallashtirilgan kalit bo'yicha
+        owner = contact_owner.setdefault(contact_key(data['contact']), data['telegram_id'])
+        if owner != data['telegram_id']:
+            results[index] = _error(
+                index, data['telegram_id'], 'contact', 'Bu telefon raqam so\'rovdagi boshqa yo\'lovchiga berilgan'
+            )
+            continue
+        unique_records.append((index, data))
+
+    if not unique_records:
+        return results
+
+    with transaction.atomic():
+        # 2. Mavjud yo'lovchilar va telefon raqamlar egalari
+        existing = {}
+        for chunk in _chunks(data['telegram_id'] for _, data in unique_records):
+            for telegram_id, name, contact in Passenger.objects.filter(
+                telegram_id__in=chunk
+            ).values_list('telegram_id', 'name', 'contact'):
+                existing[telegram_id] = (name, contact)
+
+        taken = contact_owners(data['contact'] for _, data in unique_records)
+
+        # 3. Yoziladigan qatorlar
+        to_write = []
+        for index, data in unique_records:
+            telegram_id = data['telegram_id']
+            if taken.get(contact_key(data['contact']), set()) - {telegram_id}:
+                results[index] = _error(
+                    index, telegram_id, 'contact', 'Bu telefon raqam boshqa yo\'lovchiga tegishli'
+                )
+                continue
+
+            if telegram_id not in existing:
+                outcome = 'created'
+            elif existing[telegram_id] != (data['name'], data['contact']):
+                outcome = 'updated'
+            else:
+                outcome = 'unchanged'
+            results[index] = {'index': index, 'telegram_id': telegram_id, 'status': outcome}
+            if outcome != 'unchanged':
+                passenger = Passenger(
+                    telegram_id=telegram_id,
+                    name=data['name'],
+                    contact=data['contact']
+                )
+                # bulk_create save() ni chaqirmaydi
+                passenger.refresh_contact_index()
+                to_write.append(passenger)
+
+        if to_write:
+            Passenger.objects.bulk_create(
+                to_write,
+                update_conflicts=True,
+                unique_fields=['telegram_id'],
+                update_fields=['name', 'contact', *Passenger.CONTACT_INDEX_FIELDS, 'updated_at'],
+                batch_size=INSERT_BATCH_SIZE
+            )
+
+        # 4. Statistika va kesh
+        created = [passenger for passenger in to_write if passenger.telegram_id not in existing]
+        if created:
+            # created_at ni bulk_create (auto_now_add) obyektlarga o'rnatib qo'yadi
+            stats_service.record_passengers_created(created)
+
+        updated_ids = [passenger.telegram_id for passenger in to_write if passenger.telegram_id in existing]
+        if updated_ids:
+            transaction.on_commit(partial(passenger_cache.invalidate_many, updated_ids))
+
+    return results
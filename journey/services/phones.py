@@ -0,0 +1,92 @@
+import re
+
+from django.db.models import Q
+
+# Mahalliy yozuvlar (90 123 45 67, 8 90 ...) shu davlat kodi bilan to'ldiriladi
+DEFAULT_COUNTRY_CODE = '998'
+NATIONAL_NUMBER_LENGTH = 9
+# E.164: davlat kodi bilan birga ko'pi bilan 15 raqam
+E164_MAX_DIGITS = 15
+
+_NON_DIGITS = re.compile(r'\D')
+_PHONE_LIKE = re.compile(r'^\+?[\d\s().-]+$')
+
+
+def digits_of(value):
+    return _NON_DIGITS.sub('', value or '')
+
+
+def normalize_phone(value):
+    """
+    Erkin yozilgan telefon raqamni E.164 ko'rinishiga keltirish:
+    '+998 (90) 123-45-67', '998901234567', '90 123 45 67', '8 90 123 45 67' -> '+998901234567'.
+    Raqamga o'xshamasa bo'sh satr.
+    """
+    value = (value or '').strip()
+    digits = digits_of(value)
+    if not digits:
+        return ''
+
+    if value.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif len(digits) == NATIONAL_NUMBER_LENGTH:
+        digits = DEFAULT_COUNTRY_CODE + digits
+    elif len(digits) == NATIONAL_NUMBER_LENGTH + 1 and digits.startswith('8'):
+        # Eski "8 90 ..." yozuvi
+        digits = DEFAULT_COUNTRY_CODE + digits[1:]
+
+    if not digits or len(digits) > E164_MAX_DIGITS:
+        return ''
+    return '+' + digits
+
+
+def phone_index(value):
+    """Model ustunlari uchun (contact_e164, contact_reversed)"""
+    e164 = normalize_phone(value)
+    return e164, e164[1:][::-1]
+
+
+def is_phone_like(term):
+    """Faqat raqamlar, bo'shliq, qavs, chiziqcha va boshida '+' bo'lgan so'z"""
+    term = (term or '').strip()
+    return bool(_PHONE_LIKE.match(term)) and any(char.isdigit() for char in term)
+
+
+def _digit_prefix_q(field, prefix, lead=''):
+    """
+    `field` `lead + prefix` bilan boshlanadi - startswith o'rniga oraliq sharti.
+    SQLite da LIKE oddiy (BINARY) indeksdan foydalanmaydi, PostgreSQL da esa
+    text_pattern_ops talab qiladi; >= / < ikkalasida ham oddiy B-tree indeks probi.
+    Ustundagi qiymatlar faqat raqamlardan iborat bo'lgani uchun oraliq aniq.
+    """
+    condition = Q(**{f'{field}__gte': lead + prefix})
+    stem = prefix.rstrip('9')
+    if stem:
+        upper = stem[:-1] + str(int(stem[-1]) + 1)
+        condition &= Q(**{f'{field}__lt': lead + upper})
+    return condition
+
+
+def phone_q(term, path='contact'):
+    """
+    Telefon raqam bo'yicha qidiruv sharti (normallashtirilgan ustunlar orqali).
+
+    '+' bilan boshlangan so'z - raqam boshi (`<path>_e164`), to'liq raqam ham
+    shu jumladan; mahalliy raqamdan uzun raqamlar ('998901234567', '00998...',
+    '8 90 ...') - to'liq raqam; qolganlari - raqam oxiri: oxirgi N raqam
+    teskari yozilgan `<path>_reversed` ustunida prefiks bo'ladi.
+    Raqam topilmasa None.
+    """
+    term = (term or '').strip()
+    digits = digits_of(term)
+    if not digits:
+        return None
+
+    if term.startswith('+'):
+        return _digit_prefix_q(f'{path}_e164', digits, lead='+') if len(digits) <= E164_MAX_DIGITS else None
+    if len(digits) > NATIONAL_NUMBER_LENGTH:
+        e164 = normalize_phone(term)
+        return Q(**{f'{path}_e164': e164}) if e164 else None
+    return _digit_prefix_q(f'{path}_reversed', digits[::-1])
@@ -0,0 +1,204 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+
+from .cache_metrics import HitCounter
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'journey:latest-position',
+    'TIMEOUT': 24 * 60 * 60,
+    'LOCAL_MAXSIZE': 10000,
+    'LOCAL_TTL': 1.0,
+}
+
+# Redis: versiya kalitini solishtirib yozish bitta atomik qadamda.
+# KEYS: qiymat, versiya; ARGV: versiya, qiymat, TTL (0 - muddatsiz)
+SET_IF_NEWER = """
+local current = redis.call('GET', KEYS[2])
+if current and current > ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[3])
+else
+    redis.call('SET', KEYS[1], ARGV[2])
+    redis.call('SET', KEYS[2], ARGV[1])
+end
+return 1
+"""
+
+
+class LatestPositionStore:
+    """
+    Telegram ID bo'yicha oxirgi joylashuv (foydalanuvchi va haydovchilar) ombori.
+
+    Ikki qavatli: jarayon ichidagi qisqa TTL li LRU va Django kesh backendi
+    orqali umumiy qavat (production da Redis, testlarda LocMemCache).
+    Qiymat - `UserLocationSerializer` natijasi. Umumiy qavat xatoligi (Redis
+    uzilgan) so'rovni yiqitmaydi: o'qish miss hisoblanadi va chaqiruvchi bazadan oladi.
+
+    Yozish umumiy qavatdagi qiymat bilan (created_at, id) bo'yicha solishtiriladi:
+    boshqa jarayon (worker) yozgan yangiroq pozitsiya eski qiymat bilan almashtirilmaydi.
+    Redis da bu Lua skripti bilan atomik, boshqa backendlarda o'qib-solishtirib yoziladi.
+    """
+
+    def __init__(self, options=None):
+        options = {**DEFAULTS, **(options or getattr(settings, 'POSITION_STORE', {}))}
+        self.cache_alias = options['CACHE_ALIAS']
+        self.key_prefix = options['KEY_PREFIX']
+        self.timeout = options['TIMEOUT']
+        self.local = LRUCache(maxsize=options['LOCAL_MAXSIZE'], ttl=options['LOCAL_TTL'])
+        self.counter = HitCounter('local_hits', 'shared_hits')
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def _shared_error(self, method):
+        self.counter.incr('shared_errors')
+        logger.warning('Pozitsiyalar keshi (%s): %s bajarilmadi', self.cache_alias, method, exc_info=True)
+
+    def _shared_call(self, method, *args):
+        """Umumiy qavat murojaati; backend xatoligida None"""
+        try:
+            return getattr(self.shared, method)(*args)
+        except Exception:
+            self._shared_error(method)
+            return None
+
+    async def _ashared_call(self, method, *args):
+        try:
+            return await getattr(self.shared, method)(*args)
+        except Exception:
+            self._shared_error(method)
+            return None
+
+    def _key(self, telegram_id):
+        return f'{self.key_prefix}:{telegram_id}'
+
+    @staticmethod
+    def _is_newer(current, candidate):
+        if current is None:
+            return True
+        return (candidate['created_at'], candidate['id']) >= (current['created_at'], current['id'])
+
+    @staticmethod
+    def _version(payload):
+        """Satr sifatida solishtiriladigan versiya (created_at ISO, id nol bilan to'ldirilgan)"""
+        return f"{payload['created_at']}|{int(payload['id']):020d}"
+
+    def _write_redis(self, cache, payloads):
+        client = cache._cache.get_client(write=True)
+        serializer = cache._cache._serializer
+        timeout = cache.get_backend_timeout(self.timeout) or 0
+        script = client.register_script(SET_IF_NEWER)
+        pipeline = client.pipeline(transaction=False)
+        for key, payload in payloads.items():
+            key = cache.make_and_validate_key(key)
+            script(
+                keys=[key, f'{key}:v'],
+                args=[self._version(payload), serializer.dumps(payload), int(timeout)],
+                client=pipeline
+            )
+        pipeline.execute()
+
+    def _write_shared(self, payloads):
+        """{kesh kaliti: payload} dan faqat umumiy qavatdagidan eski bo'lmaganlarini yozish"""
+        try:
+            cache = self.shared
+            if isinstance(cache, RedisCache):
+                self._write_redis(cache, payloads)
+                return
+            current = cache.get_many(list(payloads))
+            fresh = {
+                key: payload for key, payload in payloads.items()
+                if self._is_newer(current.get(key), payload)
+            }
+            if fresh:
+                cache.set_many(fresh, self.timeout)
+        except Exception:
+            self._shared_error('set')
+
+    def get(self, telegram_id):
+        """Oxirgi joylashuvni olish; topilmasa None (bazaga murojaat chaqiruvchida)"""
+        payload = self.local.get(telegram_id)
+        if payload is not None:
+            self.counter.incr('local_hits')
+            return payload
+
+        payload = self._shared_call('get', self._key(telegram_id))
+        if payload is not None:
+            self.counter.incr('shared_hits')
+            self.local.set(telegram_id, payload)
+            return payload
+
+        self.counter.incr('misses')
+        return None
+
+    def set(self, telegram_id, payload):
+        """Yangi joylashuvni ikkala qavatga yozish (eskisi ustiga yozilmaydi)"""
+        payload = dict(payload)
+        if not self._is_newer(self.local.get(telegram_id), payload):
+            return
+        self.local.set(telegram_id, payload)
+        self._write_shared({self._key(telegram_id): payload})
+        self.counter.incr('writes')
+
+    async def aget(self, telegram_id):
+        """get() ning async varianti (umumiy qavat kesh backendining async API si orqali)"""
+        payload = self.local.get(telegram_id)
+        if payload is not None:
+            self.counter.incr('local_hits')
+            return payload
+
+        payload = await self._ashared_call('aget', self._key(telegram_id))
+        if payload is not None:
+            self.counter.incr('shared_hits')
+            self.local.set(telegram_id, payload)
+            return payload
+
+        self.counter.incr('misses')
+        return None
+
+    async def aset(self, telegram_id, payload):
+        """set() ning async varianti"""
+        payload = dict(payload)
+        if not self._is_newer(self.local.get(telegram_id), payload):
+            return
+        self.local.set(telegram_id, payload)
+        await sync_to_async(self._write_shared)({self._key(telegram_id): payload})
+        self.counter.incr('writes')
+
+    def set_many(self, payloads):
+        """{telegram_id: payload} ni bitta umumiy kesh murojaati bilan yozish"""
+        fresh = {}
+        for telegram_id, payload in payloads.items():
+            payload = dict(payload)
+            if self._is_newer(self.local.get(telegram_id), payload):
+                self.local.set(telegram_id, payload)
+                fresh[self._key(telegram_id)] = payload
+        if fresh:
+            self._write_shared(fresh)
+            self.counter.incr('writes', len(fresh))
+
+    def delete(self, telegram_id):
+        self.local.delete(telegram_id)
+        key = self._key(telegram_id)
+        self._shared_call('delete_many', [key, f'{key}:v'])
+
+    def stats(self):
+        data = self.counter.snapshot()
+        data['local_size'] = len(self.local)
+        data['cache_alias'] = self.cache_alias
+        return data
+
+
+position_store = LatestPositionStore()
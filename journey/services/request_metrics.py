@@ -0,0 +1,171 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SERVER_TIMING': False,
+    'EXCLUDE_PATHS': ['/metrics', '/static/'],
+    'PREFIX': 'journey',
+    'DURATION_BUCKETS': [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+    'QUERY_BUCKETS': [0, 1, 2, 3, 5, 10, 20, 50, 100, 200],
+}
+
+# Joriy so'rovning yig'uvchisi. contextvar sync_to_async threadlariga ham o'tadi,
+# shuning uchun async viewlarning ORM so'rovlari ham hisoblanadi
+current_sample = ContextVar('journey_request_metrics', default=None)
+
+
+class RequestSample:
+    """Bitta so'rov davomida yig'iladigan o'lchovlar (soniyalarda)"""
+
+    __slots__ = ('started', 'queries', 'db_time', 'render_started', 'render_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_time = 0.0
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def finish_render(self):
+        if self.render_started is not None:
+            self.render_time += time.perf_counter() - self.render_started
+            self.render_started = None
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def query_timer(execute, sql, params, many, context):
+    """
+    `connection.execute_wrappers` uchun: so'rov soni va SQL vaqtini joriy
+    so'rovga yozadi. So'rovdan tashqarida (management buyruqlari) hech narsa qilmaydi.
+    """
+    sample = current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.db_time += time.perf_counter() - started
+        sample.queries += 1
+
+
+def install_query_timer(connection):
+    """DB ulanishiga query_timer ni (bir marta) ulash"""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+class Histogram:
+    """Prometheus uslubidagi histogram: bucketlar, yig'indi va soni"""
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets + [float('inf')], self.counts):
+            running += count
+            yield bound, running
+
+
+class RequestMetrics:
+    """
+    Endpointlar bo'yicha jarayon ichidagi metrikalar reestri.
+
+    Har bir worker o'z reestriga ega (HitCounter kabi); /metrics javob bergan
+    workerning qiymatlarini qaytaradi.
+    """
+
+    HISTOGRAMS = (
+        ('request_duration_seconds', 'Request wall time', 'DURATION_BUCKETS'),
+        ('db_queries', 'SQL queries per request', 'QUERY_BUCKETS'),
+        ('db_duration_seconds', 'SQL time per request', 'DURATION_BUCKETS'),
+        ('render_duration_seconds', 'Response rendering time per request', 'DURATION_BUCKETS'),
+    )
+
+    def __init__(self, options=None):
+        self.options = {**DEFAULTS, **(options or {})}
+        self.prefix = self.options['PREFIX']
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = {}
+            self._histograms = {name: {} for name, _, _ in self.HISTOGRAMS}
+
+    def observe(self, endpoint, method, status, sample, wall_time):
+        values = {
+            'request_duration_seconds': wall_time,
+            'db_queries': sample.queries,
+            'db_duration_seconds': sample.db_time,
+            'render_duration_seconds': sample.render_time,
+        }
+        labels = (endpoint, method)
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for name, _, buckets in self.HISTOGRAMS:
+                series = self._histograms[name]
+                histogram = series.get(labels)
+                if histogram is None:
+                    histogram = series[labels] = Histogram(self.options[buckets])
+                histogram.observe(values[name])
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        name = f'{self.prefix}_http_requests_total'
+        lines.append(f'# HELP {name} Requests by endpoint, method and status')
+        lines.append(f'# TYPE {name} counter')
+
+        with self._lock:
+            for (endpoint, method, status), value in sorted(self._requests.items()):
+                lines.append(
+                    f'{name}{{endpoint="{_escape(endpoint)}",method="{method}",status="{status}"}} {value}'
+                )
+
+            for metric, help_text, _ in self.HISTOGRAMS:
+                name = f'{self.prefix}_http_{metric}'
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (endpoint, method), histogram in sorted(self._histograms[metric].items()):
+                    labels = f'endpoint="{_escape(endpoint)}",method="{method}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {count}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.total!r}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound):
+    if bound == float('inf'):
+        return '+Inf'
+    return repr(float(bound))
+
+
+request_metrics = RequestMetrics(getattr(settings, 'REQUEST_METRICS', None))
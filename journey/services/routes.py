@@ -0,0 +1,192 @@
+import math
+from decimal import Decimal
+
+from django.conf import settings
+
+from ..models.location import LocationDistance
+from .cache_metrics import HitCounter
+from .geo import encode_geohash
+from .geo_vector import geodesic_km
+from .lru import LRUCache
+
+DEFAULTS = {
+    'ROAD_FACTOR': 1.3,
+    'CITY_SPEED_KMH': 22,
+    'INTERCITY_SPEED_KMH': 65,
+    'CITY_DISTANCE_KM': 30,
+    'MIN_DURATION_MIN': 3,
+    'LOCAL_MAXSIZE': 50000,
+    'BATCH_SIZE': 1000,
+}
+
+# Travel.distance_km: max_digits=6, decimal_places=2
+MAX_TRAVEL_DISTANCE_KM = Decimal('9999.99')
+
+# Jadvaldan o'qishda from IN (...) AND to IN (...) kesishmasi kalitlar soni
+# kvadratiga qarab o'sadi; saralangan kalitlarni kichik bo'laklarda so'raymiz
+LOOKUP_CHUNK = 50
+
+
+def _geohash(location):
+    return location.geohash or encode_geohash(location.lat, location.lng)
+
+
+class DistanceMatrix:
+    """
+    Lokatsiya juftliklari orasidagi geodezik masofa (km).
+
+    Uch qavatli: jarayon ichidagi LRU, LocationDistance jadvali va ikkalasida
+    ham topilmagan juftliklar uchun bitta vektorlashtirilgan hisob
+    (geo_vector.geodesic_km). Ommabop yo'nalishlar (aeroport, bozor) uchun
+    takroriy so'rov bitta lug'at murojaati bilan tugaydi.
+    """
+
+    def __init__(self, options=None):
+        options = {**DEFAULTS, **(options or getattr(settings, 'ROUTE_ESTIMATES', {}))}
+        self.batch_size = options['BATCH_SIZE']
+        self.local = LRUCache(maxsize=options['LOCAL_MAXSIZE'])
+        self.counter = HitCounter('local_hits', 'table_hits')
+
+    @staticmethod
+    def _key(from_location, to_location):
+        if from_location.pk <= to_location.pk:
+            return from_location.pk, to_location.pk
+        return to_location.pk, from_location.pk
+
+    def distances_km(self, pairs):
+        """
+        `pairs` - [(from_location, to_location), ...] Location obyektlari
+        (kamida pk, lat, lng, geohash). Natija: shu tartibdagi masofalar ro'yxati.
+        """
+        points = {}
+        keys = []
+        for from_location, to_location in pairs:
+            points[from_location.pk] = from_location
+            points[to_location.pk] = to_location
+            keys.append(self._key(from_location, to_location))
+        hashes = {pk: _geohash(location) for pk, location in points.items()}
+
+        found = {}
+        for key in set(keys):
+            cached = self.local.get(key)
+            if cached is not None and cached[:2] == (hashes[key[0]], hashes[key[1]]):
+                found[key] = cached[2]
+        self.counter.incr('local_hits', len(found))
+
+        missing = set(keys) - set(found)
+        ordered = sorted(missing)
+        for start in range(0, len(ordered), LOOKUP_CHUNK):
+            chunk = ordered[start:start + LOOKUP_CHUNK]
+            rows = LocationDistance.objects.filter(
+                from_location_id__in={key[0] for key in chunk},
+                to_location_id__in={key[1] for key in chunk},
+            ).values_list('from_location_id', 'to_location_id', 'from_geohash', 'to_geohash', 'distance_km')
+            for from_id, to_id, from_hash, to_hash, distance in rows:
+                key = (from_id, to_id)
+                if key in missing and (from_hash, to_hash) == (hashes[from_id], hashes[to_id]):
+                    found[key] = distance
+                    self.local.set(key, (from_hash, to_hash, distance))
+                    missing.discard(key)
+                    self.counter.incr('table_hits')
+
+        if missing:
+            found.update(self._compute(sorted(missing), points, hashes))
+            self.counter.incr('misses', len(missing))
+
+        return [found[key] for key in keys]
+
+    def _compute(self, keys, points, hashes):
+        """Yetishmagan juftliklarni bitta massiv hisobida topish va jadvalga yozish (upsert)"""
+        distances = geodesic_km(
+            [points[from_id].lat for from_id, _ in keys],
+            [points[from_id].lng for from_id, _ in keys],
+            [points[to_id].lat for _, to_id in keys],
+            [points[to_id].lng for _, to_id in keys],
+        )
+        computed = {}
+        rows = []
+        for (from_id, to_id), distance in zip(keys, distances.tolist()):
+            computed[(from_id, to_id)] = distance
+            self.local.set((from_id, to_id), (hashes[from_id], hashes[to_id], distance))
+            rows.append(LocationDistance(
+                from_location_id=from_id,
+                to_location_id=to_id,
+                from_geohash=hashes[from_id],
+                to_geohash=hashes[to_id],
+                distance_km=distance,
+            ))
+
+        # Parallel so'rov shu juftlikni yozgan bo'lsa ham xatosiz (eskirgan qator yangilanadi)
+        LocationDistance.objects.bulk_create(
+            rows,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['from_location', 'to_location'],
+            update_fields=['from_geohash', 'to_geohash', 'distance_km', 'updated_at'],
+        )
+        return computed
+
+    def stats(self):
+        data = self.counter.snapshot()
+        data['local_size'] = len(self.local)
+        return data
+
+
+distance_matrix = DistanceMatrix()
+
+
+def route_options():
+    return {**DEFAULTS, **getattr(settings, 'ROUTE_ESTIMATES', {})}
+
+
+def road_distance_km(geodesic_distance_km, options=None):
+    """Geodezik masofadan yo'l masofasi bahosi (yo'llar to'g'ri chiziq emas)"""
+    options = options or route_options()
+    return geodesic_distance_km * options['ROAD_FACTOR']
+
+
+def duration_min(road_km, options=None):
+    """
+    Yo'l masofasidan taxminiy davomiylik (daqiqa): CITY_DISTANCE_KM gacha
+    shahar tezligida, qolgani shaharlararo tezlikda.
+    """
+    options = options or route_options()
+    road_km = float(road_km)
+    if road_km <= 0:
+        return 0
+    city_km = min(road_km, options['CITY_DISTANCE_KM'])
+    hours = city_km / options['CITY_SPEED_KMH'] + (road_km - city_km) / options['INTERCITY_SPEED_KMH']
+    return max(options['MIN_DURATION_MIN'], math.ceil(hours * 60))
+
+
+def fill_route_estimates(travels):
+    """
+    `distance_km` yoki `estimated_duration_min` berilmagan sayohatlar uchun
+    ularni lokatsiya koordinatalaridan hisoblab qo'yish (saqlamaydi).
+    Mijoz yuborgan masofa bo'lsa davomiylik shu masofadan hisoblanadi.
+    Masofalar barcha sayohatlar uchun bitta `distances_km` chaqiruvida topiladi.
+    Natija: o'zgargan sayohatlar ro'yxati.
+    """
+    options = route_options()
+    pending = [
+        travel for travel in travels
+        if (travel.distance_km is None or travel.estimated_duration_min is None)
+        and travel.from_location is not None and travel.to_location is not None
+    ]
+    needs_distance = [travel for travel in pending if travel.distance_km is None]
+    distances = distance_matrix.distances_km([
+        (travel.from_location, travel.to_location) for travel in needs_distance
+    ])
+    for travel, distance in zip(needs_distance, distances):
+        road_km = Decimal(f'{road_distance_km(distance, options):.2f}')
+        if road_km <= MAX_TRAVEL_DISTANCE_KM:
+            travel.distance_km = road_km
+
+    filled = []
+    for travel in pending:
+        if travel.distance_km is None:
+            continue
+        if travel.estimated_duration_min is None:
+            travel.estimated_duration_min = duration_min(travel.distance_km, options)
+        filled.append(travel)
+    return filled
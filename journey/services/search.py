@@ -0,0 +1,274 @@
+from django.db import connections, transaction
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+
+from ..models.driver import Driver
+from ..models.location import Location
+from ..models.passengers import Passenger
+from . import phones
+
+# Trigram indeks 3 belgidan qisqa so'zlarni topa olmaydi: ular oddiy icontains bilan qidiriladi
+MIN_TERM_LENGTH = 3
+# BigIntegerField ga sig'adigan eng uzun raqam (telegram_id)
+MAX_INTEGER_DIGITS = 18
+# Kamida shuncha qatorga mos so'z "ko'p uchraydigan" hisoblanadi (SQLite):
+# uning uchun indeks emas, tartib bo'yicha ketma-ket o'qish rejasi tanlanadi
+COMMON_TERM_MATCHES = 1000
+
+# Qidiruv indeksidagi matn ustunlari.
+# SQLite: har bir model uchun FTS5 (trigram) jadvali, triggerlar orqali sinxron;
+# PostgreSQL: pg_trgm GIN indekslari UPPER(ustun) bo'yicha - icontains aynan shu ifodani ishlatadi.
+SEARCH_INDEXES = {
+    Location: ('name',),
+    Driver: ('name',),
+    Passenger: ('name', 'contact'),
+}
+
+# Telefon raqam ustunlari: raqamga o'xshash so'zlar normallashtirilgan
+# `<ustun>_e164` / `<ustun>_reversed` B-tree indekslari orqali qidiriladi
+PHONE_COLUMNS = {
+    Passenger: ('contact',),
+    Driver: ('contact',),
+}
+
+
+def _indexed_columns(model):
+    return SEARCH_INDEXES.get(model._meta.concrete_model, ())
+
+
+def _phone_columns(model):
+    return PHONE_COLUMNS.get(model._meta.concrete_model, ())
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def _sqlite_statements(model):
+    table = model._meta.db_table
+    fts = fts_table(model)
+    columns = SEARCH_INDEXES[model]
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    # Tashqi kontentli (content=) jadval: matn nusxalanmaydi, faqat trigram indeks saqlanadi
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _postgresql_index(model, column):
+    return f'{model._meta.db_table}_{column}_trgm'
+
+
+def _sqlite_objects(model):
+    fts = fts_table(model)
+    return {fts, f'{fts}_ai', f'{fts}_ad', f'{fts}_au'}
+
+
+def _install_sqlite(connection, cursor):
+    """
+    Yo'q FTS jadvali / triggerlarini yaratish va shu model indeksini qayta qurish.
+    SQLite ALTER TABLE o'rniga jadvalni qayta yaratadi (masalan AddField) - eski
+    jadval bilan uning triggerlari ham o'chadi, shuning uchun bu har migratsiyadan
+    keyin chaqiriladi. Hammasi joyida bo'lsa hech narsa yozilmaydi.
+    """
+    tables = set(connection.introspection.table_names(cursor))
+    with transaction.atomic(using=connection.alias):
+        for model in SEARCH_INDEXES:
+            if model._meta.db_table not in tables:
+                continue
+            names = _sqlite_objects(model)
+            cursor.execute(
+                f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})",
+                sorted(names)
+            )
+            if cursor.fetchone()[0] == len(names):
+                continue
+            for statement in _sqlite_statements(model):
+                cursor.execute(statement)
+
+
+def install_search_index(connection):
+    """
+    Qidiruv indeksini yaratish (migratsiyadan va post_migrate dan chaqiriladi;
+    qayta chaqirish xavfsiz, boshqa bazalarda hech narsa qilmaydi)
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            _install_sqlite(connection, cursor)
+        elif connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            tables = set(connection.introspection.table_names(cursor))
+            for model, columns in SEARCH_INDEXES.items():
+                if model._meta.db_table not in tables:
+                    continue
+                for column in columns:
+                    # CONCURRENTLY: katta jadvalga yozish indeks qurilayotganda to'xtamaydi
+                    cursor.execute(
+                        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {_postgresql_index(model, column)} '
+                        f'ON {model._meta.db_table} USING gin (UPPER({column}) gin_trgm_ops)'
+                    )
+
+
+def uninstall_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for model in SEARCH_INDEXES:
+                fts = fts_table(model)
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+                cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+        elif connection.vendor == 'postgresql':
+            for model, columns in SEARCH_INDEXES.items():
+                for column in columns:
+                    cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {_postgresql_index(model, column)}')
+
+
+def rebuild_search_index(connection):
+    """
+    Indeksni jadvallardan qayta qurish (triggerlarsiz yuklangan ma'lumotdan keyin).
+    SQLite da yo'qolgan triggerlar avval qayta yaratiladi.
+    PostgreSQL da GIN indekslar jadval bilan birga yangilanadi: REINDEX qilinadi.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            _install_sqlite(connection, cursor)
+            for model in SEARCH_INDEXES:
+                fts = fts_table(model)
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+        elif connection.vendor == 'postgresql':
+            for model, columns in SEARCH_INDEXES.items():
+                for column in columns:
+                    cursor.execute(f'REINDEX INDEX CONCURRENTLY {_postgresql_index(model, column)}')
+
+
+def _fts_query(column, term):
+    # Butun so'z bitta ibora sifatida: trigram iborasi = ustun ichidagi qism-satr
+    return '%s : "%s"' % (column, term.replace('"', '""'))
+
+
+def matching_ids(model, column, term, using='default'):
+    """`column` ida `term` qatnashgan qatorlarning pk lari (subquery, bazaga alohida so'rov yo'q)"""
+    if connections[using].vendor == 'sqlite' and len(term) >= MIN_TERM_LENGTH:
+        table = fts_table(model)
+        return RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [_fts_query(column, term)])
+    return model._default_manager.using(using).filter(**{f'{column}__icontains': term}).values('pk')
+
+
+def is_common_match(model, column, term, using='default'):
+    """
+    SQLite: `column` da `term` kamida COMMON_TERM_MATCHES qatorda bormi.
+    LIMIT bilan tekshiriladi - hamma moslar sanalmaydi. SQLite rejalovchisi
+    subquery natijalari sonini bilmaydi; PostgreSQL buni statistikadan o'zi hal qiladi.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    if len(term) < MIN_TERM_LENGTH:
+        matches = model._default_manager.using(using).filter(**{f'{column}__icontains': term})
+        return matches.values('pk')[:COMMON_TERM_MATCHES].count() == COMMON_TERM_MATCHES
+    table = fts_table(model)
+    with connection.cursor() as cursor:
+        # pk__in subquery emas: SQLite IN ro'yxatini LIMIT dan oldin to'liq yig'adi
+        cursor.execute(
+            f'SELECT COUNT(*) FROM (SELECT rowid FROM {table} WHERE {table} MATCH %s LIMIT %s)',
+            [_fts_query(column, term), COMMON_TERM_MATCHES]
+        )
+        return cursor.fetchone()[0] == COMMON_TERM_MATCHES
+
+
+def _resolve(model, path):
+    """'from_location__name' -> (Location, 'from_location', 'name')"""
+    *relations, column = path.split('__')
+    for name in relations:
+        model = model._meta.get_field(name).related_model
+    return model, '__'.join(relations), column
+
+
+def field_q(model, path, term, using='default'):
+    """
+    Bitta maydon bo'yicha qidiruv sharti.
+    Telefon ustunlari raqamga o'xshash so'z uchun normallashtirilgan indeks orqali,
+    indekslangan matn ustunlari pk subquery orqali (join siz), butun son
+    ustunlari (telegram_id) faqat to'liq moslik bilan, qolganlari icontains.
+
+    Bog'langan jadval ustunida ko'p uchraydigan so'z (`is_common_match`)
+    subquery emas, join va icontains bilan: aks holda SQLite barcha moslarni
+    yig'ib, keyin tartiblaydi; join bilan esa `created_at` indeksi bo'yicha
+    o'qib, birinchi sahifa to'lganda to'xtaydi (keyset paginatsiya).
+    """
+    target, relation, column = _resolve(model, path)
+    if column in _phone_columns(target) and phones.is_phone_like(term):
+        condition = phones.phone_q(term, path)
+        if condition is not None:
+            return condition
+
+    if column in _indexed_columns(target):
+        if relation and is_common_match(target, column, term, using):
+            return Q(**{f'{path}__icontains': term})
+        lookup = f'{relation}__in' if relation else 'pk__in'
+        return Q(**{lookup: matching_ids(target, column, term, using)})
+
+    if isinstance(target._meta.get_field(column), IntegerField):
+        # Raqam ustunida qism-satr qidiruvi indeksdan foydalana olmaydi
+        return Q(**{path: int(term)}) if term.isdigit() and len(term) <= MAX_INTEGER_DIGITS else None
+    return Q(**{f'{path}__icontains': term})
+
+
+def search_q(model, paths, term, using='default'):
+    """Bir nechta maydondan istalgan birida `term` bo'lishi sharti (OR)"""
+    query = Q()
+    for path in paths:
+        condition = field_q(model, path, term, using)
+        if condition is not None:
+            query |= condition
+    # Hech bir maydonga mos kelmaydigan so'z hech narsa topmaydi
+    return query if query else Q(pk__in=[])
+
+
+def filter_search(queryset, paths, value):
+    """FilterSet `search` parametrlari uchun: butun qiymat bitta so'z sifatida"""
+    value = value.strip()
+    if not value:
+        return queryset
+    return queryset.filter(search_q(queryset.model, paths, value, queryset.db))
+
+
+def rank_expression(model, paths, term):
+    """
+    Natijalar tartibi uchun moslik darajasi: to'liq moslik 3, boshlanishi 2, ichida 1.
+    Faqat topilgan qatorlar uchun hisoblanadi, shuning uchun indeksga ta'sir qilmaydi.
+    """
+    levels = []
+    phone = phones.normalize_phone(term) if phones.is_phone_like(term) else ''
+    for path in paths:
+        target, _, column = _resolve(model, path)
+        if phone and column in _phone_columns(target):
+            levels.append(Case(
+                When(**{f'{path}_e164': phone}, then=Value(3.0)),
+                default=Value(1.0),
+                output_field=FloatField()
+            ))
+            continue
+        if column not in _indexed_columns(target):
+            continue
+        levels.append(Case(
+            When(**{f'{path}__iexact': term}, then=Value(3.0)),
+            When(**{f'{path}__istartswith': term}, then=Value(2.0)),
+            default=Value(1.0),
+            output_field=FloatField()
+        ))
+    if not levels:
+        return Value(1.0, output_field=FloatField())
+    return levels[0] if len(levels) == 1 else Greatest(*levels)
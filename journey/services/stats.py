@@ -0,0 +1,281 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models.stats import DailyStat, StatCounter
+from ..models.travel import TravelStatus
+from .counters import add_to_counter
+
+TRAVELS_TOTAL = 'travels.total'
+TRAVELS_COMPLETED = 'travels.completed'
+TRAVELS_CANCELLED = 'travels.cancelled'
+TRAVELS_REVENUE = 'travels.revenue'
+TRAVELS_RATING_SUM = 'travels.driver_rating_sum'
+TRAVELS_RATING_COUNT = 'travels.driver_rating_count'
+
+PASSENGERS_TOTAL = 'passengers.total'
+PASSENGERS_ACTIVE = 'passengers.active'
+PASSENGERS_RATING_SUM = 'passengers.rating_sum'
+PASSENGERS_TRIPS = 'passengers.total_trips'
+
+TRAVEL_KEYS = [
+    TRAVELS_TOTAL, TRAVELS_COMPLETED, TRAVELS_CANCELLED,
+    TRAVELS_REVENUE, TRAVELS_RATING_SUM, TRAVELS_RATING_COUNT,
+]
+PASSENGER_KEYS = [
+    PASSENGERS_TOTAL, PASSENGERS_ACTIVE, PASSENGERS_RATING_SUM, PASSENGERS_TRIPS,
+]
+
+# Kunlik qatorlar obyekt yaratilgan kunga bog'lanadi: sana oralig'i statistikasi
+# "shu oraliqda yaratilgan sayohatlar/yo'lovchilar" haqida bo'ladi va
+# reconcile_stats uni bazadan aynan qayta hisoblay oladi.
+
+
+def _day(created_at):
+    return timezone.localdate(created_at) if created_at else timezone.localdate()
+
+
+def _apply_days(per_day):
+    """
+    {kun: {key: farq}} ni umumiy va kunlik hisoblagichlarga qo'shish (chaqiruvchining tranzaksiyasida).
+    Qatorlar doim bir xil tartibda qulflanadi - avval StatCounter kalit bo'yicha, keyin
+    DailyStat (kalit, kun) bo'yicha: parallel tranzaksiyalar bir-birini kutadi, deadlock bo'lmaydi.
+    """
+    totals = defaultdict(int)
+    daily = {}
+    for day, deltas in per_day.items():
+        for key, delta in deltas.items():
+            if delta:
+                totals[key] += delta
+                daily[(key, day)] = delta
+
+    for key in sorted(totals):
+        if totals[key]:
+            add_to_counter(StatCounter, {'key': key}, totals[key])
+    for key, day in sorted(daily):
+        add_to_counter(DailyStat, {'key': key, 'day': day}, daily[(key, day)])
+
+
+def _apply(day, deltas):
+    """Farqlarni umumiy va kunlik hisoblagichlarga qo'shish (chaqiruvchining tranzaksiyasida)"""
+    _apply_days({day: deltas})
+
+
+def _diff(before, after):
+    before = before or {}
+    after = after or {}
+    return {key: after.get(key, 0) - before.get(key, 0) for key in set(before) | set(after)}
+
+
+def travel_snapshot(travel):
+    """Sayohatning statistikaga qo'shadigan hissasi"""
+    try:
+        info = travel.info
+    except ObjectDoesNotExist:
+        info = None
+
+    travel_status = info.status if info is not None else travel.status
+    driver_rating = info.driver_rating if info is not None else None
+    return {
+        TRAVELS_TOTAL: 1,
+        TRAVELS_COMPLETED: int(travel_status == TravelStatus.COMPLETED),
+        TRAVELS_CANCELLED: int(travel_status == TravelStatus.CANCELLED),
+        TRAVELS_REVENUE: Decimal(str(travel.final_price or 0)),
+        TRAVELS_RATING_SUM: driver_rating or 0,
+        TRAVELS_RATING_COUNT: int(driver_rating is not None),
+    }
+
+
+def travel_change(travel, before=None, deleted=False):
+    """(kun, farqlar) - `record_travel_change` yozadigan o'zgarish (fon vazifasiga berish uchun)"""
+    after = None if deleted else travel_snapshot(travel)
+    return _day(travel.created_at), _diff(before, after)
+
+
+def record_travel_change(travel, before=None, deleted=False):
+    """
+    Sayohat yaratilgan, o'zgargan yoki o'chirilgandan keyin hisoblagichlarni yangilash.
+    `before` - o'zgarishdan oldingi `travel_snapshot()` (yangi sayohat uchun None).
+    """
+    record_deltas(*travel_change(travel, before, deleted))
+
+
+def record_deltas(day, deltas):
+    """Oldindan hisoblangan farqlarni yozish: {key: farq}, `day` - obyekt yaratilgan kun"""
+    _apply(day, deltas)
+
+
+def passenger_snapshot(passenger):
+    """Yo'lovchining statistikaga qo'shadigan hissasi"""
+    return {
+        PASSENGERS_TOTAL: 1,
+        PASSENGERS_ACTIVE: int(bool(passenger.is_active)),
+        PASSENGERS_RATING_SUM: Decimal(str(passenger.rating)),
+        PASSENGERS_TRIPS: passenger.total_trips,
+    }
+
+
+def record_passenger_change(passenger, before=None, deleted=False):
+    """Yo'lovchi yaratilgan, o'zgargan yoki o'chirilgandan keyin hisoblagichlarni yangilash"""
+    after = None if deleted else passenger_snapshot(passenger)
+    _apply(_day(passenger.created_at), _diff(before, after))
+
+
+def _apply_per_passenger(key, changes):
+    """`changes` - [(yo'lovchi yaratilgan vaqt, farq), ...]"""
+    per_day = defaultdict(Decimal)
+    for created_at, delta in changes:
+        per_day[_day(created_at)] += delta
+    _apply_days({day: {key: value} for day, value in per_day.items()})
+
+
+def record_passengers_created(passengers):
+    """Ko'plab yangi yo'lovchilar: har bir kun uchun bitta yig'ilgan yangilanish"""
+    tz = timezone.get_current_timezone()
+    per_day = defaultdict(lambda: defaultdict(Decimal))
+    for passenger in passengers:
+        deltas = per_day[passenger.created_at.astimezone(tz).date()]
+        for key, value in passenger_snapshot(passenger).items():
+            deltas[key] += value
+    _apply_days(per_day)
+
+
+def record_passengers_activity(created_dates, is_active):
+    """Ommaviy faollik o'zgarishi: `created_dates` - holati o'zgargan yo'lovchilarning yaratilgan vaqtlari"""
+    delta = 1 if is_active else -1
+    _apply_per_passenger(PASSENGERS_ACTIVE, [(created_at, delta) for created_at in created_dates])
+
+
+def record_passengers_trips(created_dates, count=1):
+    """Bir nechta yo'lovchining sayohatlar soni `count` ga oshganda"""
+    _apply_per_passenger(PASSENGERS_TRIPS, [(created_at, count) for created_at in created_dates])
+
+
+def record_passengers_rating(changes):
+    """Reytinglar SQL da qayta hisoblanganda: `changes` - [(created_at, yangi - eski), ...]"""
+    _apply_per_passenger(PASSENGERS_RATING_SUM, changes)
+
+
+def read_counters(keys, date_from=None, date_to=None):
+    """
+    Hisoblagich qiymatlari {key: Decimal}.
+    Oraliq berilmasa faqat `len(keys)` ta StatCounter qatori o'qiladi,
+    aks holda oraliqdagi kunlik qatorlar yig'iladi.
+    """
+    if date_from is None and date_to is None:
+        rows = StatCounter.objects.filter(key__in=keys).values_list('key', 'value')
+    else:
+        queryset = DailyStat.objects.filter(key__in=keys)
+        if date_from is not None:
+            queryset = queryset.filter(day__gte=date_from)
+        if date_to is not None:
+            queryset = queryset.filter(day__lte=date_to)
+        rows = queryset.values('key').annotate(total=Sum('value')).order_by().values_list('key', 'total')
+
+    values = dict.fromkeys(keys, Decimal(0))
+    values.update({key: value or Decimal(0) for key, value in rows})
+    return values
+
+
+def _average(total, count):
+    if not count:
+        return None
+    return (Decimal(total) / Decimal(count)).quantize(Decimal('0.01'))
+
+
+def travel_stats(date_from=None, date_to=None):
+    """TravelStatsSerializer uchun ma'lumot"""
+    values = read_counters(TRAVEL_KEYS, date_from, date_to)
+    return {
+        'total_travels': int(values[TRAVELS_TOTAL]),
+        'completed_travels': int(values[TRAVELS_COMPLETED]),
+        'cancelled_travels': int(values[TRAVELS_CANCELLED]),
+        'total_revenue': values[TRAVELS_REVENUE],
+        'average_rating': _average(values[TRAVELS_RATING_SUM], values[TRAVELS_RATING_COUNT]),
+    }
+
+
+def passenger_stats(date_from=None, date_to=None):
+    """PassengerStatsSerializer uchun ma'lumot"""
+    values = read_counters(PASSENGER_KEYS, date_from, date_to)
+    return {
+        'total_passengers': int(values[PASSENGERS_TOTAL]),
+        'active_passengers': int(values[PASSENGERS_ACTIVE]),
+        'average_rating': _average(values[PASSENGERS_RATING_SUM], values[PASSENGERS_TOTAL]),
+        'total_trips': int(values[PASSENGERS_TRIPS]),
+    }
+
+
+def _recount_daily(Travel, Passenger):
+    """{(key, day): value} - kunlik qiymatlarni bazadan hisoblash"""
+    daily = defaultdict(Decimal)
+
+    travel_rows = Travel.objects.annotate(day=TruncDate('created_at')).values('day').annotate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(info__status=TravelStatus.COMPLETED)),
+        cancelled=Count('id', filter=Q(info__status=TravelStatus.CANCELLED)),
+        revenue=Sum('final_price'),
+        rating_sum=Sum('info__driver_rating'),
+        rating_count=Count('info__driver_rating'),
+    ).order_by()
+    for row in travel_rows:
+        day = row['day']
+        daily[(TRAVELS_TOTAL, day)] += row['total']
+        daily[(TRAVELS_COMPLETED, day)] += row['completed']
+        daily[(TRAVELS_CANCELLED, day)] += row['cancelled']
+        daily[(TRAVELS_REVENUE, day)] += row['revenue'] or 0
+        daily[(TRAVELS_RATING_SUM, day)] += row['rating_sum'] or 0
+        daily[(TRAVELS_RATING_COUNT, day)] += row['rating_count']
+
+    passenger_rows = Passenger.objects.annotate(day=TruncDate('created_at')).values('day').annotate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        rating_sum=Sum('rating'),
+        trips=Sum('total_trips'),
+    ).order_by()
+    for row in passenger_rows:
+        day = row['day']
+        daily[(PASSENGERS_TOTAL, day)] += row['total']
+        daily[(PASSENGERS_ACTIVE, day)] += row['active']
+        daily[(PASSENGERS_RATING_SUM, day)] += row['rating_sum'] or 0
+        daily[(PASSENGERS_TRIPS, day)] += row['trips'] or 0
+
+    return daily
+
+
+def rebuild_stats(apps=django_apps):
+    """
+    Barcha umumiy va kunlik hisoblagichlarni bazadan qaytadan hisoblash.
+    `apps` migratsiyadan chaqirilganda tarixiy modellar uchun beriladi.
+    Natija: yozilgan kunlik qatorlar soni.
+    """
+    Travel = apps.get_model('journey', 'Travel')
+    Passenger = apps.get_model('journey', 'Passenger')
+    Counter = apps.get_model('journey', 'StatCounter')
+    Daily = apps.get_model('journey', 'DailyStat')
+
+    with transaction.atomic():
+        # Hisoblagichlarni yangilagan tranzaksiyalar tugashini kutish, yangilari esa
+        # qayta hisoblash tugaguncha kutib turadi va o'z farqini ustiga qo'shadi
+        list(Counter.objects.select_for_update().values_list('id', flat=True))
+        daily = {item: value for item, value in _recount_daily(Travel, Passenger).items() if value}
+
+        totals = dict.fromkeys(TRAVEL_KEYS + PASSENGER_KEYS, Decimal(0))
+        for (key, _), value in daily.items():
+            totals[key] += value
+
+        Daily.objects.all().delete()
+        Counter.objects.all().delete()
+        Daily.objects.bulk_create(
+            [Daily(key=key, day=day, value=value) for (key, day), value in daily.items()],
+            batch_size=1000
+        )
+        Counter.objects.bulk_create([Counter(key=key, value=value) for key, value in totals.items()])
+
+    return len(daily)
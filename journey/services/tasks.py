@@ -0,0 +1,358 @@
+import logging
+import os
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+from functools import partial, update_wrapper
+from multiprocessing import get_context
+
+import django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from ..models.tasks import BackgroundTask, BackgroundTaskStatus
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'immediate',
+    'WORKERS': 4,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 5.0,
+    'POLL_INTERVAL': 1.0,
+    'LOCK_TIMEOUT': 300,
+}
+
+BACKENDS = ('immediate', 'memory', 'database')
+
+
+def task_options():
+    return {**DEFAULTS, **getattr(settings, 'TASKS', {})}
+
+
+class Task:
+    """
+    `@task` bilan o'ralgan funksiya.
+
+    `task_fn(...)` - odatdagidek shu yerda bajarish, `task_fn.delay(...)` -
+    navbatga qo'yish, `task_fn.delay_on_commit(...)` - joriy tranzaksiya
+    bilan birga: rollback bo'lsa vazifa ham bekor bo'ladi. "database"
+    backendi vazifani shu tranzaksiyada yozadi, "immediate" uni shu
+    tranzaksiya ichida bajaradi, "memory" esa commit dan keyin navbatga
+    qo'yadi. Argumentlar JSON ga mos bo'lishi kerak ("database" backendi
+    ularni jadvalda saqlaydi).
+    """
+
+    def __init__(self, func, name=None, max_attempts=None, retry_delay=None):
+        update_wrapper(self, func)
+        self.func = func
+        self.name = name or f'{func.__module__}.{func.__name__}'
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+
+    @property
+    def max_attempts(self):
+        return self._max_attempts or task_options()['MAX_ATTEMPTS']
+
+    def retry_delay(self, attempt):
+        """`attempt`-urinish muvaffaqiyatsiz bo'lgandan keyingi kutish (eksponensial)"""
+        base = self._retry_delay if self._retry_delay is not None else task_options()['RETRY_DELAY']
+        return base * 2 ** (attempt - 1)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return get_backend().enqueue(self, args, kwargs)
+
+    def delay_on_commit(self, *args, **kwargs):
+        backend = get_backend()
+        if backend.transactional and transaction.get_connection().in_atomic_block:
+            # Vazifa joriy tranzaksiya bilan birga yoziladi (yoki bajariladi):
+            # rollback bo'lsa u ham bekor bo'ladi, commit bo'lsa yo'qolmaydi
+            backend.enqueue(self, args, kwargs)
+            return
+        transaction.on_commit(partial(backend.enqueue, self, args, kwargs), robust=True)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+
+_registry = {}
+
+
+def task(func=None, *, name=None, max_attempts=None, retry_delay=None):
+    """
+    Funksiyani fon vazifasi sifatida ro'yxatdan o'tkazish:
+
+        @task
+        def recompute(travel_id): ...
+
+        @task(max_attempts=5, retry_delay=10)
+        def notify(telegram_id, text): ...
+    """
+    def register(func):
+        wrapped = Task(func, name=name, max_attempts=max_attempts, retry_delay=retry_delay)
+        _registry[wrapped.name] = wrapped
+        return wrapped
+
+    if func is not None:
+        return register(func)
+    return register
+
+
+def find_task(name):
+    """Ro'yxatdagi vazifa; topilmasa ilovalarning `tasks` modullari yuklanib qayta qidiriladi"""
+    if name not in _registry:
+        autodiscover_modules('tasks')
+    return _registry.get(name)
+
+
+def execute(task_obj, args, kwargs):
+    """Vazifani bitta tranzaksiyada bajarish: xatolikda uning barcha yozuvlari bekor qilinadi"""
+    with transaction.atomic():
+        return task_obj.func(*args, **kwargs)
+
+
+class ImmediateBackend:
+    """
+    Vazifa chaqirilgan joyda darhol bajariladi (oldingi xatti-harakat, testlar uchun).
+    `delay_on_commit` ham vazifani so'rov tranzaksiyasi ichida bajaradi: uning
+    xatoligi so'rovni bekor qiladi, commit dan keyin alohida bajarilmaydi.
+    """
+    name = 'immediate'
+    transactional = True
+
+    def enqueue(self, task_obj, args, kwargs):
+        return execute(task_obj, args, kwargs)
+
+
+class MemoryBackend:
+    """
+    Jarayon ichidagi thread pool: navbat xotirada, qayta urinishlar taymer bilan.
+    Alohida worker kerak emas, lekin jarayon to'xtab qolsa bajarilmagan
+    vazifalar yo'qoladi.
+    """
+    name = 'memory'
+    transactional = False
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def executor(self):
+        with self._lock:
+            # fork dan keyin ota jarayonning threadlari bolaga o'tmaydi
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='journey-task')
+                self._pid = os.getpid()
+            return self._executor
+
+    def enqueue(self, task_obj, args, kwargs, attempt=1):
+        return self.executor().submit(self._run, task_obj, args, kwargs, attempt)
+
+    def _run(self, task_obj, args, kwargs, attempt):
+        try:
+            execute(task_obj, args, kwargs)
+        except Exception:
+            if attempt < task_obj.max_attempts:
+                delay = task_obj.retry_delay(attempt)
+                logger.warning('%s: %s-urinish muvaffaqiyatsiz, %.1f s dan keyin qayta', task_obj.name, attempt, delay)
+                timer = threading.Timer(delay, self.enqueue, (task_obj, args, kwargs, attempt + 1))
+                timer.daemon = True
+                timer.start()
+            else:
+                logger.exception('%s: %s urinishdan keyin bajarilmadi', task_obj.name, attempt)
+        finally:
+            close_old_connections()
+
+    def join(self):
+        """Navbatdagi barcha vazifalar tugashini kutish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class DatabaseBackend:
+    """
+    Vazifalar BackgroundTask jadvalida saqlanadi va `manage.py run_tasks`
+    worker(lar)i tomonidan bajariladi. Tranzaksiya ichida qo'yilgan vazifa
+    shu tranzaksiya bilan birga commit bo'ladi (transactional outbox).
+    """
+    name = 'database'
+    transactional = True
+
+    def __init__(self, lock_timeout):
+        self.lock_timeout = lock_timeout
+
+    def enqueue(self, task_obj, args, kwargs):
+        return BackgroundTask.objects.create(
+            name=task_obj.name,
+            args=list(args),
+            kwargs=kwargs,
+            max_attempts=task_obj.max_attempts,
+        )
+
+    def claim(self, limit):
+        """
+        Bajarishga tayyor `limit` tagacha vazifani olish: navbatdagilar va
+        LOCK_TIMEOUT dan beri tugamagan (worker to'xtab qolgan) vazifalar.
+        Har biri compare-and-set UPDATE bilan olinadi, shuning uchun parallel
+        workerlar bitta vazifani ikki marta ololmaydi.
+        Natija: [(id, locked_at), ...]
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=self.lock_timeout)
+        candidates = (
+            BackgroundTask.objects.filter(
+                Q(status=BackgroundTaskStatus.QUEUED, run_after__lte=now)
+                | Q(status=BackgroundTaskStatus.RUNNING, locked_at__lt=stale)
+            )
+            .order_by('run_after', 'id')
+            .values_list('pk', 'status', 'locked_at')[:limit]
+        )
+        claimed = []
+        for pk, status, locked_at in list(candidates):
+            updated = BackgroundTask.objects.filter(pk=pk, status=status, locked_at=locked_at).update(
+                status=BackgroundTaskStatus.RUNNING,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if updated:
+                claimed.append((pk, now))
+        return claimed
+
+
+class LockLost(Exception):
+    """Vazifa bajarilayotganda uni boshqa worker qayta olgan"""
+
+
+def run_stored_task(pk, locked_at):
+    """
+    Olingan vazifani bajarish. Vazifa tanasi va qatorni o'chirish bitta
+    tranzaksiyada: muvaffaqiyatli natija vazifa bilan birga commit bo'ladi.
+    Xatolikda vazifa eksponensial kechikish bilan navbatga qaytariladi yoki
+    urinishlar tugagan bo'lsa `failed` deb belgilanadi.
+    Natija: 'done' | 'retried' | 'failed' | 'lost'
+    """
+    try:
+        row = BackgroundTask.objects.filter(pk=pk, locked_at=locked_at).values(
+            'name', 'args', 'kwargs', 'attempts', 'max_attempts'
+        ).first()
+        if row is None:
+            return 'lost'
+
+        task_obj = find_task(row['name'])
+        try:
+            if task_obj is None:
+                raise LookupError(f"Ro'yxatda yo'q vazifa: {row['name']}")
+            with transaction.atomic():
+                task_obj.func(*row['args'], **row['kwargs'])
+                if not BackgroundTask.objects.filter(pk=pk, locked_at=locked_at).delete()[0]:
+                    raise LockLost(pk)
+        except LockLost:
+            return 'lost'
+        except Exception:
+            error = traceback.format_exc()
+            retry = task_obj is not None and row['attempts'] < row['max_attempts']
+            values = {'locked_at': None, 'last_error': error}
+            if retry:
+                values['status'] = BackgroundTaskStatus.QUEUED
+                values['run_after'] = timezone.now() + timedelta(seconds=task_obj.retry_delay(row['attempts']))
+            else:
+                values['status'] = BackgroundTaskStatus.FAILED
+            BackgroundTask.objects.filter(pk=pk, locked_at=locked_at).update(**values)
+            logger.warning('%s (#%s) %s-urinishda xatolik', row['name'], pk, row['attempts'], exc_info=True)
+            return 'retried' if retry else 'failed'
+        return 'done'
+    finally:
+        close_old_connections()
+
+
+def run_worker(pool='thread', workers=None, burst=False, poll_interval=None, stop_event=None):
+    """
+    "database" backendi uchun worker sikli: navbatdan bo'sh o'rinlar
+    sonicha vazifa olinadi va thread yoki process pool da bajariladi.
+    `burst=True` - hozir bajarishga tayyor vazifa qolmaganda to'xtash.
+    Natija: {'done': n, 'retried': n, 'failed': n, 'lost': n, 'error': n}
+    """
+    options = task_options()
+    workers = workers or options['WORKERS']
+    poll_interval = options['POLL_INTERVAL'] if poll_interval is None else poll_interval
+    stop_event = stop_event or threading.Event()
+    backend = DatabaseBackend(options['LOCK_TIMEOUT'])
+
+    if pool == 'process':
+        # spawn: bola jarayonlar ota jarayonning baza ulanishlarini meros qilib olmaydi;
+        # initializer shu modulni import qilishdan oldin ilovalarni yuklaydi
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context('spawn'), initializer=django.setup
+        )
+    elif pool == 'thread':
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='journey-worker')
+    else:
+        raise ValueError(f"Noma'lum pool: {pool}")
+
+    counts = Counter()
+
+    def collect(futures):
+        for future in futures:
+            try:
+                counts[future.result()] += 1
+            except Exception:
+                logger.exception('Vazifani bajarishda kutilmagan xatolik')
+                counts['error'] += 1
+
+    pending = set()
+    try:
+        while not stop_event.is_set():
+            free = workers - len(pending)
+            if free:
+                for pk, locked_at in backend.claim(free):
+                    pending.add(executor.submit(run_stored_task, pk, locked_at))
+
+            if not pending:
+                if burst:
+                    break
+                close_old_connections()
+                stop_event.wait(poll_interval)
+                continue
+
+            done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            collect(done)
+    finally:
+        executor.shutdown(wait=True)
+        collect(pending)
+
+    return {key: counts[key] for key in ('done', 'retried', 'failed', 'lost', 'error')}
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend():
+    """TASKS['BACKEND'] bo'yicha backend (jarayon uchun bitta nusxa)"""
+    options = task_options()
+    name = options['BACKEND']
+    if name not in BACKENDS:
+        raise ImproperlyConfigured(f"TASKS['BACKEND'] noto'g'ri: {name}")
+
+    with _backends_lock:
+        if name not in _backends:
+            if name == 'immediate':
+                _backends[name] = ImmediateBackend()
+            elif name == 'memory':
+                _backends[name] = MemoryBackend(options['WORKERS'])
+            else:
+                _backends[name] = DatabaseBackend(options['LOCK_TIMEOUT'])
+        return _backends[name]
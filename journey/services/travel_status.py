@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models.travel import TRAVEL_STATUS_TRANSITIONS, Travel, TravelInfo, TravelStatus
+from .. import tasks
+from . import stats as stats_service
+
+# Holatga birinchi marta o'tilganda yoziladigan vaqt ustunlari
+STATUS_TIMESTAMPS = {
+    TravelStatus.STARTED: 'started_at',
+    TravelStatus.COMPLETED: 'completed_at',
+}
+
+
+def allowed_transitions(current):
+    return TRAVEL_STATUS_TRANSITIONS.get(current, frozenset())
+
+
+def can_transition(current, new_status):
+    return new_status in allowed_transitions(current)
+
+
+def transition_travel(travel, new_status, **fields):
+    """
+    Sayohat holatini compare-and-set bilan o'zgartirish.
+
+    `travel.status` (o'qilgan holat) dan `new_status` ga o'tish jadvalda bo'lsa,
+    bitta shartli UPDATE bajariladi:
+        UPDATE travel SET status = new, started_at/completed_at, updated_at, <fields>
+        WHERE id = pk AND status = <o'qilgan holat>
+    Shu orada holatni boshqa so'rov o'zgartirgan bo'lsa UPDATE hech qatorni
+    topmaydi va o'tish qo'llanmaydi; statistika va sayohatlar soni vazifalari
+    faqat muvaffaqiyatli o'tishda navbatga qo'yiladi.
+
+    Natija: (o'zgardi, joriy holat). Holat allaqachon `new_status` bo'lsa
+    (qayta yuborilgan yoki parallel bir xil so'rov) - (False, new_status),
+    o'tish mumkin bo'lmasa - (False, joriy holat).
+    """
+    fields = {name: Travel._meta.get_field(name).to_python(value) for name, value in fields.items()}
+    expected = travel.status
+    if expected == new_status:
+        return False, expected
+    if not can_transition(expected, new_status):
+        return False, expected
+
+    now = timezone.now()
+    values = {'status': new_status, 'updated_at': now, **fields}
+    timestamp_field = STATUS_TIMESTAMPS.get(new_status)
+    if timestamp_field:
+        values[timestamp_field] = Coalesce(timestamp_field, Value(now))
+
+    with transaction.atomic():
+        before = stats_service.travel_snapshot(travel)
+        updated = Travel.objects.filter(pk=travel.pk, status=expected).update(**values)
+        if not updated:
+            current = Travel.objects.filter(pk=travel.pk).values_list('status', flat=True).first()
+            return False, current
+
+        # TravelInfo.status - holatning asosiy nusxasi; qator Travel UPDATE i bilan himoyalangan
+        TravelInfo.objects.filter(travel_id=travel.pk).update(status=new_status, updated_at=now)
+
+        travel.status = new_status
+        travel.updated_at = now
+        for name, value in fields.items():
+            setattr(travel, name, value)
+        if timestamp_field and getattr(travel, timestamp_field) is None:
+            setattr(travel, timestamp_field, now)
+        if Travel.info.is_cached(travel):
+            travel.info.status = new_status
+            travel.info.updated_at = now
+        # Hisoblagichlar fon vazifasida yangilanadi (TASKS['BACKEND'] ga qarang)
+        tasks.defer_travel_change(travel, before)
+        # Sayohatlar soni avtomatik faqat COUNT_TRIPS_ON_COMPLETE yoqilganda oshiriladi,
+        # aks holda increment-trips endpointi bilan ikki marta sanaladi
+        if new_status == TravelStatus.COMPLETED and getattr(settings, 'COUNT_TRIPS_ON_COMPLETE', False):
+            tasks.increment_trips.delay_on_commit(travel.pk, travel.driver_id)
+
+    return True, new_status
@@ -0,0 +1,75 @@
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Driver, Location, Passenger
+from .models.driver import DriverStatus
+from .services.driver_search import driver_index
+from .services.passenger_cache import passenger_cache
+from .services.request_metrics import install_query_timer, request_metrics
+from .services.search import install_search_index
+
+
+# Indeksga ta'sir qiladigan maydonlar (update_fields da nom yoki attname bilan)
+DRIVER_INDEX_FIELDS = {'status', 'current_location', 'current_location_id'}
+
+
+def _index_driver(driver_id, status, location_id, coordinates):
+    """Indeksni yangilash; joylashuv obyekti yuklanmagan bo'lsa koordinata faqat faol haydovchi uchun o'qiladi"""
+    if coordinates is None and location_id is not None and status == DriverStatus.ACTIVE:
+        coordinates = Location.objects.filter(pk=location_id).values_list('lat', 'lng').first()
+    lat, lng = coordinates or (None, None)
+    driver_index.apply(driver_id, status, lat, lng)
+
+
+@receiver(post_save, sender=Driver)
+def driver_saved(sender, instance, update_fields=None, **kwargs):
+    """
+    Haydovchi holati yoki joylashuvi o'zgarganda qidiruv indeksini tranzaksiya
+    muvaffaqiyatli tugagandan keyin yangilash (bekor qilingan saqlash indeksga tushmaydi)
+    """
+    if update_fields is not None and not DRIVER_INDEX_FIELDS & set(update_fields):
+        return
+
+    coordinates = None
+    if instance.current_location_id is not None and Driver.current_location.is_cached(instance):
+        location = instance.current_location
+        coordinates = (location.lat, location.lng)
+    transaction.on_commit(partial(
+        _index_driver, instance.pk, instance.status, instance.current_location_id, coordinates
+    ))
+
+
+@receiver(post_delete, sender=Driver)
+def driver_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(driver_index.remove, instance.pk))
+
+
+@receiver(post_save, sender=Passenger)
+@receiver(post_delete, sender=Passenger)
+def passenger_changed(sender, instance, created=False, **kwargs):
+    """Yo'lovchi keshini tranzaksiya muvaffaqiyatli tugagandan keyin bekor qilish"""
+    if created:
+        # Yangi yo'lovchi hali keshda bo'lmaydi (topilmaganlar keshlanmaydi)
+        return
+    transaction.on_commit(partial(passenger_cache.invalidate, instance.telegram_id))
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    """Yangi DB ulanishida so'rov metrikalari uchun SQL taymerini ulash"""
+    if request_metrics.options['ENABLED']:
+        install_query_timer(connection)
+
+
+@receiver(post_migrate)
+def journey_migrated(sender, app_config, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Qidiruv indeksini tiklash: SQLite da keyingi migratsiyalar jadvalni qayta
+    yaratganda (AddField, AlterField) FTS triggerlari jim o'chib ketadi
+    """
+    if app_config.label == 'journey':
+        install_search_index(connections[using])
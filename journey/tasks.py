@@ -0,0 +1,96 @@
+"""
+journey fon vazifalari (journey.services.tasks).
+
+So'rovdan keyin bajarilsa bo'ladigan yon ta'sirlar: statistika va sayohatlar
+soni hisoblagichlari, reytinglarni qayta hisoblash, oxirgi pozitsiyalar keshi,
+talab xaritasi kataklari.
+Har bir vazifa bitta tranzaksiyada bajariladi, shuning uchun xatolikdan
+keyingi qayta urinish yarim yozilgan natija ustiga tushmaydi.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from .models.location import UserLocation
+from .models.stats import DemandSource
+from .serializers.location_serializer import UserLocationSerializer
+from .services import demand as demand_service
+from .services import stats as stats_service
+from .services.atomic_updates import apply_driver_rating, apply_passenger_rating, increment_travel_trips
+from .services.position_store import position_store
+from .services.tasks import task
+
+
+@task
+def record_stat_deltas(day, deltas):
+    """`day` - ISO sana, `deltas` - {key: '1.50'} (Decimal JSON da satr ko'rinishida)"""
+    stats_service.record_deltas(date.fromisoformat(day), {key: Decimal(value) for key, value in deltas.items()})
+
+
+def defer_travel_change(travel, before=None, deleted=False):
+    """`stats.record_travel_change` ning fon vazifasi orqali bajariladigan varianti"""
+    day, deltas = stats_service.travel_change(travel, before, deleted)
+    deltas = {key: str(value) for key, value in deltas.items() if value}
+    if deltas:
+        record_stat_deltas.delay_on_commit(day.isoformat(), deltas)
+
+
+@task
+def increment_trips(travel_id, driver_id=None):
+    increment_travel_trips(travel_id, driver_id)
+
+
+@task
+def update_driver_rating(driver_id, new_rating, old_rating=None):
+    apply_driver_rating(driver_id, new_rating, old_rating)
+
+
+@task
+def update_passenger_rating(passenger_ids, new_rating, old_rating=None):
+    apply_passenger_rating(passenger_ids, new_rating, old_rating)
+
+
+@task
+def store_latest_positions(user_location_ids):
+    """Saqlangan UserLocation larni oxirgi pozitsiyalar omboriga yozish (har bir foydalanuvchining eng yangisi)"""
+    latest = {}
+    for user_location in UserLocation.objects.filter(pk__in=user_location_ids).select_related('location'):
+        current = latest.get(user_location.user)
+        if current is None or (user_location.created_at, user_location.pk) > (current.created_at, current.pk):
+            latest[user_location.user] = user_location
+    position_store.set_many({
+        telegram_id: UserLocationSerializer(user_location).data
+        for telegram_id, user_location in latest.items()
+    })
+
+
+@task
+def record_demand(source, rows):
+    """`rows` - [[oraliq boshi ISO, katak, farq], ...]"""
+    demand_service.record_counts(source, {
+        (datetime.fromisoformat(bucket), cell): delta for bucket, cell, delta in rows
+    })
+
+
+def defer_travel_demand(travel, deleted=False):
+    """Sayohat boshlanish nuqtasini talab xaritasiga qo'shish (o'chirilganda ayirish)"""
+    if travel.from_location_id is None:
+        return
+    sign = -1 if deleted else 1
+    counts = demand_service.count_points([demand_service.travel_point(travel)])
+    record_demand.delay_on_commit(DemandSource.TRAVEL, [
+        [bucket.isoformat(), cell, sign * count] for (bucket, cell), count in counts.items()
+    ])
+
+
+@task
+def record_user_location_demand(user_location_ids):
+    points = UserLocation.objects.filter(pk__in=user_location_ids).values_list(
+        'created_at', 'location__lat', 'location__lng', 'location__geohash'
+    )
+    demand_service.record_counts(DemandSource.USER_LOCATION, demand_service.count_points(points))
+
+
+def defer_user_location_demand(user_location_ids):
+    """Yangi UserLocation larni talab xaritasiga qo'shish (DEMAND_HEATMAP['USER_LOCATIONS'] yoqilgan bo'lsa)"""
+    if user_location_ids and demand_service.demand_options()['USER_LOCATIONS']:
+        record_user_location_demand.delay_on_commit(list(user_location_ids))
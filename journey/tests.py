@@ -1,3 +1,873 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from journey import tasks
+from journey.models import (
+    BackgroundTask, BackgroundTaskStatus, Car, Driver, Location, LocationDistance, Passenger, StatCounter, Travel,
+    TravelInfo, UserLocation,
+)
+from journey.models.driver import DriverStatus
+from journey.models.stats import DemandCell, DemandSource
+from journey.models.travel import TravelStatus
+from journey.services import demand as demand_service
+from journey.services import search as search_service
+from journey.services.atomic_updates import apply_driver_rating, apply_passenger_rating, increment_passenger_trips
+from journey.services.driver_search import driver_index
+from journey.services.export import USER_LOCATION_CSV_COLUMNS
+from journey.services.geo_vector import geodesic_km
+from journey.services.locations import ingest_user_locations
+from journey.services.passenger_cache import PassengerCache, passenger_cache
+from journey.services.passengers import bulk_upsert_passengers
+from journey.services.position_store import LatestPositionStore, position_store
+from journey.services.request_metrics import request_metrics
+from journey.services.routes import (
+    DistanceMatrix, distance_matrix, duration_min, fill_route_estimates, road_distance_km,
+)
+from journey.services.search import filter_search
+from journey.services.tasks import DatabaseBackend, run_stored_task, run_worker, task
+from journey.services.travel_status import transition_travel
+from journey.views.metrics_views import PROMETHEUS_CONTENT_TYPE
+
+
+class DriverIndexSignalTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        driver_index.reload()
+
+    def setUp(self):
+        driver_index.reload()
+        self.location = Location.objects.create(name='Chorsu', lat=41.3264, lng=69.2285)
+
+    def create_driver(self, **fields):
+        return Driver.objects.create(
+            telegram_id=700000001, name='Ali', contact='+998901112233',
+            status=DriverStatus.ACTIVE, current_location=self.location, **fields
+        )
+
+    def test_index_updated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            driver = self.create_driver()
+        self.assertIn(driver.pk, driver_index._rows)
+
+    def test_rolled_back_save_is_not_indexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    driver = self.create_driver()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertNotIn(driver.pk, driver_index._rows)
+
+    def test_unrelated_update_skips_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            driver = self.create_driver()
+        driver = Driver.objects.get(pk=driver.pk)
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(1):
+            driver.name = 'Vali'
+            driver.save(update_fields=['name'])
+        self.assertEqual(callbacks, [])
+
+
+class IngestUserLocationsTests(TestCase):
+    def item(self, telegram_id, lat, lng):
+        return {'telegram_id': telegram_id, 'name': 'Nuqta', 'coordinate': {'lat': lat, 'lng': lng}}
+
+    def test_concurrent_duplicate_fails_only_its_item(self):
+        taken = Location.objects.create(name='Band', lat=41.30, lng=69.24)
+        UserLocation.objects.create(user=1, location=taken)
+
+        # Parallel so'rov: tekshiruv paytida lokatsiya hali bo'sh ko'rinadi
+        empty = mock.Mock()
+        empty.values_list.return_value = []
+        with mock.patch.object(UserLocation.objects, 'filter', return_value=empty):
+            results, latest = ingest_user_locations([
+                (0, self.item(2, 41.30, 69.24)),
+                (1, self.item(2, 41.31, 69.25)),
+            ])
+
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertEqual(results[1]['status'], 'created')
+        self.assertEqual(UserLocation.objects.filter(user=2).count(), 1)
+        self.assertEqual(latest[2].pk, results[1]['id'])
+
+
+class PositionStoreFallbackTests(TestCase):
+    def test_shared_cache_error_falls_back_to_database(self):
+        location = Location.objects.create(name='Chorsu', lat=41.3264, lng=69.2285)
+        user_location = UserLocation.objects.create(user=42, location=location)
+        position_store.local.clear()
+
+        broken = mock.Mock()
+        broken.get.side_effect = ConnectionError('redis down')
+        broken.set.side_effect = ConnectionError('redis down')
+        with mock.patch.object(LatestPositionStore, 'shared', new_callable=mock.PropertyMock, return_value=broken):
+            response = self.client.get('/api/v1/journey/locations/user-latest/42/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['location']['id'], user_location.pk)
+
+
+class TripCountingTests(TestCase):
+    def setUp(self):
+        self.passenger = Passenger.objects.create(telegram_id=500000001, name='Olim', contact='+998901234567')
+        self.travel = Travel.objects.create(creator=self.passenger.telegram_id, status=TravelStatus.STARTED)
+        TravelInfo.objects.create(travel=self.travel, status=TravelStatus.STARTED)
+
+    def complete(self):
+        with mock.patch.object(tasks, 'defer_travel_change'), \
+                mock.patch.object(tasks.increment_trips, 'delay_on_commit') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            changed, _ = transition_travel(self.travel, TravelStatus.COMPLETED)
+        self.assertTrue(changed)
+        return delay
+
+    @override_settings(COUNT_TRIPS_ON_COMPLETE=False)
+    def test_completion_does_not_count_by_default(self):
+        self.complete().assert_not_called()
+        response = self.client.post(f'/api/v1/journey/passengers/{self.passenger.telegram_id}/increment-trips/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_trips'], 1)
+
+    @override_settings(COUNT_TRIPS_ON_COMPLETE=True)
+    def test_manual_increment_rejected_when_completion_counts(self):
+        self.complete().assert_called_once_with(self.travel.pk, None)
+        response = self.client.post(f'/api/v1/journey/passengers/{self.passenger.telegram_id}/increment-trips/')
+        self.assertEqual(response.status_code, 409)
+        self.passenger.refresh_from_db()
+        self.assertEqual(self.passenger.total_trips, 0)
+
+
+class ConcurrentTripIncrementTests(TransactionTestCase):
+    WORKERS = 8
+    CALLS = 25
+
+    def test_parallel_increments_are_not_lost(self):
+        passenger = Passenger.objects.create(telegram_id=500000002, name='Olim', contact='+998901234568')
+        errors = []
+
+        def work():
+            try:
+                for _ in range(self.CALLS):
+                    increment_passenger_trips(passenger.telegram_id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work) for _ in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        passenger.refresh_from_db()
+        self.assertEqual(passenger.total_trips, self.WORKERS * self.CALLS)
+
+
+class PassengerRatingTests(TestCase):
+    def post(self, passenger, action, rating):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f'/api/v1/journey/passengers/{passenger.telegram_id}/{action}/', {'rating': rating}
+            )
+
+    def test_update_rating_sets_value_and_keeps_average_consistent(self):
+        passenger = Passenger.objects.create(telegram_id=500000003, name='Olim', contact='+998901234569')
+
+        response = self.post(passenger, 'update-rating', '4.40')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['rating'], '4.40')
+
+        # Keyingi sayohat bahosi qo'lda o'rnatilgan qiymatdan davom etadi
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_passenger_rating([passenger.pk], 5)
+        passenger.refresh_from_db()
+        self.assertEqual((passenger.rating_sum, passenger.rating_count), (Decimal('9.40'), 2))
+        self.assertEqual(passenger.rating, Decimal('4.70'))
+
+        response = self.post(passenger, 'update-rating', '3.50')
+        passenger.refresh_from_db()
+        self.assertEqual((passenger.rating, passenger.rating_sum, passenger.rating_count), (Decimal('3.50'), Decimal('7.00'), 2))
+
+    def test_add_rating_feeds_running_average(self):
+        passenger = Passenger.objects.create(telegram_id=500000004, name='Olim', contact='+998901234570')
+
+        self.assertEqual(self.post(passenger, 'add-rating', 5).status_code, 200)
+        self.assertEqual(self.post(passenger, 'add-rating', 3).json()['rating'], '4.00')
+        self.assertEqual(self.post(passenger, 'add-rating', '4.5').status_code, 400)
+
+    def test_rerating_uncounted_rating_does_not_divide_by_zero(self):
+        # 0010 dan oldingi baho: rating_count hali 0
+        driver = Driver.objects.create(telegram_id=700000010, name='Ali', contact='+998901112240')
+        self.assertEqual(apply_driver_rating(driver.pk, 4, old_rating=2), 1)
+        driver.refresh_from_db()
+        self.assertEqual((driver.rating_sum, driver.rating_count, driver.rating), (4, 1, Decimal('4.00')))
+
+        self.assertEqual(apply_driver_rating(driver.pk, 2, old_rating=4), 1)
+        driver.refresh_from_db()
+        self.assertEqual((driver.rating_sum, driver.rating_count, driver.rating), (2, 1, Decimal('2.00')))
+
+
+class TravelFastListParityTests(TestCase):
+    """TRAVEL_FAST_LIST yoqilgan va o'chirilgan javoblar bayt-bayt bir xil bo'lishi kerak"""
+
+    API = '/api/v1/journey/travels'
+
+    @classmethod
+    def setUpTestData(cls):
+        chorsu = Location.objects.create(name='Chorsu', lat=41.3264, lng=69.2285)
+        airport = Location.objects.create(name='Aeroport', lat=41.2579, lng=69.2812)
+        car = Car.objects.create(name='Cobalt', model='LTZ', color='Oq', year=2021, license_plate='01A123BC')
+        cls.driver = Driver.objects.create(
+            telegram_id=700000002, name='Ali', contact='+998901112234', car=car, current_location=chorsu
+        )
+        bare_driver = Driver.objects.create(telegram_id=700000003, name='Vali', contact='+998901112235')
+        passengers = [
+            Passenger.objects.create(telegram_id=500000010 + i, name=f'Yo\'lovchi {i}', contact=f'+99890765432{i}')
+            for i in range(3)
+        ]
+
+        cls.creator = 600000001
+        statuses = list(TravelStatus)
+        for i in range(12):
+            travel = Travel.objects.create(
+                creator=cls.creator if i % 2 else 600000002,
+                from_location=chorsu if i % 4 else None,
+                to_location=airport,
+                driver=[cls.driver, bare_driver, None][i % 3],
+                expected_price='25000.00' if i % 2 else None,
+                final_price='27500.50' if i % 5 == 0 else None,
+                distance_km='12.40' if i % 3 else None,
+                status=statuses[i % len(statuses)],
+            )
+            info = TravelInfo.objects.create(
+                travel=travel, status=travel.status, has_female=bool(i % 2),
+                special_requests='Yukxona kerak' if i % 3 == 0 else '',
+                driver_rating=5 if i % 4 == 1 else None,
+            )
+            info.passengers.set(passengers[:i % 4])
+
+    def pages(self, path, params):
+        bodies = []
+        url, query = path, params
+        while url:
+            response = self.client.get(url, query)
+            self.assertEqual(response.status_code, 200)
+            bodies.append(response.content)
+            url, query = response.json()['next'], None
+        return bodies
+
+    def test_fast_list_matches_serializer(self):
+        cases = [
+            (f'{self.API}/', {'page_size': 5}),
+            (f'{self.API}/', {'page_size': 4, 'ordering': 'created_at'}),
+            (f'{self.API}/by-creator/', {'creator_id': self.creator, 'page_size': 4}),
+            (f'{self.API}/by-driver/', {'driver_id': self.driver.pk, 'page_size': 2}),
+            (f'{self.API}/active/', {'page_size': 3}),
+        ]
+        for path, params in cases:
+            with self.subTest(path=path, params=params):
+                with override_settings(TRAVEL_FAST_LIST=False):
+                    expected = self.pages(path, params)
+                with override_settings(TRAVEL_FAST_LIST=True):
+                    actual = self.pages(path, params)
+                self.assertGreater(len(expected), 1)
+                self.assertEqual(actual, expected)
+
+
+class SearchIndexTests(TestCase):
+    """Test bazasi to'liq migrate bilan quriladi: qidiruv indeksi barcha migratsiyalardan keyin ishlashi kerak"""
+
+    def test_search_filter_after_migrate(self):
+        passenger = Passenger.objects.create(telegram_id=500000020, name='Shahnoza', contact='+998901234580')
+        driver = Driver.objects.create(telegram_id=700000020, name='Jamshid', contact='+998901234581')
+        location = Location.objects.create(name='Yunusobod', lat=41.3650, lng=69.2870)
+
+        response = self.client.get('/api/v1/journey/passengers/', {'search': 'hnoz'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['telegram_id'] for row in response.json()], [passenger.telegram_id])
+
+        self.assertEqual(list(filter_search(Driver.objects.all(), ['name'], 'amshi')), [driver])
+        self.assertEqual(list(filter_search(Location.objects.all(), ['name'], 'nusob')), [location])
+
+        # Yangilangan va o'chirilgan qatorlar ham indeksda aks etadi
+        Passenger.objects.filter(pk=passenger.pk).update(name='Dilnoza')
+        self.assertFalse(filter_search(Passenger.objects.all(), ['name'], 'hnoz').exists())
+        self.assertTrue(filter_search(Passenger.objects.all(), ['name'], 'lnoz').exists())
+        location.delete()
+        self.assertFalse(filter_search(Location.objects.all(), ['name'], 'nusob').exists())
+
+    def test_common_term_uses_join_plan(self):
+        places = [Location.objects.create(name=f'Nukus #{i}', lat=42.46 + i / 100, lng=59.61) for i in range(3)]
+        rare = Location.objects.create(name='Qo\'ng\'irot', lat=43.07, lng=58.90)
+        travels = [Travel.objects.create(creator=600000010, from_location=place) for place in [*places, rare]]
+        fields = ['from_location__name', 'to_location__name', 'driver__name']
+
+        with mock.patch.object(search_service, 'COMMON_TERM_MATCHES', 3):
+            common = filter_search(Travel.objects.all(), fields, 'Nukus')
+            selective = filter_search(Travel.objects.all(), fields, 'ng\'ir')
+
+        # Ko'p uchraydigan so'z created_at indeksi bo'yicha o'qiladigan join bilan
+        self.assertIn('JOIN', str(common.query))
+        self.assertNotIn('journey_location_fts', str(common.query))
+        self.assertIn('journey_location_fts', str(selective.query))
+        self.assertNotIn('JOIN', str(selective.query))
+        self.assertEqual(set(common), set(travels[:3]))
+        self.assertEqual(list(selective), [travels[3]])
+
+
+class PassengerContactConflictTests(TestCase):
+    def setUp(self):
+        self.owner = Passenger.objects.create(telegram_id=500000030, name='Olim', contact='+998901234590')
+
+    def test_bulk_upsert_checks_normalized_contact(self):
+        results = bulk_upsert_passengers([
+            (0, {'telegram_id': 500000031, 'name': 'Aziz', 'contact': '90 123 45 90'}),
+            (1, {'telegram_id': 500000032, 'name': 'Bobur', 'contact': '+998 90 123 45 91'}),
+            (2, {'telegram_id': 500000033, 'name': 'Sardor', 'contact': '998901234591'}),
+        ])
+        self.assertEqual([results[index]['status'] for index in range(3)], ['error', 'created', 'error'])
+
+        # Egasi o'z raqamini boshqa ko'rinishda yozishi mumkin
+        results = bulk_upsert_passengers([
+            (0, {'telegram_id': self.owner.telegram_id, 'name': 'Olim', 'contact': '8 90 123 45 90'}),
+        ])
+        self.assertEqual(results[0]['status'], 'updated')
+        self.assertEqual(Passenger.objects.filter(contact_e164='+998901234590').count(), 1)
+        self.assertEqual(Passenger.objects.filter(contact_e164='+998901234591').count(), 1)
+
+    def test_serializers_check_normalized_contact(self):
+        response = self.client.post('/api/v1/journey/passengers/', {
+            'telegram_id': 500000034, 'name': 'Aziz', 'contact': '(90) 123-45-90'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('contact', response.json())
+
+        other = Passenger.objects.create(telegram_id=500000035, name='Bobur', contact='+998901234592')
+        url = f'/api/v1/journey/passengers/{other.telegram_id}/'
+        response = self.client.patch(url, {'contact': '901234590'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        # O'z raqamini boshqa ko'rinishda yozish mumkin
+        response = self.client.patch(url, {'contact': '90 123 45 92'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+
+class StatCounterLockOrderTests(TestCase):
+    def test_counters_locked_in_sorted_order(self):
+        from datetime import date
+
+        from journey.models import DailyStat
+        from journey.services import stats as stats_service
+
+        with mock.patch.object(stats_service, 'add_to_counter') as add:
+            stats_service._apply_days({
+                date(2026, 10, 2): {'travels.total': 1, 'passengers.total': 1},
+                date(2026, 10, 1): {'travels.total': 2, 'travels.revenue': 0},
+            })
+
+        calls = [(call.args[0], call.args[1]) for call in add.call_args_list]
+        self.assertEqual(calls, [
+            (StatCounter, {'key': 'passengers.total'}),
+            (StatCounter, {'key': 'travels.total'}),
+            (DailyStat, {'key': 'passengers.total', 'day': date(2026, 10, 2)}),
+            (DailyStat, {'key': 'travels.total', 'day': date(2026, 10, 1)}),
+            (DailyStat, {'key': 'travels.total', 'day': date(2026, 10, 2)}),
+        ])
+        self.assertEqual(add.call_args_list[1].args[2], 3)
+
+    def test_passenger_delete_and_stats_commit_together(self):
+        passenger = Passenger.objects.create(telegram_id=500000040, name='Olim', contact='+998901234600')
+        counters = dict(StatCounter.objects.values_list('key', 'value'))
+        with mock.patch.object(Passenger, 'delete', side_effect=RuntimeError('db down')):
+            response = self.client.delete(f'/api/v1/journey/passengers/{passenger.telegram_id}/')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Passenger.objects.filter(pk=passenger.pk).exists())
+        self.assertEqual(dict(StatCounter.objects.values_list('key', 'value')), counters)
+
+
+class PositionStoreOrderingTests(TestCase):
+    def payload(self, pk, created_at):
+        return {'id': pk, 'created_at': created_at, 'user': 42}
+
+    def test_stale_write_does_not_replace_newer_shared_value(self):
+        store = LatestPositionStore({'KEY_PREFIX': 'test:ordering'})
+        store.set(42, self.payload(2, '2026-10-17T12:00:05+05:00'))
+
+        # Boshqa jarayon: lokal LRU bo'sh, bazadan eski qiymat o'qilgan
+        store.local.clear()
+        store.set(42, self.payload(1, '2026-10-17T12:00:00+05:00'))
+        store.local.clear()
+        self.assertEqual(store.get(42)['id'], 2)
+
+        store.set_many({42: self.payload(3, '2026-10-17T12:00:09+05:00')})
+        store.local.clear()
+        self.assertEqual(store.get(42)['id'], 3)
+
+    def test_redis_write_goes_through_compare_script(self):
+        from django.core.cache.backends.redis import RedisCache
+
+        cache = RedisCache('redis://localhost:6379/0', {})
+        client = mock.Mock()
+        store = LatestPositionStore({'KEY_PREFIX': 'test:ordering'})
+        with mock.patch.object(LatestPositionStore, 'shared', new_callable=mock.PropertyMock, return_value=cache), \
+                mock.patch.object(cache._cache, 'get_client', return_value=client):
+            store.set(42, self.payload(7, '2026-10-17T12:00:00+05:00'))
+
+        script = client.register_script.return_value
+        call = script.call_args
+        key = cache.make_and_validate_key('test:ordering:42')
+        self.assertEqual(call.kwargs['keys'], [key, f'{key}:v'])
+        self.assertEqual(call.kwargs['args'][0], '2026-10-17T12:00:00+05:00|00000000000000000007')
+        self.assertEqual(call.kwargs['args'][2], store.timeout)
+        self.assertIs(call.kwargs['client'], client.pipeline.return_value)
+        client.pipeline.return_value.execute.assert_called_once_with()
+
+
+class PassengerCacheFallbackTests(TestCase):
+    def test_shared_cache_error_falls_back_to_database(self):
+        passenger = Passenger.objects.create(telegram_id=500000050, name='Olim', contact='+998901234610')
+        passenger_cache.local.clear()
+
+        broken = mock.Mock()
+        for method in ('get', 'add', 'set_many'):
+            getattr(broken, method).side_effect = ConnectionError('redis down')
+        with mock.patch.object(PassengerCache, 'shared', new_callable=mock.PropertyMock, return_value=broken):
+            response = self.client.get(f'/api/v1/journey/passengers/{passenger.telegram_id}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['name'], 'Olim')
+
+            response = self.client.get('/api/v1/journey/passengers/by-telegram/', {'telegram_id': passenger.telegram_id})
+            self.assertEqual(response.status_code, 200)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    f'/api/v1/journey/passengers/{passenger.telegram_id}/', {'name': 'Vali'},
+                    content_type='application/json'
+                )
+            self.assertEqual(response.status_code, 200)
+
+        self.assertGreaterEqual(passenger_cache.stats()['shared_errors'], 3)
+
+
+@task(name='journey.tests.touch_location', retry_delay=10)
+def touch_location(name, lat, fail=False):
+    Location.objects.create(name=name, lat=lat, lng=69.24)
+    if fail:
+        raise RuntimeError(name)
+
+
+@task(name='journey.tests.steal_lock')
+def steal_lock(name):
+    Location.objects.create(name=name, lat=41.5, lng=69.5)
+    # Boshqa worker vazifani qayta oldi: o'chirishda locked_at endi mos kelmaydi
+    BackgroundTask.objects.filter(name='journey.tests.steal_lock').update(
+        locked_at=timezone.now() + timedelta(seconds=1)
+    )
+
+
+@override_settings(TASKS={'BACKEND': 'database', 'MAX_ATTEMPTS': 2, 'RETRY_DELAY': 1, 'LOCK_TIMEOUT': 60})
+class DatabaseTaskBackendTests(TransactionTestCase):
+    def work(self):
+        return run_worker(workers=2, burst=True, poll_interval=0.01)
+
+    def test_task_runs_and_its_row_is_deleted(self):
+        touch_location.delay('Chorsu', 41.1)
+        self.assertEqual(self.work()['done'], 1)
+        self.assertTrue(Location.objects.filter(name='Chorsu').exists())
+        self.assertFalse(BackgroundTask.objects.exists())
+
+    def test_failed_task_is_retried_with_backoff_then_failed(self):
+        touch_location.delay('Xato', 41.1, fail=True)
+        started = timezone.now()
+        self.assertEqual(self.work()['retried'], 1)
+
+        row = BackgroundTask.objects.get()
+        self.assertEqual((row.status, row.attempts, row.locked_at), (BackgroundTaskStatus.QUEUED, 1, None))
+        self.assertIn('RuntimeError', row.last_error)
+        self.assertGreaterEqual(row.run_after, started + timedelta(seconds=10))
+        self.assertFalse(Location.objects.exists())
+        self.assertEqual(touch_location.retry_delay(2), 20)
+
+        # Kechikish tugamaguncha worker vazifani olmaydi
+        self.assertEqual(sum(self.work().values()), 0)
+
+        BackgroundTask.objects.update(run_after=timezone.now())
+        self.assertEqual(self.work()['failed'], 1)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), (BackgroundTaskStatus.FAILED, 2))
+        self.assertFalse(Location.objects.exists())
+
+    def test_delay_on_commit_is_rolled_back_with_the_transaction(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            touch_location.delay_on_commit('Bekor', 41.2)
+            self.assertEqual(BackgroundTask.objects.count(), 1)
+            raise RuntimeError
+        self.assertFalse(BackgroundTask.objects.exists())
+
+        with transaction.atomic():
+            touch_location.delay_on_commit('Saqlangan', 41.3)
+        self.assertEqual(self.work()['done'], 1)
+        self.assertEqual(list(Location.objects.values_list('name', flat=True)), ['Saqlangan'])
+
+    def test_parallel_claims_take_each_task_once(self):
+        for i in range(20):
+            touch_location.delay(f'Nuqta {i}', 41 + i / 100)
+        claimed, errors = [], []
+        barrier = threading.Barrier(4)
+
+        def work():
+            try:
+                barrier.wait()
+                claimed.extend(pk for pk, _ in DatabaseBackend(60).claim(20))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(claimed), sorted(BackgroundTask.objects.values_list('pk', flat=True)))
+        self.assertEqual(set(BackgroundTask.objects.values_list('attempts', flat=True)), {1})
+        # Bajarilayotgan vazifa LOCK_TIMEOUT gacha qayta olinmaydi
+        self.assertEqual(DatabaseBackend(60).claim(20), [])
+
+    def test_stale_task_is_reclaimed_and_old_worker_loses_it(self):
+        touch_location.delay('Qayta', 41.4)
+        backend = DatabaseBackend(60)
+        [(pk, first)] = backend.claim(1)
+
+        with mock.patch.object(timezone, 'now', return_value=first + timedelta(seconds=61)):
+            [(reclaimed, second)] = backend.claim(1)
+        self.assertEqual(reclaimed, pk)
+
+        self.assertEqual(run_stored_task(pk, first), 'lost')
+        self.assertFalse(Location.objects.exists())
+        self.assertEqual(run_stored_task(pk, second), 'done')
+        self.assertTrue(Location.objects.filter(name='Qayta').exists())
+
+    def test_lock_lost_rolls_back_task_writes(self):
+        steal_lock.delay('Yo\'qolgan')
+        [(pk, locked_at)] = DatabaseBackend(60).claim(1)
+
+        self.assertEqual(run_stored_task(pk, locked_at), 'lost')
+        self.assertFalse(Location.objects.exists())
+        row = BackgroundTask.objects.get(pk=pk)
+        self.assertEqual((row.status, row.locked_at), (BackgroundTaskStatus.RUNNING, locked_at))
+
+
+@override_settings(TASKS={'BACKEND': 'immediate'})
+class ImmediateTaskBackendTests(TestCase):
+    def test_delay_on_commit_runs_inside_the_transaction(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            touch_location.delay_on_commit('Darhol', 41.6)
+            self.assertTrue(Location.objects.filter(name='Darhol').exists())
+            raise RuntimeError
+        self.assertFalse(Location.objects.exists())
+
+    def test_task_error_rolls_back_the_caller(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Location.objects.create(name='So\'rov', lat=41.7, lng=69.7)
+            touch_location.delay_on_commit('Xato', 41.8, fail=True)
+        self.assertFalse(Location.objects.exists())
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        chorsu = Location.objects.create(name='Chorsu', lat=41.3264, lng=69.2285)
+        airport = Location.objects.create(name='Aeroport', lat=41.2579, lng=69.2812)
+        cls.passengers = [
+            Passenger.objects.create(telegram_id=500000050 + i, name=f'Yo\'lovchi {i}', contact=f'+99890765440{i}')
+            for i in range(2)
+        ]
+        cls.travels = []
+        for i, status in enumerate([TravelStatus.COMPLETED, TravelStatus.COMPLETED, TravelStatus.CANCELLED]):
+            travel = Travel.objects.create(
+                creator=600000020, from_location=chorsu, to_location=airport, status=status, expected_price='25000.00'
+            )
+            TravelInfo.objects.create(travel=travel, status=status).passengers.set(cls.passengers[:i + 1])
+            cls.travels.append(travel)
+        UserLocation.objects.create(user=42, location=chorsu)
+        UserLocation.objects.create(user=43, location=airport)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_travel_export_streams_filtered_ndjson(self):
+        response = self.client.get('/api/v1/journey/travels/export/', {'status': TravelStatus.COMPLETED})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('attachment; filename="travels-', response['Content-Disposition'])
+
+        # Sayohatlar va barcha yo'lovchilar: qatorlar sonidan qat'i nazar ikki so'rov
+        with self.assertNumQueries(2):
+            records = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(sorted(record['id'] for record in records), [self.travels[0].pk, self.travels[1].pk])
+        record = next(record for record in records if record['id'] == self.travels[1].pk)
+        self.assertEqual(record['from_location']['name'], 'Chorsu')
+        self.assertEqual(record['expected_price'], '25000.00')
+        self.assertEqual(
+            sorted(passenger['telegram_id'] for passenger in record['passengers']),
+            [passenger.telegram_id for passenger in self.passengers]
+        )
+
+    def test_user_location_export_streams_csv(self):
+        response = self.client.get(
+            '/api/v1/journey/locations/export-user-locations/', {'output': 'csv', 'telegram_id': 42}
+        )
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        self.assertEqual(rows[0], USER_LOCATION_CSV_COLUMNS)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][1:2] + rows[1][4:5], ['42', 'Chorsu'])
+
+    def test_unknown_output_rejected(self):
+        response = self.client.get('/api/v1/journey/travels/export/', {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncLocationViewTests(TestCase):
+    CREATE = '/api/v1/journey/async/locations/create-user-location/'
+    LATEST = '/api/v1/journey/async/locations/user-latest/{}/'
+
+    def setUp(self):
+        position_store.local.clear()
+
+    async def post(self, data):
+        return await self.async_client.post(self.CREATE, data, content_type='application/json')
+
+    async def test_create_then_latest(self):
+        await Location.objects.acreate(name='Chorsu', lat=41.3264, lng=69.2285)
+        data = {'telegram_id': 900000001, 'coordinate': {'lat': 41.311081, 'lng': 69.240562}, 'name': 'Amir Temur'}
+        first = await self.post(data)
+        self.assertEqual(first.status_code, 201)
+        self.assertTrue(first.json()['location_created'])
+        # Mavjud joy qayta yaratilmaydi
+        second = await self.post({**data, 'coordinate': {'lat': 41.3264, 'lng': 69.2285}, 'heading': 90})
+        self.assertEqual(second.status_code, 201)
+        self.assertFalse(second.json()['location_created'])
+        self.assertEqual(await UserLocation.objects.filter(user=900000001).acount(), 2)
+
+        response = await self.async_client.get(self.LATEST.format(900000001))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['location']['id'], second.json()['user_location']['id'])
+
+        cached = await self.async_client.get(self.LATEST.format(900000001), headers={'if-none-match': response['ETag']})
+        self.assertEqual(cached.status_code, 304)
+
+    async def test_latest_falls_back_to_database(self):
+        location = await Location.objects.acreate(name='Chorsu', lat=41.3264, lng=69.2285)
+        user_location = await UserLocation.objects.acreate(user=900000002, location=location)
+        response = await self.async_client.get(self.LATEST.format(900000002))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['location']['id'], user_location.pk)
+
+        empty = await self.async_client.get(self.LATEST.format(900000003))
+        self.assertIsNone(empty.json()['location'])
+
+    async def test_invalid_input_rejected(self):
+        response = await self.async_client.post(self.CREATE, b'{', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = await self.post({'telegram_id': 900000001})
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get(self.LATEST.format('abc'))
+        self.assertEqual(response.status_code, 400)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        request_metrics.reset()
+        self.passenger = Passenger.objects.create(telegram_id=500000060, name='Olim', contact='+998901234610')
+        self.url = f'/api/v1/journey/passengers/{self.passenger.telegram_id}/'
+
+    def test_requests_recorded_by_endpoint(self):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+            self.assertEqual(self.client.get('/api/v1/journey/passengers/1/').status_code, 404)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], PROMETHEUS_CONTENT_TYPE)
+        body = response.content.decode()
+        self.assertIn('journey_http_requests_total{endpoint="passenger-detail",method="GET",status="200"} 1', body)
+        self.assertIn('journey_http_requests_total{endpoint="passenger-detail",method="GET",status="404"} 1', body)
+        self.assertIn('journey_http_db_queries_count{endpoint="passenger-detail",method="GET"} 2', body)
+        # Ikkala so'rovdagi barcha SQL lar hisoblangan
+        self.assertIn(
+            f'journey_http_db_queries_sum{{endpoint="passenger-detail",method="GET"}} {float(len(queries))!r}', body
+        )
+        self.assertNotIn('endpoint="metrics"', body)
+
+    def test_server_timing_header(self):
+        with mock.patch.dict(request_metrics.options, {'SERVER_TIMING': True}):
+            response = self.client.get(self.url)
+        timing = response['Server-Timing']
+        for part in ('db;dur=', 'queries"', 'render;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(part, timing)
+
+    def test_disabled_metrics_endpoint(self):
+        with mock.patch.dict(request_metrics.options, {'ENABLED': False}):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+        self.assertNotIn('passenger-detail', request_metrics.render_prometheus())
+
+
+class RouteEstimateTests(TestCase):
+    def setUp(self):
+        self.chorsu = Location.objects.create(name='Chorsu', lat=41.3264, lng=69.2285)
+        self.airport = Location.objects.create(name='Aeroport', lat=41.2579, lng=69.2812)
+        distance_matrix.local.clear()
+        self.client.force_login(get_user_model().objects.create_user('operator'))
+
+    def geodesic(self):
+        return float(geodesic_km([self.chorsu.lat], [self.chorsu.lng], [self.airport.lat], [self.airport.lng])[0])
+
+    def create(self, **fields):
+        response = self.client.post('/api/v1/journey/travels/', {
+            'from_location_id': self.airport.pk, 'to_location_id': self.chorsu.pk, 'creator': 600000030, **fields
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_create_fills_distance_and_duration(self):
+        data = self.create()
+        road_km = Decimal(f'{road_distance_km(self.geodesic()):.2f}')
+        self.assertEqual(Decimal(data['distance_km']), road_km)
+        self.assertEqual(data['estimated_duration_min'], duration_min(road_km))
+
+        # Juftlik tartiblangan holda saqlanadi: teskari yo'nalish ham shu qatordan
+        row = LocationDistance.objects.get()
+        self.assertEqual((row.from_location_id, row.to_location_id), (self.chorsu.pk, self.airport.pk))
+        self.assertAlmostEqual(row.distance_km, self.geodesic())
+
+    def test_client_distance_is_kept(self):
+        data = self.create(distance_km='100.00')
+        self.assertEqual(data['distance_km'], '100.00')
+        # 30 km shaharda (22 km/soat), 70 km shaharlararo (65 km/soat)
+        self.assertEqual(data['estimated_duration_min'], 147)
+        self.assertFalse(LocationDistance.objects.exists())
+
+    def test_matrix_tiers_and_moved_location(self):
+        matrix = DistanceMatrix()
+        pairs = [(self.chorsu, self.airport), (self.airport, self.chorsu)]
+        first = matrix.distances_km(pairs)
+        self.assertEqual(first[0], first[1])
+        self.assertEqual(matrix.stats()['misses'], 1)
+
+        with self.assertNumQueries(0):
+            matrix.distances_km(pairs)
+        self.assertEqual(matrix.stats()['local_hits'], 1)
+
+        # Boshqa jarayon: LRU bo'sh, masofa jadvaldan
+        other = DistanceMatrix()
+        self.assertEqual(other.distances_km(pairs[:1]), first[:1])
+        self.assertEqual(other.stats()['table_hits'], 1)
+
+        # Ko'chirilgan lokatsiya (geohash o'zgardi) uchun masofa qayta hisoblanadi
+        self.airport.lat, self.airport.lng, self.airport.geohash = 41.5, 69.5, ''
+        self.airport.save()
+        moved = other.distances_km(pairs[:1])
+        self.assertNotEqual(moved, first[:1])
+        self.assertEqual(other.stats()['misses'], 1)
+        self.assertAlmostEqual(LocationDistance.objects.get().distance_km, moved[0])
+
+    def test_fill_route_estimates_batches_pairs(self):
+        travels = [
+            Travel(from_location=self.chorsu, to_location=self.airport, creator=600000031),
+            Travel(from_location=self.airport, to_location=self.chorsu, creator=600000031),
+            Travel(from_location=self.chorsu, to_location=None, creator=600000031),
+            Travel(from_location=self.chorsu, to_location=self.airport, creator=600000031, distance_km=Decimal('5.00')),
+        ]
+        # Bitta jadval o'qishi va bitta upsert
+        with self.assertNumQueries(2):
+            filled = fill_route_estimates(travels)
+        self.assertEqual(filled, [travels[0], travels[1], travels[3]])
+        self.assertEqual(travels[0].distance_km, travels[1].distance_km)
+        self.assertIsNone(travels[2].distance_km)
+        self.assertEqual(travels[3].distance_km, Decimal('5.00'))
+        self.assertEqual(travels[3].estimated_duration_min, duration_min(5))
+
+
+class DemandHeatmapTests(TestCase):
+    BBOX = {'min_lat': 41.2, 'min_lng': 69.1, 'max_lat': 41.4, 'max_lng': 69.4}
+
+    def setUp(self):
+        self.chorsu = Location.objects.create(name='Chorsu', lat=41.3264, lng=69.2285)
+        self.airport = Location.objects.create(name='Aeroport', lat=41.2579, lng=69.2812)
+        self.client.force_login(get_user_model().objects.create_user('operator'))
+
+    def heatmap(self, **params):
+        response = self.client.get('/api/v1/journey/travels/heatmap/', {**self.BBOX, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_create_and_delete_update_heatmap(self):
+        response = self.client.post('/api/v1/journey/travels/', {
+            'from_location_id': self.chorsu.pk, 'to_location_id': self.airport.pk, 'creator': 600000040
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+        data = self.heatmap()
+        cell = demand_service.point_cell(self.chorsu.lat, self.chorsu.lng, self.chorsu.geohash)
+        self.assertEqual([(item['cell'], item['count']) for item in data['cells']], [(cell, 1)])
+        self.assertEqual(data['total'], 1)
+
+        # O'chirilgan sayohat xaritadan ayiriladi
+        response = self.client.delete(f"/api/v1/journey/travels/{response.json()['id']}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.heatmap()['cells'], [])
+        self.assertEqual(DemandCell.objects.get().count, 0)
+
+    def test_record_counts_and_precision(self):
+        bucket = demand_service.bucket_start(timezone.now() - timedelta(hours=1))
+        chorsu = demand_service.point_cell(self.chorsu.lat, self.chorsu.lng)
+        airport = demand_service.point_cell(self.airport.lat, self.airport.lng)
+        demand_service.record_counts(DemandSource.TRAVEL, {(bucket, chorsu): 2, (bucket, airport): 1})
+        demand_service.record_counts(DemandSource.TRAVEL, {(bucket, chorsu): 1, (bucket, airport): -1})
+        # Boshqa manba va oynadan tashqaridagi oraliq hisobga olinmaydi
+        demand_service.record_counts(DemandSource.USER_LOCATION, {(bucket, chorsu): 5})
+        demand_service.record_counts(DemandSource.TRAVEL, {(bucket - timedelta(days=2), chorsu): 7})
+
+        data = self.heatmap()
+        self.assertEqual([(item['cell'], item['count']) for item in data['cells']], [(chorsu, 3)])
+        self.assertEqual(self.heatmap(source=DemandSource.USER_LOCATION)['total'], 5)
+
+        # Kichik aniqlikda kataklar prefiks bo'yicha yig'iladi
+        demand_service.record_counts(DemandSource.TRAVEL, {(bucket, airport): 4})
+        coarse = self.heatmap(precision=4)
+        self.assertEqual(coarse['precision'], 4)
+        self.assertEqual(coarse['total'], 7)
+        self.assertTrue(all(len(item['cell']) == 4 for item in coarse['cells']))
+
+    def test_invalid_query_rejected(self):
+        url = '/api/v1/journey/travels/heatmap/'
+        self.assertEqual(self.client.get(url, {**self.BBOX, 'min_lat': 42}).status_code, 400)
+        self.assertEqual(self.client.get(url, {
+            **self.BBOX, 'since': '2026-01-01T00:00:00Z', 'until': '2026-03-01T00:00:00Z'
+        }).status_code, 400)
@@ -4,6 +4,7 @@ from rest_framework.routers import DefaultRouter
 from .views.location_viewset import LocationViewSet
 from .views.passenger_views import PassengerViewSet
 from .views.travel_views import TravelViewSet
+from .views import async_location_views
 
 router = DefaultRouter()
 router.register(r'locations', LocationViewSet, basename='location')
@@ -11,6 +12,16 @@ router.register(r'passengers', PassengerViewSet,basename='passenger')
 router.register(r'travels', TravelViewSet, basename='travel')
 
 urlpatterns = [
-
+    # ASGI server ostida ishlaydigan async endpointlar
+    path(
+        'journey/async/locations/create-user-location/',
+        async_location_views.create_user_location,
+        name='async-create-user-location'
+    ),
+    path(
+        'journey/async/locations/user-latest/<str:telegram_id>/',
+        async_location_views.user_latest_location,
+        name='async-user-latest-location'
+    ),
     path('journey/', include(router.urls)),
 ]
\ No newline at end of file
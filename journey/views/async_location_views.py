@@ -0,0 +1,129 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from ..models.location import Location, UserLocation
+from ..serializers.location_serializer import UserLocationCreateSerializer, UserLocationSerializer
+from ..services.position_store import position_store
+from ..services.conditional import location_version, conditional_response, set_validators
+from ..tasks import defer_user_location_demand
+
+# ASGI (uvicorn) ostida ishlaydigan async endpointlar: sekin mijoz yoki live-location
+# oqimi worker ni band qilmaydi. Javob formati LocationViewSet dagi bilan bir xil.
+
+
+@sync_to_async
+def _save_user_location(validated):
+    """
+    Location va UserLocation bitta tranzaksiyada (sinxron yo'l bilan bir xil).
+    Async ORM da tranzaksiya yo'q, shuning uchun blok bitta sync_to_async
+    chaqiruvida bajariladi: bitta thread almashinuvi, qisman yozuv qolmaydi.
+    """
+    coordinate = validated['coordinate']
+    with transaction.atomic():
+        # 1. Locationni topish yoki yaratish
+        location, created = Location.objects.get_or_create(
+            lat=coordinate['lat'],
+            lng=coordinate['lng'],
+            defaults={
+                'name': validated.get('name')
+            }
+        )
+
+        # 2. UserLocation yaratish
+        user_location = UserLocation.objects.create(
+            user=validated['telegram_id'],
+            location=location,
+            accuracy=validated.get('accuracy'),
+            live_period=validated.get('live_period'),
+            heading=validated.get('heading')
+        )
+        defer_user_location_demand([user_location.pk])
+    return user_location, created
+
+
+@csrf_exempt
+@require_POST
+async def create_user_location(request):
+    """
+    Foydalanuvchi uchun yangi lokatsiya yaratish (async)
+    POST /api/v1/journey/async/locations/create-user-location/
+    {
+        "telegram_id": 123456789,
+        "coordinate": {"lat": 41.311081, "lng": 69.240562},
+        "name": "...",
+        "accuracy": 10.5,
+        "live_period": 60,
+        "heading": 90
+    }
+    """
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+
+    serializer = UserLocationCreateSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    validated = serializer.validated_data
+    telegram_id = validated['telegram_id']
+
+    try:
+        user_location, created = await _save_user_location(validated)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+    user_location_data = UserLocationSerializer(user_location).data
+    await position_store.aset(telegram_id, user_location_data)
+
+    return JsonResponse({
+        'success': True,
+        'message': 'User location created successfully',
+        'user_location': user_location_data,
+        'location_created': created
+    }, status=201)
+
+
+@require_GET
+async def user_latest_location(request, telegram_id):
+    """
+    Foydalanuvchining oxirgi joylashuvi (async)
+    GET /api/v1/journey/async/locations/user-latest/123456789/
+    """
+    try:
+        telegram_id = int(telegram_id)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid telegram_id format'}, status=400)
+
+    # Avval pozitsiyalar omboridan, topilmasa bazadan
+    location_data = await position_store.aget(telegram_id)
+    if location_data is None:
+        latest_location = await UserLocation.objects.filter(
+            user=telegram_id
+        ).select_related('location').order_by('-created_at').afirst()
+
+        if latest_location is None:
+            return JsonResponse({
+                'success': True,
+                'message': 'No locations found for user',
+                'location': None
+            })
+
+        location_data = UserLocationSerializer(latest_location).data
+        await position_store.aset(telegram_id, location_data)
+
+    etag, last_modified = location_version(location_data)
+    not_modified = conditional_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    return set_validators(JsonResponse({
+        'success': True,
+        'telegram_id': telegram_id,
+        'location': location_data
+    }), etag, last_modified)
@@ -7,8 +7,18 @@ from django.db import transaction
 from ..models.location import Location, UserLocation
 from ..serializers.location_serializer import (
     UserLocationCreateSerializer,
-    UserLocationSerializer
+    UserLocationBatchSerializer,
+    UserLocationSerializer,
+    NearbyLocationQuerySerializer,
+    NearbyLocationSerializer
 )
+from ..services.locations import nearby_locations, ingest_user_locations
+from ..serializers.travel_serializers import ExportQuerySerializer
+from ..filters.location_filters import UserLocationFilter
+from ..services.position_store import position_store
+from ..services.export import export_user_locations
+from ..services.conditional import location_version, conditional_response, set_validators
+from ..tasks import defer_user_location_demand, store_latest_positions
 
 
 class LocationViewSet(viewsets.ViewSet):
@@ -61,10 +71,16 @@ class LocationViewSet(viewsets.ViewSet):
                     heading=heading
                 )
 
+                user_location_data = UserLocationSerializer(user_location).data
+                transaction.on_commit(
+                    lambda: position_store.set(telegram_id, user_location_data)
+                )
+                defer_user_location_demand([user_location.pk])
+
                 response_data = {
                     'success': True,
                     'message': 'User location created successfully',
-                    'user_location': UserLocationSerializer(user_location).data,
+                    'user_location': user_location_data,
                     'location_created': created
                 }
 
@@ -76,6 +92,114 @@ class LocationViewSet(viewsets.ViewSet):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'], url_path='create-user-locations-batch')
+    def create_user_locations_batch(self, request):
+        """
+        Bir so'rovda ko'plab lokatsiyalarni saqlash (live location oqimi uchun)
+        POST /api/v1/journey/locations/create-user-locations-batch/
+        {
+            "items": [
+                {"telegram_id": 123456789, "name": "...", "coordinate": {"lat": 41.31, "lng": 69.24}, "heading": 90},
+                ...
+            ]
+        }
+        """
+        batch = UserLocationBatchSerializer(data=request.data)
+        if not batch.is_valid():
+            return Response(batch.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = {}
+        valid_items = []
+        for index, item in enumerate(batch.validated_data['items']):
+            serializer = UserLocationCreateSerializer(data=item)
+            if serializer.is_valid():
+                valid_items.append((index, serializer.validated_data))
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+
+        try:
+            created_results, latest = ingest_user_locations(valid_items)
+            results.update(created_results)
+            if latest:
+                # Pozitsiyalar keshi fon vazifasida yangilanadi
+                store_latest_positions.delay([user_location.pk for user_location in latest.values()])
+            defer_user_location_demand([
+                result['id'] for result in created_results.values() if result['status'] == 'created'
+            ])
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        ordered = [results[index] for index in sorted(results)]
+        created = sum(1 for result in ordered if result['status'] == 'created')
+        return Response({
+            'success': True,
+            'received': len(ordered),
+            'created': created,
+            'failed': len(ordered) - created,
+            'results': ordered
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='nearby')
+    def nearby(self, request):
+        """
+        Berilgan nuqta atrofidagi joylashuvlar (masofa bo'yicha saralangan)
+        GET /api/v1/journey/locations/nearby/?lat=41.311081&lng=69.240562&radius=200
+        """
+        serializer = NearbyLocationQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+        results = nearby_locations(
+            params['lat'],
+            params['lng'],
+            params['radius'],
+            limit=params['limit'],
+            only_available=params['available']
+        )
+
+        locations = []
+        for location, distance in results:
+            location.distance_m = round(distance, 1)
+            locations.append(location)
+
+        return Response({
+            'success': True,
+            'radius': params['radius'],
+            'count': len(locations),
+            'locations': NearbyLocationSerializer(locations, many=True).data
+        })
+
+    @action(detail=False, methods=['get'], url_path='export-user-locations')
+    def export_user_locations(self, request):
+        """
+        Foydalanuvchi lokatsiyalari tarixini NDJSON yoki CSV oqimi sifatida yuklab olish
+        GET /api/v1/journey/locations/export-user-locations/?output=csv&telegram_id=123456789&created_after=2025-01-01T00:00:00Z
+        """
+        query = ExportQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        history = UserLocationFilter(request.query_params, queryset=UserLocation.objects.all())
+        if not history.is_valid():
+            return Response(history.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return export_user_locations(history.qs, query.validated_data['output'])
+
+    @action(detail=False, methods=['get'], url_path='position-store-stats')
+    def position_store_stats(self, request):
+        """
+        Oxirgi pozitsiyalar omborining hit/miss hisoblagichlari (joriy worker uchun)
+        GET /api/v1/journey/locations/position-store-stats/
+        """
+        return Response({
+            'success': True,
+            'stats': position_store.stats()
+        })
+
     @action(detail=False, methods=['get'], url_path='user-locations/(?P<telegram_id>[^/.]+)')
     def user_locations(self, request, telegram_id=None):
         """
@@ -116,24 +240,35 @@ class LocationViewSet(viewsets.ViewSet):
         """
         try:
             telegram_id = int(telegram_id)
-            latest_location = UserLocation.objects.filter(
-                user=telegram_id
-            ).select_related('location').order_by('-created_at').first()
 
-            if not latest_location:
-                return Response({
-                    'success': True,
-                    'message': 'No locations found for user',
-                    'location': None
-                })
+            # Avval pozitsiyalar omboridan, topilmasa bazadan
+            location_data = position_store.get(telegram_id)
+            if location_data is None:
+                latest_location = UserLocation.objects.filter(
+                    user=telegram_id
+                ).select_related('location').order_by('-created_at').first()
 
-            serializer = UserLocationSerializer(latest_location)
+                if not latest_location:
+                    return Response({
+                        'success': True,
+                        'message': 'No locations found for user',
+                        'location': None
+                    })
 
-            return Response({
+                location_data = UserLocationSerializer(latest_location).data
+                position_store.set(telegram_id, location_data)
+
+            # UserLocation o'zgarmaydi (faqat qo'shiladi): versiya - oxirgi yozuvning id va vaqti
+            etag, last_modified = location_version(location_data)
+            not_modified = conditional_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+
+            return set_validators(Response({
                 'success': True,
                 'telegram_id': telegram_id,
-                'location': serializer.data
-            })
+                'location': location_data
+            }), etag, last_modified)
 
         except ValueError:
             return Response({
@@ -155,6 +290,7 @@ class LocationViewSet(viewsets.ViewSet):
         try:
             telegram_id = int(telegram_id)
             deleted_count, _ = UserLocation.objects.filter(user=telegram_id).delete()
+            position_store.delete(telegram_id)
 
             return Response({
                 'success': True,
@@ -0,0 +1,17 @@
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from ..services.request_metrics import request_metrics
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def metrics(request):
+    """
+    So'rov metrikalari Prometheus text formatida
+    GET /metrics
+    """
+    if not request_metrics.options['ENABLED']:
+        raise Http404
+    return HttpResponse(request_metrics.render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,12 +1,14 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.exceptions import NotFound, ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db import transaction, models
-from django.db.models import Avg, Count, Sum
-from django.shortcuts import get_object_or_404
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 
 from journey.models import Passenger
 from journey.serializers.passenger_serializers import (
@@ -15,9 +17,18 @@ from journey.serializers.passenger_serializers import (
     PassengerDetailSerializer,
     PassengerListSerializer,
     PassengerRatingSerializer,
-    PassengerStatsSerializer
+    PassengerScoreSerializer,
+    PassengerStatsSerializer,
+    PassengerBulkUpsertSerializer
 )
+from journey.serializers.travel_serializers import StatsQuerySerializer
 from journey.filters.passenger_filters import PassengerFilter
+from journey.filters.search import IndexedSearchFilter
+from journey.services import stats as stats_service
+from journey.services import atomic_updates
+from journey.services.passenger_cache import passenger_cache
+from journey.services.passengers import bulk_upsert_passengers
+from journey.services.conditional import make_etag, parse_timestamp, conditional_response, set_validators
 
 
 class PassengerViewSet(viewsets.ModelViewSet):
@@ -29,11 +40,13 @@ class PassengerViewSet(viewsets.ModelViewSet):
     lookup_field = 'telegram_id'
     lookup_url_kwarg = 'telegram_id'
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # Qidiruv OrderingFilter dan keyin: ordering so'ralmasa natijalar moslik bo'yicha tartiblanadi
+    filter_backends = [DjangoFilterBackend, OrderingFilter, IndexedSearchFilter]
     filterset_class = PassengerFilter
     search_fields = ['name', 'contact', 'telegram_id']
     ordering_fields = ['name', 'rating', 'total_trips', 'created_at']
     ordering = ['-created_at']
+    rank_search_results = True
 
     def get_serializer_class(self):
         action_serializers = {
@@ -59,6 +72,42 @@ class PassengerViewSet(viewsets.ModelViewSet):
         except ValueError:
             raise ValidationError({'error': 'Noto\'g\'ri Telegram ID format'})
 
+    def get_telegram_id(self, telegram_id=None):
+        """URL yoki query paramdagi Telegram ID ni butun songa aylantirish"""
+        telegram_id = telegram_id or self.kwargs.get('telegram_id')
+        if not telegram_id:
+            raise ValidationError({'error': 'telegram_id kiritilmagan'})
+        try:
+            return int(telegram_id)
+        except (TypeError, ValueError):
+            raise ValidationError({'error': 'Noto\'g\'ri Telegram ID format'})
+
+    def get_cached_detail(self, telegram_id):
+        """PassengerDetailSerializer natijasi keshdan, bo'lmasa bazadan; topilmasa None"""
+        telegram_id = self.get_telegram_id(telegram_id)
+
+        def load():
+            try:
+                passenger = Passenger.objects.get(telegram_id=telegram_id)
+            except Passenger.DoesNotExist:
+                return None
+            return PassengerDetailSerializer(passenger).data
+
+        return passenger_cache.get_or_load(telegram_id, load)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = self.get_cached_detail(self.kwargs.get('telegram_id'))
+        if data is None:
+            raise NotFound({'status': False, 'error': 'Yo\'lovchi topilmadi'})
+
+        # Versiya keshdagi payloaddan: updated_at soniya aniqligida, shuning uchun ETag butun payloaddan
+        etag = make_etag(data)
+        last_modified = parse_timestamp(data.get('updated_at'))
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(Response(data), etag, last_modified)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -66,6 +115,7 @@ class PassengerViewSet(viewsets.ModelViewSet):
         try:
             with transaction.atomic():
                 passenger = serializer.save()
+                stats_service.record_passenger_change(passenger)
         except Exception as e:
             return Response(
                 {'error': f'Yaratishda xatolik: {str(e)}'},
@@ -85,7 +135,9 @@ class PassengerViewSet(viewsets.ModelViewSet):
 
         try:
             with transaction.atomic():
+                before = stats_service.passenger_snapshot(instance)
                 self.perform_update(serializer)
+                stats_service.record_passenger_change(instance, before)
         except Exception as e:
             return Response(
                 {'error': f'Yangilashda xatolik: {str(e)}'},
@@ -111,41 +163,73 @@ class PassengerViewSet(viewsets.ModelViewSet):
             status=status.HTTP_204_NO_CONTENT
         )
 
+    def perform_destroy(self, instance):
+        # Statistika farqi va o'chirish birga commit qilinadi
+        with transaction.atomic():
+            stats_service.record_passenger_change(
+                instance, stats_service.passenger_snapshot(instance), deleted=True
+            )
+            instance.delete()
+
 
     @action(detail=True, methods=['post'], url_path='update-rating')
     def update_rating(self, request, telegram_id=None):
-        """Reyting yangilash"""
-        passenger = self.get_object()
-        serializer = PassengerRatingSerializer(data=request.data)
+        """
+        Reyting yangilash (qo'lda o'rnatish).
+        Qiymat mavjud baholar soni og'irligi bilan rating_sum ga yoziladi:
+        keyingi sayohat baholari uni qayta yozib yubormaydi.
+        """
+        return self.rating_response(PassengerRatingSerializer, atomic_updates.set_passenger_rating)
+
+    @action(detail=True, methods=['post'], url_path='add-rating')
+    def add_rating(self, request, telegram_id=None):
+        """Bitta bahoni (0-5, butun son) o'rtacha reytingga qo'shish"""
+        return self.rating_response(PassengerScoreSerializer, atomic_updates.add_passenger_rating)
+
+    def rating_response(self, serializer_class, update):
+        telegram_id = self.get_telegram_id()
+        serializer = serializer_class(data=self.request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            with transaction.atomic():
-                passenger.rating = serializer.validated_data['rating']
-                passenger.save()
+            passenger = update(telegram_id, serializer.validated_data['rating'])
         except Exception as e:
             return Response(
                 {'error': f'Reyting yangilashda xatolik: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if passenger is None:
+            raise NotFound({'status': False, 'error': 'Yo\'lovchi topilmadi'})
+
         return Response(PassengerDetailSerializer(passenger).data)
 
     @action(detail=True, methods=['post'], url_path='increment-trips')
     def increment_trips(self, request, telegram_id=None):
-        """Sayohatlar sonini oshirish"""
-        passenger = self.get_object()
+        """
+        Sayohatlar sonini oshirish.
+        COUNT_TRIPS_ON_COMPLETE yoqilgan bo'lsa sayohatlar yakunlanganda avtomatik
+        sanaladi - qo'lda oshirish rad etiladi (409), aks holda ikki marta sanaladi.
+        """
+        if getattr(settings, 'COUNT_TRIPS_ON_COMPLETE', False):
+            return Response(
+                {'error': 'Sayohatlar soni sayohat yakunlanganda avtomatik hisoblanadi'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        telegram_id = self.get_telegram_id()
 
         try:
-            with transaction.atomic():
-                passenger.total_trips += 1
-                passenger.save()
+            passenger = atomic_updates.increment_passenger_trips(telegram_id)
         except Exception as e:
             return Response(
                 {'error': f'Sayohatlar sonini oshirishda xatolik: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if passenger is None:
+            raise NotFound({'status': False, 'error': 'Yo\'lovchi topilmadi'})
+
         return Response(PassengerDetailSerializer(passenger).data)
 
     @action(detail=True, methods=['post'], url_path='toggle-active')
@@ -155,8 +239,10 @@ class PassengerViewSet(viewsets.ModelViewSet):
 
         try:
             with transaction.atomic():
+                before = stats_service.passenger_snapshot(passenger)
                 passenger.is_active = not passenger.is_active
                 passenger.save()
+                stats_service.record_passenger_change(passenger, before)
         except Exception as e:
             return Response(
                 {'error': f'Status o\'zgartirishda xatolik: {str(e)}'},
@@ -171,13 +257,11 @@ class PassengerViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Umumiy statistika"""
-        stats = Passenger.objects.aggregate(
-            total_passengers=Count('id'),
-            active_passengers=Count('id', filter=models.Q(is_active=True)),
-            average_rating=Avg('rating'),
-            total_trips=Sum('total_trips')
-        )
+        """Umumiy statistika (oldindan yig'ilgan hisoblagichlardan)"""
+        query = StatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        stats = stats_service.passenger_stats(**query.validated_data)
 
         serializer = PassengerStatsSerializer(stats)
         return Response(serializer.data)
@@ -190,12 +274,21 @@ class PassengerViewSet(viewsets.ModelViewSet):
         if not telegram_id:
             raise ValidationError({'error': 'telegram_id parametri talab qilinadi'})
 
-        try:
-            passenger = get_object_or_404(Passenger, telegram_id=telegram_id)
-            serializer = PassengerDetailSerializer(passenger)
-            return Response(serializer.data)
-        except Passenger.DoesNotExist:
+        data = self.get_cached_detail(telegram_id)
+        if data is None:
             raise NotFound({'error': 'Yo\'lovchi topilmadi'})
+        return Response(data)
+
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """
+        Yo'lovchi keshining hit/miss hisoblagichlari (joriy worker uchun)
+        GET /api/v1/journey/passengers/cache-stats/
+        """
+        return Response({
+            'success': True,
+            'stats': passenger_cache.stats()
+        })
 
     @action(detail=False, methods=['get'])
     def active(self, request):
@@ -232,9 +325,22 @@ class PassengerViewSet(viewsets.ModelViewSet):
 
         try:
             with transaction.atomic():
-                updated_count = Passenger.objects.filter(
-                    telegram_id__in=telegram_ids
-                ).update(is_active=is_active)
+                passengers = Passenger.objects.filter(telegram_id__in=telegram_ids)
+                rows = list(
+                    passengers.select_for_update().values_list('telegram_id', 'is_active', 'created_at')
+                )
+                updated_count = passengers.update(is_active=is_active, updated_at=timezone.now())
+
+                # Holati haqiqatan o'zgargan yo'lovchilar statistikaga kiritiladi
+                new_active = Passenger._meta.get_field('is_active').to_python(is_active)
+                stats_service.record_passengers_activity(
+                    [created_at for _, active, created_at in rows if active != new_active],
+                    new_active
+                )
+                # update() signal yubormaydi, shuning uchun kesh shu yerda bekor qilinadi
+                transaction.on_commit(
+                    partial(passenger_cache.invalidate_many, [row[0] for row in rows])
+                )
         except Exception as e:
             return Response(
                 {'error': f'Bulk update xatosi: {str(e)}'},
@@ -244,4 +350,48 @@ class PassengerViewSet(viewsets.ModelViewSet):
         return Response({
             'message': f'{updated_count} ta yo\'lovchi yangilandi',
             'is_active': is_active
-        })
\ No newline at end of file
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk-upsert')
+    def bulk_upsert(self, request):
+        """
+        Ko'plab yo'lovchini telegram_id bo'yicha yaratish yoki yangilash
+        POST /api/v1/journey/passengers/bulk-upsert/
+        {
+            "items": [
+                {"telegram_id": 123456789, "name": "...", "contact": "+998901234567"},
+                ...
+            ]
+        }
+        """
+        batch = PassengerBulkUpsertSerializer(data=request.data)
+        if not batch.is_valid():
+            return Response(batch.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        valid_items, errors = batch.validate_items_individually()
+        results = {
+            index: {'index': index, 'status': 'error', 'errors': item_errors}
+            for index, item_errors in errors.items()
+        }
+
+        try:
+            results.update(bulk_upsert_passengers(valid_items))
+        except Exception as e:
+            return Response(
+                {'error': f'Bulk upsert xatosi: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ordered = [results[index] for index in sorted(results)]
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'error': 0}
+        for result in ordered:
+            counts[result['status']] += 1
+
+        return Response({
+            'received': len(ordered),
+            'created': counts['created'],
+            'updated': counts['updated'],
+            'unchanged': counts['unchanged'],
+            'failed': counts['error'],
+            'results': ordered
+        })
@@ -1,14 +1,14 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.exceptions import ValidationError, NotFound
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Count, Avg, Sum, Q
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 
 from journey.models import Travel, TravelInfo, TravelStatus, Location, Driver, Passenger
 from journey.serializers.travel_serializers import (
@@ -19,9 +19,28 @@ from journey.serializers.travel_serializers import (
     TravelStatusUpdateSerializer,
     TravelDriverUpdateSerializer,
     TravelRatingSerializer,
-    TravelStatsSerializer
+    TravelStatsSerializer,
+    StatsQuerySerializer,
+    HeatmapQuerySerializer,
+    ExportQuerySerializer,
+    NearbyDriverSerializer,
+    NearbyDriverQuerySerializer,
+    DriverRoadMatchSerializer,
+    RoadMatchQuerySerializer,
+    travel_detail_rows
 )
 from journey.filters.travel_filters import TravelFilter
+from journey.filters.search import IndexedSearchFilter
+from journey.pagination import TravelCursorPagination
+from journey.services.driver_search import find_nearest_drivers
+from journey.services.corridor import match_roads
+from journey.services import stats as stats_service
+from journey.services import demand as demand_service
+from journey.services.export import export_travels
+from journey.services.conditional import travel_version, conditional_response, set_validators
+from journey.services.travel_status import allowed_transitions, transition_travel
+from journey.services.routes import fill_route_estimates
+from journey import tasks
 
 
 class TravelViewSet(viewsets.ModelViewSet):
@@ -31,13 +50,12 @@ class TravelViewSet(viewsets.ModelViewSet):
 
     queryset = Travel.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
     filterset_class = TravelFilter
+    pagination_class = TravelCursorPagination
     search_fields = ['from_location__name', 'to_location__name', 'driver__name']
-    ordering_fields = [
-        'created_at', 'started_at', 'completed_at',
-        'expected_price', 'distance_km'
-    ]
+    # Keyset paginatsiya faqat created_at bo'yicha tartibni qo'llaydi
+    ordering_fields = ['created_at']
     ordering = ['-created_at']
 
     def get_serializer_class(self):
@@ -56,6 +74,46 @@ class TravelViewSet(viewsets.ModelViewSet):
             'from_location', 'to_location', 'driver'
         ).prefetch_related('info__passengers')
 
+    def list_response(self, queryset):
+        """
+        Ro'yxat javobi (TravelDetailSerializer shaklida).
+        TRAVEL_FAST_LIST yoqilgan bo'lsa, qatorlar values() bilan o'qiladi va
+        model obyektlari hamda ichki serializerlarsiz dict ga yig'iladi.
+        """
+        fast = getattr(settings, 'TRAVEL_FAST_LIST', False)
+        if fast:
+            queryset = travel_detail_rows.values(queryset)
+
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        if fast:
+            data = travel_detail_rows.to_representation(rows)
+        else:
+            data = TravelDetailSerializer(rows, many=True).data
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Sayohat tafsilotlari, ETag / Last-Modified bilan.
+        Versiya serializatsiyadan oldin olinadi: o'zgarmagan sayohat uchun
+        bitta yengil so'rov va 304, javob oraliqda o'zgarsa keyingi so'rovda yangilanadi.
+        """
+        version = travel_version(self.kwargs['pk'])
+        if version is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag, last_modified = version
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
     def create(self, request, *args, **kwargs):
         """Yangi sayohat yaratish"""
         serializer = self.get_serializer(data=request.data)
@@ -73,7 +131,7 @@ class TravelViewSet(viewsets.ModelViewSet):
                     id=serializer.validated_data['to_location_id']
                 )
 
-                travel = Travel.objects.create(
+                travel = Travel(
                     from_location=from_location,
                     to_location=to_location,
                     creator=serializer.validated_data['creator'],
@@ -81,9 +139,14 @@ class TravelViewSet(viewsets.ModelViewSet):
                     distance_km=serializer.validated_data.get('distance_km'),
                     estimated_duration_min=serializer.validated_data.get('estimated_duration_min')
                 )
+                # Berilmagan masofa va davomiylik koordinatalardan hisoblanadi
+                fill_route_estimates([travel])
+                travel.save()
 
                 # TravelInfo yaratish
                 TravelInfo.objects.create(travel=travel)
+                stats_service.record_travel_change(travel)
+                tasks.defer_travel_demand(travel)
 
         except Exception as e:
             return Response(
@@ -105,7 +168,9 @@ class TravelViewSet(viewsets.ModelViewSet):
 
         try:
             with transaction.atomic():
+                before = stats_service.travel_snapshot(instance)
                 self.perform_update(serializer)
+                stats_service.record_travel_change(instance, before)
         except Exception as e:
             return Response(
                 {'error': f'Yangilashda xatolik: {str(e)}'},
@@ -114,36 +179,56 @@ class TravelViewSet(viewsets.ModelViewSet):
 
         return Response(TravelWithInfoSerializer(instance).data)
 
-    @action(detail=True, methods=['post'], url_path='update-status')
-    def update_status(self, request, pk=None):
-        """Sayohat statusini yangilash"""
-        travel = self.get_object()
-        serializer = TravelStatusUpdateSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        new_status = serializer.validated_data['status']
-
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            stats_service.record_travel_change(
+                instance, stats_service.travel_snapshot(instance), deleted=True
+            )
+            tasks.defer_travel_demand(instance, deleted=True)
+            instance.delete()
+
+    def transition_response(self, travel, new_status, error_message, **fields):
+        """
+        Holat o'tishi javobi (compare-and-set, journey.services.travel_status).
+        O'tish bajarilgan yoki holat allaqachon shunday bo'lsa - 200; jadvalda
+        yo'q o'tish yoki holatni parallel so'rov o'zgartirgan bo'lsa - 409.
+        """
         try:
-            with transaction.atomic():
-                travel.info.status = new_status
-
-                # Statusga qarab vaqtlarni yangilash
-                if new_status == TravelStatus.STARTED and not travel.started_at:
-                    travel.started_at = timezone.now()
-                elif new_status == TravelStatus.COMPLETED and not travel.completed_at:
-                    travel.completed_at = timezone.now()
-
-                travel.info.save()
-                travel.save()
-
+            changed, current = transition_travel(travel, new_status, **fields)
         except Exception as e:
             return Response(
-                {'error': f'Status yangilashda xatolik: {str(e)}'},
+                {'error': f'{error_message}: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if current is None:
+            raise NotFound({'error': 'Sayohat topilmadi'})
+        if not changed and current != new_status:
+            return Response(
+                {
+                    'error': f"Sayohat holatini '{current}' dan '{new_status}' ga o'zgartirib bo'lmaydi",
+                    'status': current,
+                    'allowed': sorted(allowed_transitions(current)),
+                },
+                status=status.HTTP_409_CONFLICT
+            )
+        if not changed and travel.status != current:
+            # Parallel so'rov aynan shu holatga o'tkazgan: javob yangi ma'lumot bilan
+            travel = self.get_object()
+
         return Response(TravelWithInfoSerializer(travel).data)
 
+    @action(detail=True, methods=['post'], url_path='update-status')
+    def update_status(self, request, pk=None):
+        """Sayohat statusini yangilash (faqat ruxsat etilgan o'tishlar)"""
+        travel = self.get_object()
+        serializer = TravelStatusUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return self.transition_response(
+            travel, serializer.validated_data['status'], 'Status yangilashda xatolik'
+        )
+
     @action(detail=True, methods=['post'], url_path='assign-driver')
     def assign_driver(self, request, pk=None):
         """Haydovchi tayinlash"""
@@ -161,7 +246,8 @@ class TravelViewSet(viewsets.ModelViewSet):
         try:
             with transaction.atomic():
                 travel.driver = driver
-                travel.save()
+                # Faqat haydovchi: holat ustunlarini eski qiymat bilan qayta yozmaslik uchun
+                travel.save(update_fields=['driver', 'updated_at'])
 
         except Exception as e:
             return Response(
@@ -171,6 +257,57 @@ class TravelViewSet(viewsets.ModelViewSet):
 
         return Response(TravelWithInfoSerializer(travel).data)
 
+    @action(detail=True, methods=['get'], url_path='nearby-drivers')
+    def nearby_drivers(self, request, pk=None):
+        """Sayohat boshlanish joyiga eng yaqin faol haydovchilar"""
+        travel = self.get_object()
+        serializer = NearbyDriverQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        pickup = travel.from_location
+        if pickup is None:
+            raise ValidationError({'error': 'Sayohatning boshlanish joyi ko\'rsatilmagan'})
+
+        matches = find_nearest_drivers(
+            pickup.lat,
+            pickup.lng,
+            limit=serializer.validated_data['limit'],
+            max_distance_km=serializer.validated_data['radius_km']
+        )
+
+        drivers = []
+        for driver, distance in matches:
+            driver.distance_km = round(distance, 3)
+            drivers.append(driver)
+
+        return Response({
+            'travel_id': travel.id,
+            'count': len(drivers),
+            'drivers': NearbyDriverSerializer(drivers, many=True).data
+        })
+
+    @action(detail=True, methods=['get'], url_path='matching-roads')
+    def matching_roads(self, request, pk=None):
+        """Sayohat yo'nalishiga mos keladigan haydovchi yo'llari"""
+        travel = self.get_object()
+        serializer = RoadMatchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        if travel.from_location is None or travel.to_location is None:
+            raise ValidationError({'error': 'Sayohatning boshlanish va tugash joylari ko\'rsatilishi kerak'})
+
+        roads = match_roads(
+            travel.from_location,
+            travel.to_location,
+            **serializer.validated_data
+        )
+
+        return Response({
+            'travel_id': travel.id,
+            'count': len(roads),
+            'roads': DriverRoadMatchSerializer(roads, many=True).data
+        })
+
     @action(detail=True, methods=['post'], url_path='add-passengers')
     def add_passengers(self, request, pk=None):
         """Yo'lovchi qo'shish"""
@@ -196,7 +333,7 @@ class TravelViewSet(viewsets.ModelViewSet):
                     )
                     if female_passengers.exists():
                         travel.info.has_female = True
-                        travel.info.save()
+                        travel.info.save(update_fields=['has_female', 'updated_at'])
 
         except Exception as e:
             return Response(
@@ -218,12 +355,28 @@ class TravelViewSet(viewsets.ModelViewSet):
 
         try:
             with transaction.atomic():
+                # Eski baho qulf ostida o'qiladi: parallel baholash ikki marta sanalmasligi uchun
+                old_driver_rating, old_passenger_rating = TravelInfo.objects.select_for_update().filter(
+                    pk=travel.info.pk
+                ).values_list('driver_rating', 'passenger_rating').get()
+                travel.info.driver_rating = old_driver_rating
+                travel.info.passenger_rating = old_passenger_rating
+
+                before = stats_service.travel_snapshot(travel)
+                # O'rtacha reytinglar va statistika fon vazifalarida qayta hisoblanadi
                 if rated_by == 'driver':
                     travel.info.passenger_rating = rating
+                    tasks.update_passenger_rating.delay_on_commit(
+                        [passenger.pk for passenger in travel.info.passengers.all()],
+                        rating,
+                        old_passenger_rating
+                    )
                 else:  # passenger
                     travel.info.driver_rating = rating
+                    tasks.update_driver_rating.delay_on_commit(travel.driver_id, rating, old_driver_rating)
 
-                travel.info.save()
+                travel.info.save(update_fields=['driver_rating', 'passenger_rating', 'updated_at'])
+                tasks.defer_travel_change(travel, before)
 
         except Exception as e:
             return Response(
@@ -239,57 +392,50 @@ class TravelViewSet(viewsets.ModelViewSet):
         travel = self.get_object()
         final_price = request.data.get('final_price')
 
-        try:
-            with transaction.atomic():
-                travel.info.status = TravelStatus.COMPLETED
-                travel.completed_at = timezone.now()
-
-                if final_price:
-                    travel.final_price = final_price
-
-                travel.info.save()
-                travel.save()
-
-        except Exception as e:
-            return Response(
-                {'error': f'Yakunlashda xatolik: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        return Response(TravelWithInfoSerializer(travel).data)
+        fields = {'final_price': final_price} if final_price else {}
+        return self.transition_response(travel, TravelStatus.COMPLETED, 'Yakunlashda xatolik', **fields)
 
     @action(detail=True, methods=['post'], url_path='cancel')
     def cancel_travel(self, request, pk=None):
         """Sayohatni bekor qilish"""
         travel = self.get_object()
-
-        try:
-            with transaction.atomic():
-                travel.info.status = TravelStatus.CANCELLED
-                travel.info.save()
-
-        except Exception as e:
-            return Response(
-                {'error': f'Bekor qilishda xatolik: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        return Response(TravelWithInfoSerializer(travel).data)
+        return self.transition_response(travel, TravelStatus.CANCELLED, 'Bekor qilishda xatolik')
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Sayohatlar statistikasi"""
-        stats = Travel.objects.aggregate(
-            total_travels=Count('id'),
-            completed_travels=Count('id', filter=Q(info__status=TravelStatus.COMPLETED)),
-            cancelled_travels=Count('id', filter=Q(info__status=TravelStatus.CANCELLED)),
-            total_revenue=Sum('final_price'),
-            average_rating=Avg('info__driver_rating')
-        )
+        """Sayohatlar statistikasi (oldindan yig'ilgan hisoblagichlardan)"""
+        query = StatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        stats = stats_service.travel_stats(**query.validated_data)
 
         serializer = TravelStatsSerializer(stats)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='heatmap')
+    def heatmap(self, request):
+        """
+        Talab xaritasi: to'rtburchak va vaqt oynasidagi geohash kataklari bo'yicha
+        sayohat boshlanishlari (yoki source=user_location - foydalanuvchi joylashuvlari) soni
+        GET /api/v1/journey/travels/heatmap/?min_lat=41.2&min_lng=69.1&max_lat=41.4&max_lng=69.4&since=2025-01-01T08:00:00Z&precision=6
+        """
+        query = HeatmapQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        return Response(demand_service.heatmap(**query.validated_data))
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Sayohatlarni NDJSON yoki CSV oqimi sifatida yuklab olish (TravelFilter parametrlari bilan)
+        GET /api/v1/journey/travels/export/?output=csv&status=completed
+        """
+        query = ExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        travels = self.filter_queryset(Travel.objects.all())
+        return export_travels(travels, query.validated_data['output'])
+
     @action(detail=False, methods=['get'], url_path='by-creator')
     def by_creator(self, request):
         """Yaratuvchi bo'yicha sayohatlar"""
@@ -302,13 +448,7 @@ class TravelViewSet(viewsets.ModelViewSet):
             self.get_queryset().filter(creator=creator_id)
         )
 
-        page = self.paginate_queryset(travels)
-        if page is not None:
-            serializer = TravelDetailSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = TravelDetailSerializer(travels, many=True)
-        return Response(serializer.data)
+        return self.list_response(travels)
 
     @action(detail=False, methods=['get'], url_path='by-driver')
     def by_driver(self, request):
@@ -322,33 +462,14 @@ class TravelViewSet(viewsets.ModelViewSet):
             self.get_queryset().filter(driver_id=driver_id)
         )
 
-        page = self.paginate_queryset(travels)
-        if page is not None:
-            serializer = TravelDetailSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = TravelDetailSerializer(travels, many=True)
-        return Response(serializer.data)
+        return self.list_response(travels)
 
     @action(detail=False, methods=['get'], url_path='active')
     def active_travels(self, request):
         """Faol sayohatlar"""
-        active_statuses = [
-            TravelStatus.CREATED,
-            TravelStatus.SEARCHING_DRIVER,
-            TravelStatus.DRIVER_FOUND,
-            TravelStatus.ARRIVED,
-            TravelStatus.STARTED
-        ]
-
+        # Travel.is_active bo'yicha qisman (partial) indeks ishlatiladi, TravelInfo bilan join yo'q
         active_travels = self.filter_queryset(
-            self.get_queryset().filter(info__status__in=active_statuses)
+            self.get_queryset().filter(is_active=True)
         )
 
-        page = self.paginate_queryset(active_travels)
-        if page is not None:
-            serializer = TravelDetailSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = TravelDetailSerializer(active_travels, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return self.list_response(active_travels)
\ No newline at end of file
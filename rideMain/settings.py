@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "journey.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -85,10 +87,34 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Test bazasi faylda: in-memory (shared cache) bazada parallel ulanishlar
+        # kutish o'rniga darhol "table is locked" oladi (TransactionTestCase lar)
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# REDIS_URL berilmasa jarayon ichidagi LocMemCache ishlatiladi (lokal va testlar uchun)
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -147,6 +173,48 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ),
 }
+# Oxirgi pozitsiyalar ombori: lokal LRU + umumiy kesh (CACHES dagi alias)
+POSITION_STORE = {
+    "CACHE_ALIAS": "default",
+    "LOCAL_MAXSIZE": 10000,
+    "LOCAL_TTL": 1.0,
+    "TIMEOUT": 24 * 60 * 60,
+}
+
+# Yo'lovchi ma'lumotlari keshi: "shared" - CACHES dagi alias + qisqa lokal LRU,
+# "local" - faqat jarayon ichidagi LRU (bitta worker uchun)
+PASSENGER_CACHE = {
+    "BACKEND": "shared",
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": 60 * 60,
+    "INVALIDATION_TTL": 2,
+    "LOCAL_MAXSIZE": 10000,
+    "LOCAL_TTL": 1.0,
+}
+
+# So'rov metrikalari: /metrics (Prometheus) va ixtiyoriy Server-Timing sarlavhasi
+REQUEST_METRICS = {
+    "ENABLED": True,
+    "SERVER_TIMING": DEBUG,
+    "EXCLUDE_PATHS": ["/metrics", "/static/"],
+}
+
+# passengers/bulk-upsert/ bir so'rovda 100 000 tagacha yozuv qabul qiladi
+DATA_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024
+
+# Haydovchi qidiruv indeksini yangilash oraliqlari (soniya)
+DRIVER_INDEX_SYNC_SECONDS = 2
+DRIVER_INDEX_RELOAD_SECONDS = 300
+
+# Sayohatlar ro'yxati uchun cursor paginatsiya sahifa hajmi
+TRAVEL_PAGE_SIZE = 50
+TRAVEL_MAX_PAGE_SIZE = 500
+# Ro'yxat endpointlari model obyektlari o'rniga values() qatorlaridan yig'iladi
+TRAVEL_FAST_LIST = True
+# Sayohat COMPLETED bo'lganda yo'lovchi/haydovchi sayohatlar sonini avtomatik oshirish.
+# Yoqilganda POST passengers/{id}/increment-trips/ 409 qaytaradi (ikki marta sanalmasligi uchun)
+COUNT_TRIPS_ON_COMPLETE = False
+
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 CSRF_TRUSTED_ORIGINS = [
@@ -156,4 +224,39 @@ CSRF_TRUSTED_ORIGINS = [
 # (Ixtiyoriy, agar siz boshqa domenlardan so‘rov yuborayotgan bo‘lsangiz)
 CORS_ALLOWED_ORIGINS = [
     "https://ridemain-production.up.railway.app",
-]
\ No newline at end of file
+]
+
+# Fon vazifalari (journey.services.tasks): "immediate" - so'rov ichida darhol (standart),
+# "database" - BackgroundTask jadvali va alohida `python manage.py run_tasks` worker,
+# "memory" - jarayon ichidagi thread pool (faqat TASKS_BACKEND=memory bilan: jarayon
+# qayta ishga tushsa navbatdagi vazifalar yo'qoladi)
+TASKS = {
+    "BACKEND": os.getenv("TASKS_BACKEND", "immediate"),
+    "WORKERS": 4,
+    "MAX_ATTEMPTS": 3,
+    "RETRY_DELAY": 5,
+    "POLL_INTERVAL": 1.0,
+    "LOCK_TIMEOUT": 300,
+}
+
+# Sayohat masofasi va davomiyligi bahosi (mijoz yubormasa): geodezik masofa x ROAD_FACTOR,
+# CITY_DISTANCE_KM gacha shahar tezligi, undan keyin shaharlararo tezlik
+ROUTE_ESTIMATES = {
+    "ROAD_FACTOR": 1.3,
+    "CITY_SPEED_KMH": 22,
+    "INTERCITY_SPEED_KMH": 65,
+    "CITY_DISTANCE_KM": 30,
+    "MIN_DURATION_MIN": 3,
+    "LOCAL_MAXSIZE": 50000,
+}
+
+# Talab xaritasi: sayohat boshlanishlari (va USER_LOCATIONS bo'lsa foydalanuvchi
+# joylashuvlari) PRECISION li geohash kataklari va BUCKET_MINUTES li oraliqlarda
+# sanaladi. PRECISION yoki BUCKET_MINUTES o'zgarsa backfill_demand_heatmap kerak
+DEMAND_HEATMAP = {
+    "PRECISION": 6,
+    "BUCKET_MINUTES": 15,
+    "USER_LOCATIONS": True,
+    "DEFAULT_WINDOW_HOURS": 24,
+    "MAX_WINDOW_DAYS": 31,
+}
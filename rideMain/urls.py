@@ -18,7 +18,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from journey.views.metrics_views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("journey.urls")),
+    path("metrics", metrics, name="metrics"),
 ]